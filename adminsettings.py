@@ -16,23 +16,30 @@ from permissions import (
     save_settings,
 )
 
+from command_permissions import schedule_sync as schedule_command_permissions_sync
+
 from joinleave import (
     load_config,
     save_config,
     render,
     human_member_number,
+    WELCOME_PLACEHOLDERS,
+    BOOST_PLACEHOLDERS,
 )
+from message_templates import unknown_placeholders, describe as describe_placeholders
 
 # --- Birthdays (GitHub-backed) ---
 # Uses your existing birthdays.json storage via birthdays.py
 try:
     from birthdays import load_data as bday_load_data, save_data as bday_save_data, DEFAULT_DATA as BDAY_DEFAULT_DATA
     from birthdays import _send_announcement_like as bday_send_announcement_like  # for previews
+    from birthdays import BIRTHDAY_PLACEHOLDERS
 except Exception:
     bday_load_data = None
     bday_save_data = None
     BDAY_DEFAULT_DATA = None
     bday_send_announcement_like = None
+    BIRTHDAY_PLACEHOLDERS = ()
 
 
 # ======================================================
@@ -56,6 +63,17 @@ SCOPES = {
 def _cid(v) -> int:
     return v.id if hasattr(v, "id") else int(v)
 
+async def _reject_unknown_placeholders(interaction: discord.Interaction, allowed, *texts: str) -> bool:
+    """Answers the modal with an error if a template uses a placeholder we can't fill."""
+    unknown = unknown_placeholders(texts, allowed)
+    if not unknown:
+        return False
+    listed = ", ".join("{" + u + "}" for u in unknown)
+    await interaction.response.send_message(
+        f"❌ Unknown placeholder(s): {listed}\nAvailable: {describe_placeholders(allowed)}"
+    )
+    return True
+
 def format_roles(guild: discord.Guild, role_ids: List[int]) -> str:
     mentions = []
     for rid in role_ids:
@@ -144,7 +162,7 @@ def _ensure_bday_data_shape(data: Dict[str, Any]) -> Dict[str, Any]:
             out[k] = v
     out.setdefault("settings", {})
     out.setdefault("birthdays", {})
-    out.setdefault("state", {"announced_keys": []})
+    out.setdefault("state", {"announced": {}})
 
     # merge settings defaults
     def_s = (BDAY_DEFAULT_DATA.get("settings") or {}) if isinstance(BDAY_DEFAULT_DATA, dict) else {}
@@ -263,36 +281,36 @@ class RemoveImageSelect(discord.ui.Select):
         idx = int(self.values[0])
 
         if self.kind == "welcome":
-            cfg = load_config()
+            cfg = await load_config()
             arr = (cfg.get("welcome", {}) or {}).get("arrival_images") or []
             if 0 <= idx < len(arr):
                 arr.pop(idx)
                 cfg["welcome"]["arrival_images"] = arr
-                save_config(cfg)
+                await save_config(cfg)
                 return await interaction.response.send_message("✅ Removed that arrival image.")
             return await interaction.response.send_message("❌ Couldn’t remove that image.")
 
         if self.kind == "boost":
-            cfg = load_config()
+            cfg = await load_config()
             b = cfg.setdefault("boost", {})
             imgs = b.get("images") or []
             if 0 <= idx < len(imgs):
                 imgs.pop(idx)
                 b["images"] = imgs
-                save_config(cfg)
+                await save_config(cfg)
                 return await interaction.response.send_message("✅ Removed that boost image.")
             return await interaction.response.send_message("❌ Couldn’t remove that image.")
 
         if self.kind == "birthdays":
             if not bday_load_data or not bday_save_data:
                 return await interaction.response.send_message("❌ Birthdays module not available.")
-            data, sha = await bday_load_data()
+            data = await bday_load_data()
             data = _ensure_bday_data_shape(data)
             imgs = (data.get("settings", {}) or {}).get("image_urls") or []
             if 0 <= idx < len(imgs):
                 imgs.pop(idx)
                 data["settings"]["image_urls"] = imgs
-                await bday_save_data(data, sha)
+                await bday_save_data(data)
                 return await interaction.response.send_message("✅ Removed that birthday image.")
             return await interaction.response.send_message("❌ Couldn’t remove that image.")
 
@@ -312,10 +330,10 @@ class WelcomeChannelPickerViewLocal(discord.ui.View):
 
     async def pick(self, interaction: discord.Interaction):
         cid = _cid(interaction.data["values"][0])
-        cfg = load_config()
+        cfg = await load_config()
         cfg.setdefault("welcome", {})
         cfg["welcome"]["welcome_channel_id"] = cid
-        save_config(cfg)
+        await save_config(cfg)
         await interaction.response.edit_message(content=f"✅ Welcome channel set to <#{cid}>", view=None)
 
 
@@ -328,11 +346,11 @@ class BotAddChannelPickerViewLocal(discord.ui.View):
 
     async def pick(self, interaction: discord.Interaction):
         cid = _cid(interaction.data["values"][0])
-        cfg = load_config()
+        cfg = await load_config()
         cfg.setdefault("welcome", {})
         cfg["welcome"].setdefault("bot_add", {"enabled": True, "channel_id": None})
         cfg["welcome"]["bot_add"]["channel_id"] = cid
-        save_config(cfg)
+        await save_config(cfg)
         await interaction.response.edit_message(content=f"✅ Bot add channel set to <#{cid}>", view=None)
 
 
@@ -345,10 +363,10 @@ class LogChannelPickerViewLocal(discord.ui.View):
 
     async def pick(self, interaction: discord.Interaction):
         cid = _cid(interaction.data["values"][0])
-        cfg = load_config()
+        cfg = await load_config()
         cfg.setdefault("member_logs", {})
         cfg["member_logs"]["channel_id"] = cid
-        save_config(cfg)
+        await save_config(cfg)
         await interaction.response.edit_message(content=f"✅ Member log channel set to <#{cid}>", view=None)
 
 
@@ -362,11 +380,11 @@ class ChannelSlotPickerViewLocal(discord.ui.View):
 
     async def pick(self, interaction: discord.Interaction):
         cid = _cid(interaction.data["values"][0])
-        cfg = load_config()
+        cfg = await load_config()
         cfg.setdefault("welcome", {})
         cfg["welcome"].setdefault("channels", {})
         cfg["welcome"]["channels"][self.slot] = cid
-        save_config(cfg)
+        await save_config(cfg)
         await interaction.response.edit_message(content=f"✅ Saved slot **{self.slot}** → <#{cid}>", view=None)
 
 
@@ -397,9 +415,9 @@ class BoostChannelPickerView(discord.ui.View):
 
     async def pick(self, interaction: discord.Interaction):
         cid = _cid(interaction.data["values"][0])
-        cfg = _ensure_boost(load_config())
+        cfg = _ensure_boost(await load_config())
         cfg["boost"]["channel_id"] = cid
-        save_config(cfg)
+        await save_config(cfg)
         await interaction.response.edit_message(content=f"✅ Boost channel set to <#{cid}>", view=None)
 
 
@@ -411,9 +429,11 @@ class EditBoostTitleModal(discord.ui.Modal, title="Edit Boost Title"):
         self.text.default = default
 
     async def on_submit(self, interaction: discord.Interaction):
-        cfg = _ensure_boost(load_config())
+        if await _reject_unknown_placeholders(interaction, BOOST_PLACEHOLDERS, self.text.value):
+            return
+        cfg = _ensure_boost(await load_config())
         cfg["boost"]["title"] = self.text.value
-        save_config(cfg)
+        await save_config(cfg)
         await interaction.response.send_message("✅ Boost title updated.")
 
 
@@ -430,9 +450,11 @@ class EditBoostMessageModal(discord.ui.Modal):
         self.add_item(self.text)
 
     async def on_submit(self, interaction: discord.Interaction):
-        cfg = _ensure_boost(load_config())
+        if await _reject_unknown_placeholders(interaction, BOOST_PLACEHOLDERS, self.text.value):
+            return
+        cfg = _ensure_boost(await load_config())
         cfg["boost"]["messages"][self.key] = self.text.value
-        save_config(cfg)
+        await save_config(cfg)
         await interaction.response.send_message("✅ Boost text updated.")
 
 
@@ -440,9 +462,9 @@ class AddBoostImageModal(discord.ui.Modal, title="Add Boost Image"):
     url = discord.ui.TextInput(label="Image URL", max_length=400)
 
     async def on_submit(self, interaction: discord.Interaction):
-        cfg = _ensure_boost(load_config())
+        cfg = _ensure_boost(await load_config())
         cfg["boost"]["images"].append(self.url.value.strip())
-        save_config(cfg)
+        await save_config(cfg)
         await interaction.response.send_message("✅ Boost image added.")
 
 
@@ -464,7 +486,7 @@ class BoostRemoveImageSelect(discord.ui.Select):
         )
 
     async def callback(self, interaction: discord.Interaction):
-        cfg = _ensure_boost(load_config())
+        cfg = _ensure_boost(await load_config())
         imgs = cfg["boost"].get("images") or []
 
         if self.values[0] == "view":
@@ -500,7 +522,7 @@ class BoostActionSelect(discord.ui.Select):
         )
 
     async def callback(self, interaction: discord.Interaction):
-        if not has_app_access(interaction.user, "welcome_leave"):
+        if not await has_app_access(interaction.user, "welcome_leave"):
             return await _no_perm(interaction, "❌ You don’t have permission for Welcome/Leave/Boost settings.")
 
         choice = self.values[0]
@@ -509,11 +531,11 @@ class BoostActionSelect(discord.ui.Select):
             return await interaction.response.send_message("Select the boost channel:", view=BoostChannelPickerView())
 
         if choice == "edit_title":
-            cfg = _ensure_boost(load_config())
+            cfg = _ensure_boost(await load_config())
             return await interaction.response.send_modal(EditBoostTitleModal(cfg["boost"].get("title", "")))
 
         if choice == "edit_single":
-            cfg = _ensure_boost(load_config())
+            cfg = _ensure_boost(await load_config())
             return await interaction.response.send_modal(
                 EditBoostMessageModal(
                     modal_title="Edit Boost Text",
@@ -523,7 +545,7 @@ class BoostActionSelect(discord.ui.Select):
             )
 
         if choice == "edit_double":
-            cfg = _ensure_boost(load_config())
+            cfg = _ensure_boost(await load_config())
             return await interaction.response.send_modal(
                 EditBoostMessageModal(
                     modal_title="Edit Double Boost Text",
@@ -533,7 +555,7 @@ class BoostActionSelect(discord.ui.Select):
             )
 
         if choice == "edit_tier":
-            cfg = _ensure_boost(load_config())
+            cfg = _ensure_boost(await load_config())
             return await interaction.response.send_modal(
                 EditBoostMessageModal(
                     modal_title="Edit Tier Unlock Text",
@@ -546,12 +568,12 @@ class BoostActionSelect(discord.ui.Select):
             return await interaction.response.send_modal(AddBoostImageModal())
 
         await _safe_defer(interaction)
-        cfg = _ensure_boost(load_config())
+        cfg = _ensure_boost(await load_config())
         b = cfg["boost"]
 
         if choice == "toggle":
             b["enabled"] = not b.get("enabled", True)
-            save_config(cfg)
+            await save_config(cfg)
 
         elif choice == "rm_img":
             imgs = b.get("images") or []
@@ -566,13 +588,13 @@ class BoostActionSelect(discord.ui.Select):
             await send_boost_preview(interaction)
             return
 
-        cfg2 = load_config()
+        cfg2 = await load_config()
         embed = discord.Embed(title="🚀 Boost Settings", description=boost_status_text(cfg2), color=discord.Color.blurple())
         await _safe_edit_panel_message(interaction, embed=embed, view=PilotPanelView(state=PanelState.BOOST))
 
 
 async def send_boost_preview(interaction: discord.Interaction):
-    cfg = _ensure_boost(load_config())
+    cfg = _ensure_boost(await load_config())
     b = cfg["boost"]
 
     boosts_total = interaction.guild.premium_subscription_count or 0
@@ -604,17 +626,17 @@ class BirthdayChannelPickerView(discord.ui.View):
         self.add_item(sel)
 
     async def pick(self, interaction: discord.Interaction):
-        if not has_app_access(interaction.user, "birthdays"):
+        if not await has_app_access(interaction.user, "birthdays"):
             return await _no_perm(interaction, "❌ You don’t have permission for Birthdays settings.")
 
         if not bday_load_data or not bday_save_data:
             return await interaction.response.edit_message(content="❌ Birthdays module not available.", view=None)
 
         cid = _cid(interaction.data["values"][0])
-        data, sha = await bday_load_data()
+        data = await bday_load_data()
         data = _ensure_bday_data_shape(data)
         data["settings"]["channel_id"] = cid
-        await bday_save_data(data, sha)
+        await bday_save_data(data)
         await interaction.response.edit_message(content=f"✅ Birthday channel set to <#{cid}>", view=None)
 
 
@@ -626,17 +648,17 @@ class BirthdayRolePickerView(discord.ui.View):
         self.add_item(sel)
 
     async def pick(self, interaction: discord.Interaction):
-        if not has_app_access(interaction.user, "birthdays"):
+        if not await has_app_access(interaction.user, "birthdays"):
             return await _no_perm(interaction, "❌ You don’t have permission for Birthdays settings.")
 
         if not bday_load_data or not bday_save_data:
             return await interaction.response.edit_message(content="❌ Birthdays module not available.", view=None)
 
         rid = _cid(interaction.data["values"][0])
-        data, sha = await bday_load_data()
+        data = await bday_load_data()
         data = _ensure_bday_data_shape(data)
         data["settings"]["birthday_role_id"] = rid
-        await bday_save_data(data, sha)
+        await bday_save_data(data)
         await interaction.response.edit_message(content=f"✅ Birthday role set to <@&{rid}>", view=None)
 
 
@@ -650,7 +672,7 @@ class EditBirthdayTimeModal(discord.ui.Modal, title="Edit Birthday Announcement
         self.minute.default = str(default_minute)
 
     async def on_submit(self, interaction: discord.Interaction):
-        if not has_app_access(interaction.user, "birthdays"):
+        if not await has_app_access(interaction.user, "birthdays"):
             return await _no_perm(interaction, "❌ You don’t have permission for Birthdays settings.")
 
         if not bday_load_data or not bday_save_data:
@@ -662,11 +684,11 @@ class EditBirthdayTimeModal(discord.ui.Modal, title="Edit Birthday Announcement
             if not (0 <= h <= 23 and 0 <= m <= 59):
                 raise ValueError()
 
-            data, sha = await bday_load_data()
+            data = await bday_load_data()
             data = _ensure_bday_data_shape(data)
             data["settings"]["post_hour"] = h
             data["settings"]["post_minute"] = m
-            await bday_save_data(data, sha)
+            await bday_save_data(data)
             await interaction.response.send_message(f"✅ Birthday time set to **{h:02d}:{m:02d}**.")
         except Exception:
             await interaction.response.send_message("❌ Invalid time.")
@@ -684,19 +706,24 @@ class EditBirthdayCardModal(discord.ui.Modal, title="Edit Birthday Card Text"):
         self.multi.default = multi_default or "We have {count} birthdays today! Happy Birthday to {usernames}! 🎂🎉"
 
     async def on_submit(self, interaction: discord.Interaction):
-        if not has_app_access(interaction.user, "birthdays"):
+        if not await has_app_access(interaction.user, "birthdays"):
             return await _no_perm(interaction, "❌ You don’t have permission for Birthdays settings.")
 
         if not bday_load_data or not bday_save_data:
             return await interaction.response.send_message("❌ Birthdays module not available.")
 
-        data, sha = await bday_load_data()
+        if await _reject_unknown_placeholders(
+            interaction, BIRTHDAY_PLACEHOLDERS, self.header.value, self.single.value, self.multi.value
+        ):
+            return
+
+        data = await bday_load_data()
         data = _ensure_bday_data_shape(data)
         s = data["settings"]
         s["message_header"] = str(self.header.value)
         s["message_single"] = str(self.single.value)
         s["message_multiple"] = str(self.multi.value) or str(self.single.value)
-        await bday_save_data(data, sha)
+        await bday_save_data(data)
         await interaction.response.send_message("✅ Birthday card text updated.")
 
 
@@ -704,17 +731,17 @@ class AddBirthdayImageModal(discord.ui.Modal, title="Add Birthday Image"):
     url = discord.ui.TextInput(label="Image URL", max_length=400)
 
     async def on_submit(self, interaction: discord.Interaction):
-        if not has_app_access(interaction.user, "birthdays"):
+        if not await has_app_access(interaction.user, "birthdays"):
             return await _no_perm(interaction, "❌ You don’t have permission for Birthdays settings.")
 
         if not bday_load_data or not bday_save_data:
             return await interaction.response.send_message("❌ Birthdays module not available.")
 
-        data, sha = await bday_load_data()
+        data = await bday_load_data()
         data = _ensure_bday_data_shape(data)
         data["settings"].setdefault("image_urls", [])
         data["settings"]["image_urls"].append(self.url.value.strip())
-        await bday_save_data(data, sha)
+        await bday_save_data(data)
         await interaction.response.send_message("✅ Birthday image added.")
 
 
@@ -741,7 +768,7 @@ class BirthdayActionSelect(discord.ui.Select):
         )
 
     async def callback(self, interaction: discord.Interaction):
-        if not has_app_access(interaction.user, "birthdays"):
+        if not await has_app_access(interaction.user, "birthdays"):
             return await _no_perm(interaction, "❌ You don’t have permission for Birthdays settings.")
 
         if not bday_load_data or not bday_save_data:
@@ -757,7 +784,7 @@ class BirthdayActionSelect(discord.ui.Select):
             return await interaction.response.send_message("Select the birthday role:", view=BirthdayRolePickerView())
 
         # Load data once for most actions
-        data, sha = await bday_load_data()
+        data = await bday_load_data()
         data = _ensure_bday_data_shape(data)
         s = data.get("settings", {}) or {}
 
@@ -783,12 +810,12 @@ class BirthdayActionSelect(discord.ui.Select):
         if choice == "toggle":
             s["enabled"] = not bool(s.get("enabled", True))
             data["settings"] = s
-            await bday_save_data(data, sha)
+            await bday_save_data(data)
 
         elif choice == "toggle_announce":
             s["announce"] = not bool(s.get("announce", True))
             data["settings"] = s
-            await bday_save_data(data, sha)
+            await bday_save_data(data)
 
         elif choice == "view_imgs":
             imgs = s.get("image_urls", []) or []
@@ -870,17 +897,17 @@ class BirthdayActionSelect(discord.ui.Select):
             # Reset only settings; keep birthdays + state
             if BDAY_DEFAULT_DATA and isinstance(BDAY_DEFAULT_DATA, dict):
                 keep_birthdays = data.get("birthdays", {}) or {}
-                keep_state = data.get("state", {}) or {"announced_keys": []}
+                keep_state = data.get("state", {}) or {"announced": {}}
                 data["settings"] = (BDAY_DEFAULT_DATA.get("settings") or {}).copy()
                 data["birthdays"] = keep_birthdays
                 data["state"] = keep_state
                 data = _ensure_bday_data_shape(data)
-                await bday_save_data(data, sha)
+                await bday_save_data(data)
                 if interaction.channel:
                     await interaction.channel.send("♻️ Reset birthday settings to defaults (kept birthdays).")
 
         # Refresh panel
-        data2, _ = await bday_load_data()
+        data2 = await bday_load_data()
         embed = discord.Embed(title="🎂 Birthday Settings", description=birthday_status_text(data2), color=discord.Color.blurple())
         await _safe_edit_panel_message(interaction, embed=embed, view=PilotPanelView(state=PanelState.BIRTHDAYS))
 
@@ -911,7 +938,7 @@ class PilotPanelView(discord.ui.View):
             self.add_item(BirthdayActionSelect())
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        if not has_global_access(interaction.user):
+        if not await has_global_access(interaction.user):
             await _no_perm(interaction)
             return False
         return True
@@ -930,13 +957,13 @@ class PanelNavSelect(discord.ui.Select):
         super().__init__(placeholder="Navigate panel…", options=opts, min_values=1, max_values=1)
 
     async def callback(self, interaction: discord.Interaction):
-        if not has_global_access(interaction.user):
+        if not await has_global_access(interaction.user):
             return await _no_perm(interaction)
 
         target = self.values[0]
         await _safe_defer(interaction)
 
-        cfg = load_config()
+        cfg = await load_config()
 
         if target == PanelState.ROOT:
             embed = discord.Embed(title="⚙️ Pilot Settings", color=discord.Color.blurple())
@@ -948,7 +975,7 @@ class PanelNavSelect(discord.ui.Select):
             btxt = "*Birthdays module not available*"
             if bday_load_data:
                 try:
-                    bdata, _ = await bday_load_data()
+                    bdata = await bday_load_data()
                     btxt = birthday_status_text(bdata)
                 except Exception:
                     btxt = "*Couldn’t load birthdays.json*"
@@ -973,7 +1000,7 @@ class PanelNavSelect(discord.ui.Select):
             btxt = "*Birthdays module not available*"
             if bday_load_data:
                 try:
-                    bdata, _ = await bday_load_data()
+                    bdata = await bday_load_data()
                     btxt = birthday_status_text(bdata)
                 except Exception:
                     btxt = "*Couldn’t load birthdays.json*"
@@ -1026,14 +1053,14 @@ class RoleScopeSelect(discord.ui.Select):
         super().__init__(placeholder="Choose a role scope…", options=options, min_values=1, max_values=1)
 
     async def callback(self, interaction: discord.Interaction):
-        if not has_global_access(interaction.user):
+        if not await has_global_access(interaction.user):
             return await _no_perm(interaction)
 
         choice = self.values[0]
 
         if choice == "__overview__":
             await _safe_defer(interaction)
-            settings = load_settings()
+            settings = await load_settings()
             pages = build_role_pages(interaction.guild, settings)
             if not pages:
                 return await _safe_edit_panel_message(
@@ -1074,11 +1101,11 @@ class RoleActionSelect(discord.ui.Select):
         )
 
     async def callback(self, interaction: discord.Interaction):
-        if not has_global_access(interaction.user):
+        if not await has_global_access(interaction.user):
             return await _no_perm(interaction)
 
         action = self.values[0]
-        settings = load_settings()
+        settings = await load_settings()
 
         if action == "show":
             ids = settings.get("global_allowed_roles", []) if self.scope == "global" else settings["apps"][self.scope]["allowed_roles"]
@@ -1106,10 +1133,10 @@ class AddRolesSelect(discord.ui.RoleSelect):
         super().__init__(placeholder="Select roles to ADD", min_values=1, max_values=10)
 
     async def callback(self, interaction: discord.Interaction):
-        if not has_global_access(interaction.user):
+        if not await has_global_access(interaction.user):
             return await _no_perm(interaction)
 
-        settings = load_settings()
+        settings = await load_settings()
         role_set = set(settings.get("global_allowed_roles", [])) if self.scope == "global" else set(settings["apps"][self.scope]["allowed_roles"])
 
         for r in self.values:
@@ -1120,7 +1147,8 @@ class AddRolesSelect(discord.ui.RoleSelect):
         else:
             settings["apps"][self.scope]["allowed_roles"] = list(role_set)
 
-        save_settings(settings)
+        await save_settings(settings)
+        schedule_command_permissions_sync(interaction.client)
         await interaction.response.send_message(f"✅ Added roles to **{SCOPES[self.scope]}**.")
 
 
@@ -1130,10 +1158,10 @@ class RemoveRolesSelect(discord.ui.RoleSelect):
         super().__init__(placeholder="Select roles to REMOVE", min_values=1, max_values=10)
 
     async def callback(self, interaction: discord.Interaction):
-        if not has_global_access(interaction.user):
+        if not await has_global_access(interaction.user):
             return await _no_perm(interaction)
 
-        settings = load_settings()
+        settings = await load_settings()
         role_set = set(settings.get("global_allowed_roles", [])) if self.scope == "global" else set(settings["apps"][self.scope]["allowed_roles"])
 
         for r in self.values:
@@ -1144,7 +1172,8 @@ class RemoveRolesSelect(discord.ui.RoleSelect):
         else:
             settings["apps"][self.scope]["allowed_roles"] = list(role_set)
 
-        save_settings(settings)
+        await save_settings(settings)
+        schedule_command_permissions_sync(interaction.client)
         await interaction.response.send_message(f"✅ Removed roles from **{SCOPES[self.scope]}**.")
 
 
@@ -1160,10 +1189,12 @@ class EditWelcomeTitleModalLocal(discord.ui.Modal, title="Edit Welcome Title"):
         self.text.default = default
 
     async def on_submit(self, interaction: discord.Interaction):
-        cfg = load_config()
+        if await _reject_unknown_placeholders(interaction, WELCOME_PLACEHOLDERS, self.text.value):
+            return
+        cfg = await load_config()
         cfg.setdefault("welcome", {})
         cfg["welcome"]["title"] = self.text.value
-        save_config(cfg)
+        await save_config(cfg)
         await interaction.response.send_message("✅ Welcome title updated.")
 
 
@@ -1175,10 +1206,12 @@ class EditWelcomeTextModalLocal(discord.ui.Modal, title="Edit Welcome Text"):
         self.text.default = default
 
     async def on_submit(self, interaction: discord.Interaction):
-        cfg = load_config()
+        if await _reject_unknown_placeholders(interaction, WELCOME_PLACEHOLDERS, self.text.value):
+            return
+        cfg = await load_config()
         cfg.setdefault("welcome", {})
         cfg["welcome"]["description"] = self.text.value
-        save_config(cfg)
+        await save_config(cfg)
         await interaction.response.send_message("✅ Welcome text updated.")
 
 
@@ -1186,11 +1219,11 @@ class AddArrivalImageModalLocal(discord.ui.Modal, title="Add Arrival Image"):
     url = discord.ui.TextInput(label="Image URL", max_length=400)
 
     async def on_submit(self, interaction: discord.Interaction):
-        cfg = load_config()
+        cfg = await load_config()
         cfg.setdefault("welcome", {})
         cfg["welcome"].setdefault("arrival_images", [])
         cfg["welcome"]["arrival_images"].append(self.url.value.strip())
-        save_config(cfg)
+        await save_config(cfg)
         await interaction.response.send_message("✅ Arrival image added.")
 
 
@@ -1222,7 +1255,7 @@ class WelcomeRemoveImageSelect(discord.ui.Select):
         )
 
     async def callback(self, interaction: discord.Interaction):
-        cfg = load_config()
+        cfg = await load_config()
         imgs = (cfg.get("welcome", {}) or {}).get("arrival_images") or []
 
         if self.values[0] == "view":
@@ -1259,7 +1292,7 @@ class WelcomeActionSelect(discord.ui.Select):
         )
 
     async def callback(self, interaction: discord.Interaction):
-        if not has_app_access(interaction.user, "welcome_leave"):
+        if not await has_app_access(interaction.user, "welcome_leave"):
             return await _no_perm(interaction, "❌ You don’t have permission for Welcome/Leave/Boost settings.")
 
         choice = self.values[0]
@@ -1268,12 +1301,12 @@ class WelcomeActionSelect(discord.ui.Select):
             return await interaction.response.send_message("Select the welcome channel:", view=WelcomeChannelPickerViewLocal())
 
         if choice == "edit_title":
-            cfg = load_config()
+            cfg = await load_config()
             w = cfg.get("welcome", {}) or {}
             return await interaction.response.send_modal(EditWelcomeTitleModalLocal(w.get("title", "")))
 
         if choice == "edit_text":
-            cfg = load_config()
+            cfg = await load_config()
             w = cfg.get("welcome", {}) or {}
             return await interaction.response.send_modal(EditWelcomeTextModalLocal(w.get("description", "")))
 
@@ -1287,18 +1320,18 @@ class WelcomeActionSelect(discord.ui.Select):
             return await interaction.response.send_message("Select the bot-add log channel:", view=BotAddChannelPickerViewLocal())
 
         await _safe_defer(interaction)
-        cfg = load_config()
+        cfg = await load_config()
         cfg.setdefault("welcome", {})
         w = cfg["welcome"]
 
         if choice == "toggle":
             w["enabled"] = not w.get("enabled", True)
-            save_config(cfg)
+            await save_config(cfg)
 
         elif choice == "toggle_bot":
             w.setdefault("bot_add", {"enabled": True, "channel_id": None})
             w["bot_add"]["enabled"] = not w["bot_add"].get("enabled", True)
-            save_config(cfg)
+            await save_config(cfg)
 
         elif choice == "rm_img":
             imgs = w.get("arrival_images") or []
@@ -1313,13 +1346,13 @@ class WelcomeActionSelect(discord.ui.Select):
             await send_welcome_preview(interaction)
             return
 
-        cfg2 = load_config()
+        cfg2 = await load_config()
         embed = discord.Embed(title="👋 Welcome Settings", description=welcome_status_text(cfg2), color=discord.Color.blurple())
         await _safe_edit_panel_message(interaction, embed=embed, view=PilotPanelView(state=PanelState.WELCOME))
 
 
 async def send_welcome_preview(interaction: discord.Interaction):
-    cfg = load_config()
+    cfg = await load_config()
     w = cfg.get("welcome", {}) or {}
 
     count = human_member_number(interaction.guild)
@@ -1360,7 +1393,7 @@ class LeaveActionSelect(discord.ui.Select):
         )
 
     async def callback(self, interaction: discord.Interaction):
-        if not has_app_access(interaction.user, "welcome_leave"):
+        if not await has_app_access(interaction.user, "welcome_leave"):
             return await _no_perm(interaction, "❌ You don’t have permission for Welcome/Leave/Boost settings.")
 
         choice = self.values[0]
@@ -1369,7 +1402,7 @@ class LeaveActionSelect(discord.ui.Select):
             return await interaction.response.send_message("Select the member log channel:", view=LogChannelPickerViewLocal())
 
         await _safe_defer(interaction)
-        cfg = load_config()
+        cfg = await load_config()
         cfg.setdefault("member_logs", {})
         m = cfg["member_logs"]
 
@@ -1382,9 +1415,9 @@ class LeaveActionSelect(discord.ui.Select):
         elif choice == "toggle_ban":
             m["log_ban"] = not m.get("log_ban", True)
 
-        save_config(cfg)
+        await save_config(cfg)
 
-        cfg2 = load_config()
+        cfg2 = await load_config()
         embed = discord.Embed(title="📄 Leave / Logs Settings", description=logs_status_text(cfg2), color=discord.Color.blurple())
         await _safe_edit_panel_message(interaction, embed=embed, view=PilotPanelView(state=PanelState.LEAVE))
 
@@ -1397,12 +1430,12 @@ def setup_admin_settings(tree: app_commands.CommandTree):
 
     @tree.command(name="pilotsettings", description="Open Pilot admin panel")
     async def pilotsettings(interaction: discord.Interaction):
-        if not has_global_access(interaction.user):
+        if not await has_global_access(interaction.user):
             return await interaction.response.send_message("❌ You do not have permission.")
 
         await _safe_defer(interaction)
 
-        cfg = load_config()
+        cfg = await load_config()
         embed = discord.Embed(title="⚙️ Pilot Settings", color=discord.Color.blurple())
         embed.add_field(name="👋 Welcome", value=welcome_status_text(cfg), inline=False)
         embed.add_field(name="📄 Leave / Logs", value=logs_status_text(cfg), inline=False)
@@ -1411,7 +1444,7 @@ def setup_admin_settings(tree: app_commands.CommandTree):
         btxt = "*Birthdays module not available*"
         if bday_load_data:
             try:
-                bdata, _ = await bday_load_data()
+                bdata = await bday_load_data()
                 btxt = birthday_status_text(bdata)
             except Exception:
                 btxt = "*Couldn’t load birthdays.json*"
@@ -0,0 +1,99 @@
+# audit_correlator.py
+# Matches member leave / kick / ban / bot-add events to their audit-log
+# entries without querying the audit log over REST.
+#
+# Discord pushes every new audit-log entry over the gateway
+# (audit_log_entry_create; needs View Audit Log in the guild). The
+# correlator keeps them for ENTRY_TTL_SECONDS keyed by (guild, target,
+# action). A member event then asks for its entry with a bounded wait: the
+# entry can arrive just before or just after the member event, and a plain
+# leave simply has no entry and times out.
+
+from __future__ import annotations
+
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import discord
+
+ENTRY_TTL_SECONDS = 60
+WAIT_SECONDS = 2.0
+
+_Key = Tuple[int, int, discord.AuditLogAction]  # (guild id, target id, action)
+
+
+class AuditLogCorrelator:
+    def __init__(self, ttl: float = ENTRY_TTL_SECONDS):
+        self.ttl = ttl
+        self._entries: "OrderedDict[_Key, Tuple[float, discord.AuditLogEntry]]" = OrderedDict()
+        self._waiters: Dict[Tuple[int, int], List[Tuple[frozenset, asyncio.Future]]] = {}
+
+    async def on_entry(self, entry: discord.AuditLogEntry) -> None:
+        """Router handler for audit_log_entry_create."""
+        target_id = getattr(entry.target, "id", None)
+        if target_id is None:
+            return
+
+        now = time.monotonic()
+        key = (entry.guild.id, target_id, entry.action)
+        self._entries[key] = (now, entry)
+        self._entries.move_to_end(key)
+        self._expire(now)
+
+        waiters = self._waiters.get(key[:2])
+        if waiters:
+            for actions, future in list(waiters):
+                if entry.action in actions and not future.done():
+                    future.set_result(entry)
+
+    def _expire(self, now: float) -> None:
+        # oldest first, so stop at the first entry that is still fresh
+        while self._entries:
+            key, (seen, _) = next(iter(self._entries.items()))
+            if now - seen < self.ttl:
+                break
+            del self._entries[key]
+
+    def lookup(self, guild_id: int, target_id: int, actions: Iterable[discord.AuditLogAction]) -> Optional[discord.AuditLogEntry]:
+        now = time.monotonic()
+        newest = None
+        for action in actions:
+            hit = self._entries.get((guild_id, target_id, action))
+            if hit and now - hit[0] < self.ttl and (newest is None or hit[0] > newest[0]):
+                newest = hit
+        return newest[1] if newest else None
+
+    async def wait_for(
+        self,
+        guild_id: int,
+        target_id: int,
+        *actions: discord.AuditLogAction,
+        timeout: float = WAIT_SECONDS,
+    ) -> Optional[discord.AuditLogEntry]:
+        """The entry for target_id with one of `actions`, or None if none arrives within `timeout`."""
+        entry = self.lookup(guild_id, target_id, actions)
+        if entry is not None:
+            return entry
+
+        subject = (guild_id, target_id)
+        waiter = (frozenset(actions), asyncio.get_running_loop().create_future())
+        self._waiters.setdefault(subject, []).append(waiter)
+        try:
+            return await asyncio.wait_for(waiter[1], timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            waiters = self._waiters.get(subject)
+            if waiters:
+                waiters.remove(waiter)
+                if not waiters:
+                    del self._waiters[subject]
+
+
+def actor_mention(entry: discord.AuditLogEntry) -> str:
+    """The moderator who made the entry (the user may not be cached)."""
+    if entry.user is not None:
+        return entry.user.mention
+    return f"<@{entry.user_id}>"
@@ -1,33 +1,31 @@
 from __future__ import annotations
 
-import os
 import json
-import base64
-import asyncio
 import io
+import heapq
 import random
 import time
-from datetime import datetime, timezone, date
-from typing import Any, Dict, Optional, List, Tuple
+import asyncio
+import bisect
+import traceback
+from functools import lru_cache
+from datetime import datetime, timezone, date, timedelta, time as dtime
+from typing import Any, Dict, Optional, List, Set, Tuple
 
-import aiohttp
 import discord
 from discord import app_commands
-from discord.ext import tasks
 from zoneinfo import ZoneInfo, available_timezones
 
+from document_store import store
+from message_templates import compile_template
+
 # =========================================================
 # GitHub Config & Defaults
 # =========================================================
 
-GITHUB_REPO = os.getenv("GITHUB_REPO", "saraargh/the-pilot")
 GITHUB_FILE_PATH = "birthdays.json"
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-GITHUB_API_BASE = "https://api.github.com"
 UK_TZ = ZoneInfo("Europe/London")
 
-HEADERS = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
-
 DEFAULT_DATA: Dict[str, Any] = {
     "settings": {
         "enabled": True,
@@ -42,73 +40,90 @@ DEFAULT_DATA: Dict[str, Any] = {
         "image_urls": []
     },
     "birthdays": {},
-    "state": {"announced_keys": []}
+    "state": {"announced": {}}
 }
 
-_lock = asyncio.Lock()
+# Days of announcement history kept to avoid announcing twice. A birthday
+# lasts at most a couple of UTC dates across all zones, so this is plenty.
+LEDGER_DAYS = 3
+
+def _compact_ledger(state: Dict[str, Any]) -> None:
+    """
+    state["announced"] is local date -> user ids announced on it. Dates older
+    than LEDGER_DAYS are dropped, and the old unbounded announced_keys list
+    ("date|uid|ann") is folded in.
+    """
+    ledger = state.get("announced")
+    if not isinstance(ledger, dict):
+        ledger = {}
+
+    for key in state.pop("announced_keys", None) or []:
+        try:
+            day, uid, _ = str(key).split("|")
+            ledger.setdefault(day, []).append(int(uid))
+        except ValueError:
+            continue
+
+    cutoff = (datetime.now(timezone.utc).date() - timedelta(days=LEDGER_DAYS)).isoformat()
+    state["announced"] = {
+        day: sorted(set(uids))
+        for day, uids in ledger.items()
+        if day >= cutoff and isinstance(uids, list)
+    }
 
-# =========================================================
-# GitHub Logic
-# =========================================================
+def _ensure_shape(data: Dict[str, Any]) -> Dict[str, Any]:
+    for k, v in DEFAULT_DATA.items():
+        data.setdefault(k, json.loads(json.dumps(v)))
+    if not isinstance(data["state"], dict):
+        data["state"] = {}
+    _compact_ledger(data["state"])
+    return data
 
-async def _gh_get_file() -> Tuple[Optional[dict], Optional[str]]:
-    if not GITHUB_TOKEN:
-        return None, None
-
-    url = f"{GITHUB_API_BASE}/repos/{GITHUB_REPO}/contents/{GITHUB_FILE_PATH}"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=HEADERS) as r:
-            if r.status == 404:
-                return None, None
-            payload = await r.json()
-            sha = payload.get("sha")
-            raw = base64.b64decode(payload.get("content", "")).decode("utf-8")
-            return json.loads(raw), sha
-
-
-async def _gh_put_file(data: dict, sha: Optional[str]) -> Optional[str]:
-    url = f"{GITHUB_API_BASE}/repos/{GITHUB_REPO}/contents/{GITHUB_FILE_PATH}"
-    raw = json.dumps(data, indent=2, ensure_ascii=False)
-    body = {
-        "message": "Update birthdays",
-        "content": base64.b64encode(raw.encode("utf-8")).decode("utf-8"),
-        **({"sha": sha} if sha else {})
-    }
 
-    async with aiohttp.ClientSession() as session:
-        async with session.put(url, headers=HEADERS, json=body) as r:
-            res = await r.json()
-            return res.get("content", {}).get("sha")
+_DOC = store.document(
+    GITHUB_FILE_PATH,
+    default=lambda: json.loads(json.dumps(DEFAULT_DATA)),
+    normalize=_ensure_shape,
+    message="Update birthdays",
+    schema="birthdays",
+)
 
+# =========================================================
+# GitHub Logic
+# =========================================================
 
-async def load_data():
-    async with _lock:
-        data, sha = await _gh_get_file()
-        if not data:
-            return json.loads(json.dumps(DEFAULT_DATA)), sha
-        return data, sha
+async def load_data() -> Dict[str, Any]:
+    return await _DOC.load()
 
 
-async def save_data(data, sha):
-    async with _lock:
-        return await _gh_put_file(data, sha)
+async def save_data(data: Dict[str, Any]) -> Optional[str]:
+    try:
+        return await _DOC.save(data)
+    except Exception:
+        return None
+    finally:
+        # birthdays, post time or role may have changed: re-plan the next events
+        _SCHEDULER.reschedule()
 
 # =========================================================
 # Helpers
 # =========================================================
 
+# Placeholders the birthday card text may use
+BIRTHDAY_PLACEHOLDERS = ("mention", "mentions", "username", "usernames", "count")
+
 def _fmt(tpl: str, members: List[discord.Member]) -> str:
     if not tpl:
         return ""
     mentions = ", ".join(m.mention for m in members)
     names = ", ".join(m.display_name for m in members)
-    return (
-        tpl.replace("{mention}", mentions)
-           .replace("{mentions}", mentions)
-           .replace("{username}", names)
-           .replace("{usernames}", names)
-           .replace("{count}", str(len(members)))
-    )
+    return compile_template(tpl).render({
+        "mention": mentions,
+        "mentions": mentions,
+        "username": names,
+        "usernames": names,
+        "count": str(len(members)),
+    })
 
 
 async def _send_announcement_like(
@@ -154,6 +169,369 @@ async def _send_announcement_like(
     except Exception:
         return False
 
+# =========================================================
+# Timezone Autocomplete
+# =========================================================
+
+# Shown first, in this order, when they match
+COMMON_TIMEZONES = (
+    "Europe/London",
+    "Europe/Dublin",
+    "Europe/Paris",
+    "Europe/Berlin",
+    "America/New_York",
+    "America/Chicago",
+    "America/Denver",
+    "America/Los_Angeles",
+    "America/Toronto",
+    "Australia/Sydney",
+    "Australia/Brisbane",
+    "Australia/Perth",
+    "Pacific/Auckland",
+    "Asia/Kolkata",
+    "Asia/Singapore",
+    "Asia/Tokyo",
+    "UTC",
+)
+
+# What people type instead of a zone name
+TZ_ALIASES = {
+    "UK": "Europe/London",
+    "GB": "Europe/London",
+    "BST": "Europe/London",
+    "IE": "Europe/Dublin",
+    "CET": "Europe/Paris",
+    "CEST": "Europe/Paris",
+    "EST": "America/New_York",
+    "EDT": "America/New_York",
+    "CST": "America/Chicago",
+    "CDT": "America/Chicago",
+    "MST": "America/Denver",
+    "MDT": "America/Denver",
+    "PST": "America/Los_Angeles",
+    "PDT": "America/Los_Angeles",
+    "AEST": "Australia/Sydney",
+    "AEDT": "Australia/Sydney",
+    "AWST": "Australia/Perth",
+    "NZ": "Pacific/Auckland",
+    "IST": "Asia/Kolkata",
+    "JST": "Asia/Tokyo",
+}
+
+MAX_CHOICES = 25  # Discord's autocomplete limit
+
+
+class TimezoneIndex:
+    """
+    Built once: every zone name plus its parts ("Europe/London" -> "europe",
+    "london"), each sorted so a prefix is a bisect instead of a scan, and
+    the 1-3 character grams of every name for substring matches.
+    """
+
+    def __init__(self, zones, common=COMMON_TIMEZONES, aliases=TZ_ALIASES):
+        self.zones = sorted(zones)
+        self.rank = {z: i for i, z in enumerate(c for c in common if c in zones)}
+        self.aliases = {a.lower(): z for a, z in aliases.items() if z in zones}
+
+        self.by_name: List[Tuple[str, str]] = sorted((z.lower(), z) for z in self.zones)
+        self.by_token: List[Tuple[str, str]] = sorted({
+            (token, z)
+            for z in self.zones
+            for token in z.lower().replace("_", "/").replace("-", "/").split("/")
+            if token
+        })
+
+        # "ond" -> {"Europe/London", ...}; a longer query intersects its trigrams
+        self.by_gram: Dict[str, Set[str]] = {}
+        for z in self.zones:
+            name = z.lower()
+            for n in (1, 2, 3):
+                for i in range(len(name) - n + 1):
+                    self.by_gram.setdefault(name[i:i + n], set()).add(z)
+
+    @staticmethod
+    def _prefixed(table: List[Tuple[str, str]], prefix: str) -> List[str]:
+        i = bisect.bisect_left(table, (prefix, ""))
+        out = []
+        while i < len(table) and table[i][0].startswith(prefix):
+            out.append(table[i][1])
+            i += 1
+        return out
+
+    def _ordered(self, zones) -> List[str]:
+        # common zones first, the rest alphabetically
+        return sorted(set(zones), key=lambda z: (self.rank.get(z, len(self.rank)), z))
+
+    @lru_cache(maxsize=2048)
+    def search(self, query: str) -> Tuple[Tuple[str, str], ...]:
+        """(label, zone) pairs for what has been typed so far, best first."""
+        q = query.strip().lower().replace(" ", "_")
+        if not q:
+            return tuple((z, z) for z in list(self.rank)[:MAX_CHOICES])
+
+        results: List[Tuple[str, str]] = []
+        seen = set()
+
+        def add(label: str, zone: str) -> None:
+            if zone not in seen and len(results) < MAX_CHOICES:
+                seen.add(zone)
+                results.append((label, zone))
+
+        for alias, zone in sorted(self.aliases.items()):
+            if alias.startswith(q):
+                add(f"{alias.upper()} ({zone})", zone)
+        for zone in self._ordered(self._prefixed(self.by_name, q)):
+            add(zone, zone)
+        for zone in self._ordered(self._prefixed(self.by_token, q)):
+            add(zone, zone)
+        if len(results) < MAX_CHOICES:
+            # anything else containing the text, as before
+            for zone in self._containing(q):
+                add(zone, zone)
+        return tuple(results)
+
+    def _containing(self, q: str) -> List[str]:
+        if len(q) <= 3:
+            return sorted(self.by_gram.get(q, ()))
+        grams = sorted((self.by_gram.get(q[i:i + 3], set()) for i in range(len(q) - 2)), key=len)
+        # every trigram present doesn't make a substring yet, so check the few left
+        return sorted(z for z in set.intersection(*grams) if q in z.lower())
+
+    def resolve(self, value: str) -> str:
+        """An alias typed straight into the option becomes its zone."""
+        return self.aliases.get(value.strip().lower(), value.strip())
+
+
+TIMEZONES = TimezoneIndex(available_timezones())
+
+# =========================================================
+# Birthday Scheduler
+# =========================================================
+
+# Event kinds, in the order they run when due at the same instant
+BDAY_START, BDAY_POST, BDAY_END = 0, 1, 2
+
+# Wake at least this often, to pick up edits made to birthdays.json on GitHub
+REINDEX_SECONDS = 15 * 60
+
+
+@lru_cache(maxsize=None)
+def _tz(name: Optional[str]) -> ZoneInfo:
+    try:
+        return ZoneInfo(name or "Europe/London")
+    except Exception:
+        return UK_TZ
+
+
+def _next_birthday(rec: Dict[str, Any], local_today: date) -> Optional[date]:
+    """The birthday on or after local_today. 29 February only comes round in leap years."""
+    for year in range(local_today.year, local_today.year + 9):
+        try:
+            day = date(year, int(rec["month"]), int(rec["day"]))
+        except ValueError:
+            continue
+        except (KeyError, TypeError):
+            return None
+        if day >= local_today:
+            return day
+    return None
+
+
+class BirthdayIndex:
+    """
+    Each birthday's next start of day, post time and end of day, as UTC
+    instants in a min-heap. Built from one version of birthdays.json.
+
+    Birthdays are bucketed by timezone, then by (month, day), so the local
+    date is worked out once per zone and "whose birthday is it" is a dict
+    lookup per zone.
+    """
+
+    def __init__(self, data: Dict[str, Any], now: datetime):
+        self.source = data
+        self.settings: Dict[str, Any] = data.get("settings", {})
+        self.birthdays: Dict[str, Dict[str, Any]] = data.get("birthdays", {})
+        self.post = dtime(int(self.settings.get("post_hour", 0)), int(self.settings.get("post_minute", 0)))
+        self.heap: List[Tuple[datetime, int, str, date]] = []  # (when, kind, user id, local date)
+
+        # local date (ISO) -> user ids already announced, for O(1) dedupe
+        self.announced: Dict[str, Set[int]] = {
+            day: set(uids) for day, uids in data.get("state", {}).get("announced", {}).items()
+        }
+
+        # zone name -> (month, day) -> user ids
+        self.zones: Dict[str, Dict[Tuple[int, int], List[str]]] = {}
+        for uid, rec in self.birthdays.items():
+            try:
+                month_day = (int(rec["month"]), int(rec["day"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+            zone = _tz(rec.get("timezone")).key
+            self.zones.setdefault(zone, {}).setdefault(month_day, []).append(uid)
+
+        for zone, days in self.zones.items():
+            tz = _tz(zone)
+            local_today = now.astimezone(tz).date()
+            for (month, day_of_month), uids in days.items():
+                day = _next_birthday({"month": month, "day": day_of_month}, local_today)
+                if day is not None:
+                    self._push(tz, day, uids)
+
+    def _push(self, tz: ZoneInfo, day: date, uids: List[str]) -> None:
+        instants = (
+            (BDAY_START, datetime.combine(day, dtime(0, 0), tz).astimezone(timezone.utc)),
+            (BDAY_POST, datetime.combine(day, self.post, tz).astimezone(timezone.utc)),
+            (BDAY_END, datetime.combine(day + timedelta(days=1), dtime(0, 0), tz).astimezone(timezone.utc)),
+        )
+        for uid in uids:
+            for kind, at in instants:
+                heapq.heappush(self.heap, (at, kind, uid, day))
+
+    def push_next(self, uid: str, now: datetime) -> None:
+        rec = self.birthdays.get(uid)
+        if not rec:
+            return
+        tz = _tz(rec.get("timezone"))
+        day = _next_birthday(rec, now.astimezone(tz).date())
+        if day is not None:
+            self._push(tz, day, [uid])
+
+    def celebrating(self, now: datetime) -> Set[str]:
+        """User ids whose birthday it is right now in their own timezone."""
+        out: Set[str] = set()
+        for zone, days in self.zones.items():
+            local = now.astimezone(_tz(zone))
+            out.update(days.get((local.month, local.day), ()))
+        return out
+
+
+class BirthdayScheduler:
+    """
+    One task that sleeps until the next due birthday event, instead of
+    re-reading birthdays.json every minute. Any save_data() re-plans it.
+    """
+
+    def __init__(self):
+        self.bot: Optional[discord.Client] = None
+        self.index: Optional[BirthdayIndex] = None
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, bot: discord.Client) -> None:
+        self.bot = bot
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def reschedule(self) -> None:
+        self.index = None
+        self._wake.set()
+
+    async def _run(self) -> None:
+        await self.bot.wait_until_ready()
+        while True:
+            self._wake.clear()
+            try:
+                delay = await self._run_due()
+            except Exception:
+                print("⚠️ birthdays: scheduler pass failed")
+                traceback.print_exc()
+                delay = 60
+            try:
+                await asyncio.wait_for(self._wake.wait(), max(0.0, delay))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run_due(self) -> float:
+        """Runs every event that is due; returns the seconds until the next one."""
+        data = await _DOC.read()
+        now = datetime.now(timezone.utc)
+        if self.index is None or self.index.source is not data:
+            self.index = BirthdayIndex(data, now)
+            await self._reconcile_roles(self.index, now)
+
+        index = self.index
+        while index.heap and index.heap[0][0] <= now:
+            at, kind, uid, day = heapq.heappop(index.heap)
+            await self._fire(index, kind, uid, day)
+            if kind == BDAY_END:
+                index.push_next(uid, at)
+
+        if not index.heap:
+            return REINDEX_SECONDS
+        until = (index.heap[0][0] - datetime.now(timezone.utc)).total_seconds()
+        return min(REINDEX_SECONDS, until)
+
+    async def _reconcile_roles(self, index: BirthdayIndex, now: datetime) -> None:
+        """Takes the role off anyone whose birthday ended while we weren't running."""
+        if not index.settings.get("enabled", True):
+            return
+        celebrating = index.celebrating(now)
+        for guild in self.bot.guilds:
+            role = guild.get_role(index.settings.get("birthday_role_id"))
+            if not role:
+                continue
+            for member in list(role.members):
+                if str(member.id) not in celebrating:
+                    try:
+                        await member.remove_roles(role)
+                    except Exception:
+                        pass
+
+    async def _fire(self, index: BirthdayIndex, kind: int, uid: str, day: date) -> None:
+        s = index.settings
+        if not s.get("enabled", True):
+            return
+
+        for guild in self.bot.guilds:
+            member = guild.get_member(int(uid))
+            if not member:
+                continue
+
+            if kind == BDAY_POST:
+                await self._announce(index, guild, member, day, index.birthdays[uid])
+                continue
+
+            role = guild.get_role(s.get("birthday_role_id"))
+            if not role:
+                continue
+            try:
+                if kind == BDAY_START and role not in member.roles:
+                    await member.add_roles(role)
+                elif kind == BDAY_END and role in member.roles:
+                    await member.remove_roles(role)
+            except Exception:
+                pass
+
+    async def _announce(self, index: BirthdayIndex, guild: discord.Guild, member: discord.Member, day: date, rec: Dict[str, Any]) -> None:
+        s = index.settings
+        if not s.get("announce", True):
+            return
+        channel = guild.get_channel(s.get("channel_id"))
+        if not channel:
+            return
+
+        announced = index.announced.setdefault(day.isoformat(), set())
+        if member.id in announced:
+            return
+
+        sent = await _send_announcement_like(
+            channel=channel,
+            settings=s,
+            members=[member],
+            local_date=day,
+            tz_label=rec.get("timezone", "UTC"),
+            test_mode=False
+        )
+        if sent:
+            announced.add(member.id)
+            data = await load_data()
+            data["state"]["announced"].setdefault(day.isoformat(), []).append(member.id)
+            await save_data(data)
+
+
+_SCHEDULER = BirthdayScheduler()
+
 # =========================================================
 # Setup & Commands
 # =========================================================
@@ -172,10 +550,9 @@ def setup(bot: discord.Client):
         current: str
     ) -> List[app_commands.Choice[str]]:
         return [
-            app_commands.Choice(name=t, value=t)
-            for t in sorted(available_timezones())
-            if current.lower() in t.lower()
-        ][:25]
+            app_commands.Choice(name=label, value=zone)
+            for label, zone in TIMEZONES.search(current)
+        ]
 
     @group.command(name="set", description="Add or update a birthday")
     @app_commands.autocomplete(timezone=tz_autocomplete)
@@ -187,15 +564,15 @@ def setup(bot: discord.Client):
         user: Optional[discord.Member] = None
     ):
         target = user or interaction.user
-        data, sha = await load_data()
+        data = await load_data()
 
         data["birthdays"][str(target.id)] = {
             "day": day,
             "month": month,
-            "timezone": timezone
+            "timezone": TIMEZONES.resolve(timezone)
         }
 
-        await save_data(data, sha)
+        await save_data(data)
         await interaction.response.send_message(
             f"✅ Birthday for **{target.display_name}** set to **{day}/{month}**.",
             ephemeral=False
@@ -207,11 +584,11 @@ def setup(bot: discord.Client):
         user: Optional[discord.Member] = None
     ):
         target = user or interaction.user
-        data, sha = await load_data()
+        data = await load_data()
 
         if str(target.id) in data["birthdays"]:
             del data["birthdays"][str(target.id)]
-            await save_data(data, sha)
+            await save_data(data)
             await interaction.response.send_message(
                 f"🗑️ Removed birthday for **{target.display_name}**.",
                 ephemeral=False
@@ -221,7 +598,7 @@ def setup(bot: discord.Client):
 
     @group.command(name="list", description="List all server birthdays")
     async def b_list(interaction: discord.Interaction):
-        data, _ = await load_data()
+        data = await load_data()
         bdays = data.get("birthdays", {})
 
         if not bdays:
@@ -241,7 +618,7 @@ def setup(bot: discord.Client):
 
     @group.command(name="upcoming", description="Show the next 5 birthdays")
     async def b_upcoming(interaction: discord.Interaction):
-        data, _ = await load_data()
+        data = await load_data()
         bdays = data.get("birthdays", {})
         today = date.today()
 
@@ -285,79 +662,7 @@ def setup(bot: discord.Client):
         await interaction.response.send_message(embed=embed, ephemeral=False)
 
     # =====================================================
-    # Birthday Announcement Loop
+    # Birthday Scheduler
     # =====================================================
 
-    @tasks.loop(minutes=1)
-    async def birthday_tick():
-        now = datetime.now(timezone.utc)
-        data, sha = await load_data()
-        s = data.get("settings", {})
-
-        if not s.get("enabled", True):
-            return
-
-        announced = set(data.get("state", {}).get("announced_keys", []))
-        dirty = False
-
-        for guild in bot.guilds:
-            channel = guild.get_channel(s.get("channel_id"))
-            role = guild.get_role(s.get("birthday_role_id"))
-
-            for uid, rec in data.get("birthdays", {}).items():
-                member = guild.get_member(int(uid))
-                if not member:
-                    continue
-
-                try:
-                    local = now.astimezone(ZoneInfo(rec.get("timezone", "Europe/London")))
-                except Exception:
-                    local = now.astimezone(UK_TZ)
-
-                is_birthday = (
-                    rec["day"] == local.day and
-                    rec["month"] == local.month
-                )
-
-                # role assignment
-                if role:
-                    if is_birthday and role not in member.roles:
-                        await member.add_roles(role)
-                    elif not is_birthday and role in member.roles:
-                        await member.remove_roles(role)
-
-                # announcement
-                if (
-                    s.get("announce", True)
-                    and is_birthday
-                    and channel
-                    and (
-                        local.hour > s["post_hour"]
-                        or (local.hour == s["post_hour"] and local.minute >= s["post_minute"])
-                    )
-                ):
-                    key = f"{local.date().isoformat()}|{uid}|ann"
-                    if key not in announced:
-                        sent = await _send_announcement_like(
-                            channel=channel,
-                            settings=s,
-                            members=[member],
-                            local_date=local.date(),
-                            tz_label=rec.get("timezone", "UTC"),
-                            test_mode=False
-                        )
-                        if sent:
-                            announced.add(key)
-                            dirty = True
-
-        if dirty:
-            data["state"]["announced_keys"] = list(announced)
-            await save_data(data, sha)
-
-    @birthday_tick.before_loop
-    async def before():
-        await bot.wait_until_ready()
-
-    if not hasattr(bot, "_birthday_tick_started"):
-        birthday_tick.start()
-        bot._birthday_tick_started = True
\ No newline at end of file
+    _SCHEDULER.start(bot)
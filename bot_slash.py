@@ -3,10 +3,14 @@ from discord.ext import tasks
 from discord import app_commands
 import pytz
 import os
-from flask import Flask
-from threading import Thread
-
-from joinleave import WelcomeSystem
+import time
+import signal
+import asyncio
+
+from joinleave import WelcomeSystem, BOOST_MESSAGE_TYPES
+from event_router import EventRouter, STOP
+from audit_correlator import AuditLogCorrelator
+from join_burst import record_join
 from adminsettings import setup_admin_settings
 from image_linker import setup as image_linker_setup
 from snipe import setup as snipe_setup
@@ -26,10 +30,24 @@ from birthdays import setup as birthdays_setup
 # ✅ MUTE SYSTEM IMPORT
 from mute import check_and_handle_message
 
+# 🗂️ SHARED GITHUB DOCUMENT STORE
+from document_store import store
+
+# 📈 METRICS + HEALTH ENDPOINTS
+import health
+import metrics
+from loop_watchdog import LoopWatchdog
+from metrics import InstrumentedCommandTree
+
+# 🛂 NATIVE COMMAND PERMISSIONS
+import command_permissions
+
 # ===== CONFIG =====
 TOKEN = os.getenv("TOKEN")
 UK_TZ = pytz.timezone("Europe/London")
 
+store.trace_configs.append(metrics.http_trace())  # GitHub calls, for /metrics
+
 # ===== Discord Client =====
 intents = discord.Intents.default()
 intents.members = True
@@ -38,40 +56,66 @@ intents.message_content = True
 
 class ThePilot(discord.Client):
     def __init__(self):
-        super().__init__(intents=intents)
-        self.tree = app_commands.CommandTree(self)
-        self.joinleave = WelcomeSystem(self)
-
-    # ---------------- MEMBER JOIN ----------------
-    async def on_member_join(self, member: discord.Member):
-        await self.joinleave.on_member_join(member)
-        await apply_auto_roles(member)
-
-    # ---------------- MEMBER REMOVE ----------------
-    async def on_member_remove(self, member: discord.Member):
-        await self.joinleave.on_member_remove(member)
-
-    # ---------------- MEMBER BAN ----------------
-    async def on_member_ban(self, guild: discord.Guild, user: discord.User):
-        await self.joinleave.on_member_ban(guild, user)
-
-    # ---------------- MESSAGE LISTENER (BOOSTS + MUTES) ----------------
-    async def on_message(self, message: discord.Message):
-        # ✅ Check mute status first. If handled, stop processing.
+        # http_trace times every Discord REST call for /metrics
+        super().__init__(intents=intents, http_trace=metrics.http_trace())
+        self.tree = InstrumentedCommandTree(self)
+        self.audit_log = AuditLogCorrelator()
+        self.joinleave = WelcomeSystem(self, self.audit_log)
+        self.prefetch_report = None
+        self.documents_warmed = False
+        self.tree_synced = False
+        self.web_runner = None
+        self.watchdog = LoopWatchdog(self)
+
+        # Every feature registers its gateway handlers here (never bot.on_message = ...)
+        self.router = EventRouter()
+
+        # ✅ Check mute status first. If handled, later message routes are skipped.
+        self.router.add("message", self._mute_guard, bots=False)
+
+        # ✅ Boosts
+        self.router.add("message", self.joinleave.on_message, types=BOOST_MESSAGE_TYPES)
+
+        # ✅ Audit-log entries pushed by the gateway (who kicked / banned / added a bot)
+        self.router.add("audit_log_entry_create", self.audit_log.on_entry)
+
+        # ✅ Member join / remove / ban (join velocity first: it switches the others to burst mode)
+        self.router.add("member_join", record_join)
+        self.router.add("member_join", self.joinleave.on_member_join)
+        self.router.add("member_join", apply_auto_roles)
+        self.router.add("member_remove", self.joinleave.on_member_remove)
+        self.router.add("member_ban", self.joinleave.on_member_ban)
+
+    def dispatch(self, event_name: str, /, *args, **kwargs):
+        super().dispatch(event_name, *args, **kwargs)
+        self.router.dispatch(event_name, *args)
+
+    # ---------------- MESSAGE GUARD (MUTES) ----------------
+    async def _mute_guard(self, message: discord.Message):
         was_muted = await check_and_handle_message(self, message)
         if was_muted:
-            return
-
-        # ✅ Process Boosts/Join-Leave logic
-        await self.joinleave.on_message(message)
+            return STOP
 
 
     # ---------------- SETUP ----------------
     async def setup_hook(self):
 
+        # Health / readiness / metrics server, on this loop (binds the port first thing)
+        self.web_runner = await health.start(self)
+
+        # Loop lag + blocking-call detector
+        self.watchdog.start()
+
         # Start scheduled loop
         scheduled_tasks.start(self)
 
+        # Render stops us with SIGTERM: close cleanly so queued document writes flush
+        try:
+            loop = asyncio.get_running_loop()
+            loop.add_signal_handler(signal.SIGTERM, lambda: loop.create_task(self.close()))
+        except (NotImplementedError, RuntimeError):
+            pass
+
 
         from mute import setup_mute_commands # Note: removed install_mute_listener here
         from bot_warnings import setup_warnings_commands
@@ -102,9 +146,39 @@ class ThePilot(discord.Client):
         # ✅ Role / Emoji tools
         role_tools_setup(self.tree)
 
+        # 🗂️ Warm every registered document at once, before the first command
+        started = time.perf_counter()
+        self.prefetch_report = report = await store.prefetch()
+        total_ms = (time.perf_counter() - started) * 1000
+        print(
+            f"📦 Prefetched {len(report.cached) + len(report.fetched)} documents in {total_ms:.0f} ms "
+            f"({len(report.cached)} cache hits, {len(report.fetched)} from GitHub, {len(report.pending)} still loading)"
+        )
+        for path, secs in sorted(report.fetched.items(), key=lambda kv: kv[1], reverse=True):
+            print(f"   {path}: {secs * 1000:.0f} ms from GitHub")
+        for path, secs in sorted(report.cached.items(), key=lambda kv: kv[1], reverse=True):
+            print(f"   {path}: {secs * 1000:.0f} ms cache hit")
+        # the cold fetches have landed or hit PREFETCH_TIMEOUT_SECONDS;
+        # revalidating the cache hits carries on behind and logs on its own
+        self.documents_warmed = True
+
+        # 💎 Boost windows still open when the last run stopped
+        await self.joinleave.boost_windows.start()
+
 
         # Sync once
-        await self.tree.sync()
+        command_permissions.remember_commands(await self.tree.sync())
+        self.tree_synced = True
+        command_permissions.schedule_sync(self)
+
+    # ---------------- SHUTDOWN ----------------
+    async def close(self):
+        # flushes any write-behind saves still waiting for their window
+        self.watchdog.stop()
+        await store.close()
+        if self.web_runner:
+            await self.web_runner.cleanup()
+        await super().close()
 
 
 client = ThePilot()
@@ -124,19 +198,4 @@ async def scheduled_tasks(bot_client: ThePilot):
             pass
 
 
-# ===== Flask keep-alive =====
-app = Flask("pilot")
-
-@app.route("/")
-def home():
-    return "✈️ The Pilot Bot is alive!"
-
-
-def run_flask():
-    port = int(os.environ.get("PORT", 8080))
-    app.run(host="0.0.0.0", port=port)
-
-
-Thread(target=run_flask, daemon=True).start()
-
 client.run(TOKEN)
\ No newline at end of file
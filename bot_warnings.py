@@ -1,8 +1,6 @@
 # bot_warnings.py
-import os
-import json
-import base64
-import requests
+import copy
+import asyncio
 import discord
 import random
 from discord import app_commands
@@ -10,12 +8,15 @@ from datetime import datetime
 from typing import List, Optional, Literal, Tuple
 
 from permissions import has_app_access
+from document_store import store
 
 # ------------------- GitHub Config -------------------
-GITHUB_REPO = os.getenv("GITHUB_REPO", "saraargh/the-pilot")
 GITHUB_FILE_PATH = "warnings.json"
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-HEADERS = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
+JOURNAL_FILE_PATH = "warnings_journal.json"
+
+# Fold the journal into warnings.json once it gets this long, or on the interval
+COMPACT_EVERY_EVENTS = 200
+COMPACT_INTERVAL_SECONDS = 60 * 60
 
 # ------------------- Roles (logic roles, not permissions) -------------------
 PASSENGERS_ROLE_ID = 1404100554807971971
@@ -29,7 +30,8 @@ DEFAULT_DATA = {
     "blocked_warners": [],   # user IDs blocked from warning
     "ffa_enabled": False,    # False=restricted, True=free_for_all
     "last_reset": None,
-    "extra_var": None
+    "extra_var": None,
+    "journal_seq": 0
 }
 
 # ------------------- Helpers -------------------
@@ -40,9 +42,6 @@ def ordinal(n: int) -> str:
         suffix = {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
     return f"{n}{suffix}"
 
-def _gh_url():
-    return f"https://api.github.com/repos/{GITHUB_REPO}/contents/{GITHUB_FILE_PATH}"
-
 def _chunk(items: List[str], size: int) -> List[List[str]]:
     return [items[i:i + size] for i in range(0, len(items), size)]
 
@@ -76,79 +75,160 @@ async def reply(
 
 
 # ------------------- GitHub Load / Save -------------------
-def load_data() -> Tuple[dict, Optional[str]]:
-    try:
-        r = requests.get(_gh_url(), headers=HEADERS, timeout=10)
-        if r.status_code == 200:
-            content = r.json()
-            raw = base64.b64decode(content["content"]).decode()
-            data = json.loads(raw) if raw.strip() else DEFAULT_DATA.copy()
-
-            data.setdefault("warnings", {})
-            data.setdefault("blocked_warners", [])
-            data.setdefault("ffa_enabled", False)
-            data.setdefault("last_reset", None)
-            data.setdefault("extra_var", None)
-
-            return data, content.get("sha")
-
-        if r.status_code == 404:
-            sha = save_data(DEFAULT_DATA.copy(), sha=None)
-            return DEFAULT_DATA.copy(), sha
-
-        sha = save_data(DEFAULT_DATA.copy(), sha=None)
-        return DEFAULT_DATA.copy(), sha
-
-    except Exception:
-        sha = save_data(DEFAULT_DATA.copy(), sha=None)
-        return DEFAULT_DATA.copy(), sha
-
-def save_data(data: dict, sha: Optional[str] = None) -> Optional[str]:
-    payload = {
-        "message": "Update warnings.json",
-        "content": base64.b64encode(json.dumps(data, indent=4).encode()).decode()
-    }
-    if sha:
-        payload["sha"] = sha
-
-    try:
-        r = requests.put(_gh_url(), headers=HEADERS, data=json.dumps(payload), timeout=10)
-
-        if r.status_code in (200, 201):
-            return r.json().get("content", {}).get("sha")
-
-        # stale sha -> 409 (retry once with fresh sha)
-        if r.status_code == 409:
-            _, fresh_sha = load_data()
-            payload["sha"] = fresh_sha
-            r2 = requests.put(_gh_url(), headers=HEADERS, data=json.dumps(payload), timeout=10)
-            if r2.status_code in (200, 201):
-                return r2.json().get("content", {}).get("sha")
-
-    except Exception:
-        pass
-
-    return sha
+# warnings.json is a snapshot. Every change since the snapshot is an event
+# appended to warnings_journal.json, and commands read an in-memory
+# projection (snapshot + journal). The compactor folds the journal back into
+# the snapshot, so each write only touches the short journal.
+def _ensure_shape(data: dict) -> dict:
+    data.setdefault("warnings", {})
+    data.setdefault("blocked_warners", [])
+    data.setdefault("ffa_enabled", False)
+    data.setdefault("last_reset", None)
+    data.setdefault("extra_var", None)
+    data.setdefault("journal_seq", 0)  # last journal event folded into this snapshot
+    return data
+
+def _ensure_journal_shape(data: dict) -> dict:
+    if not isinstance(data.get("events"), list):
+        data["events"] = []
+    return data
+
+_DOC = store.document(
+    GITHUB_FILE_PATH,
+    default=lambda: copy.deepcopy(DEFAULT_DATA),
+    normalize=_ensure_shape,
+    message="Update warnings.json",
+    schema="warnings",
+)
+
+_JOURNAL = store.document(
+    JOURNAL_FILE_PATH,
+    default=lambda: {"events": []},
+    normalize=_ensure_journal_shape,
+    message="Append to warnings journal",
+    schema="warnings_journal",
+)
+
+def _apply(state: dict, ev: dict) -> None:
+    op = ev.get("op")
+    if op == "warn":
+        state["warnings"].setdefault(ev["user"], []).append(ev["reason"])
+    elif op == "clear_user":
+        state["warnings"].pop(ev["user"], None)
+        state["last_reset"] = ev["at"]
+    elif op == "clear_server":
+        for uid in ev["users"]:
+            state["warnings"].pop(uid, None)
+        state["last_reset"] = ev["at"]
+    elif op == "block":
+        if ev["user"] not in state["blocked_warners"]:
+            state["blocked_warners"].append(ev["user"])
+    elif op == "unblock":
+        if ev["user"] in state["blocked_warners"]:
+            state["blocked_warners"].remove(ev["user"])
+    elif op == "mode":
+        state["ffa_enabled"] = bool(ev["ffa_enabled"])
+
+class WarningJournal:
+    def __init__(self):
+        self.state: Optional[dict] = None
+        self.seq = 0
+        self._lock = asyncio.Lock()
+        self._compactor: Optional[asyncio.Task] = None
+
+    async def projection(self) -> dict:
+        """The live projection. Do not mutate; go through append()."""
+        if self.state is None:
+            async with self._lock:
+                if self.state is None:
+                    await self._rebuild()
+        return self.state
+
+    async def _rebuild(self) -> None:
+        # the projection is built once, so don't build it from a warm-cache copy
+        for doc in (_DOC, _JOURNAL):
+            try:
+                await doc.refresh()
+            except Exception:
+                pass
+
+        state = await _DOC.load()
+        journal = await _JOURNAL.load()
+        self.seq = state["journal_seq"]
+        for ev in journal["events"]:
+            # events already folded into the snapshot are skipped, so a
+            # compaction that only half-landed can't double-apply anything
+            if ev.get("seq", 0) > state["journal_seq"]:
+                _apply(state, ev)
+                self.seq = ev["seq"]
+        self.state = state
+
+    async def append(self, op: str, **fields) -> dict:
+        state = await self.projection()
+        async with self._lock:
+            self.seq += 1
+            ev = {"seq": self.seq, "op": op, "at": datetime.utcnow().isoformat(), **fields}
+            _apply(state, ev)
+            # only the event is copied and written, not the journal so far
+            await _JOURNAL.append("events", ev)
+            pending = len(_JOURNAL.peek()["events"])
+
+        self._ensure_compactor()
+        if pending >= COMPACT_EVERY_EVENTS:
+            asyncio.get_running_loop().create_task(self.compact())
+        return state
+
+    async def compact(self) -> None:
+        # The snapshot has to be on GitHub before the journal drops the
+        # events it folded in: the other order loses them if we stop in
+        # between. Until the trim lands, _rebuild skips them by seq.
+        try:
+            async with self._lock:
+                journal = await _JOURNAL.read()
+                if not journal["events"] or self.state is None:
+                    return
+
+                self.state["journal_seq"] = folded = self.seq
+                await _DOC.save(self.state, message="Compact warnings journal")
+            await _DOC.flush()
+        except Exception as e:
+            print(f"⚠️ warnings: journal compaction failed: {e}")
+            return
 
-# ------------------- Warning Operations -------------------
-def add_warning(user_id: int, reason: str | None = None) -> int:
-    data, sha = load_data()
-    uid = str(user_id)
+        async with self._lock:
+            journal = await _JOURNAL.load()
+            journal["events"] = [ev for ev in journal["events"] if ev.get("seq", 0) > folded]
+            await _JOURNAL.save(journal, message="Compact warnings journal")
+
+    def _ensure_compactor(self) -> None:
+        if self._compactor and not self._compactor.done():
+            return
 
-    if uid not in data["warnings"]:
-        data["warnings"][uid] = []
+        async def _run():
+            while True:
+                await asyncio.sleep(COMPACT_INTERVAL_SECONDS)
+                await self.compact()
 
-    data["warnings"][uid].append(reason or "No reason provided")
-    save_data(data, sha)
-    return len(data["warnings"][uid])
+        self._compactor = asyncio.get_running_loop().create_task(_run())
 
-def get_warnings(user_id: int) -> List[str]:
-    data, _ = load_data()
-    return data["warnings"].get(str(user_id), [])
+_journal = WarningJournal()
 
-def get_all_warnings() -> dict:
-    data, _ = load_data()
-    return data["warnings"]
+async def load_data() -> dict:
+    return copy.deepcopy(await _journal.projection())
+
+# ------------------- Warning Operations -------------------
+async def add_warning(user_id: int, reason: str | None = None) -> int:
+    uid = str(user_id)
+    state = await _journal.append("warn", user=uid, reason=reason or "No reason provided")
+    return len(state["warnings"][uid])
+
+async def get_warnings(user_id: int) -> List[str]:
+    state = await _journal.projection()
+    return list(state["warnings"].get(str(user_id), []))
+
+async def get_all_warnings() -> dict:
+    state = await _journal.projection()
+    return state["warnings"]
 
 # ------------------- Dropdown Pagination -------------------
 class PageSelect(discord.ui.Select):
@@ -197,8 +277,8 @@ def build_warnings_list_embeds(target: discord.Member, warns: List[str], per_pag
         embeds.append(e)
     return embeds
 
-def build_server_warnings_embeds(interaction: discord.Interaction, per_page: int = 10) -> Tuple[List[discord.Embed], int]:
-    all_warns = get_all_warnings()
+async def build_server_warnings_embeds(interaction: discord.Interaction, per_page: int = 10) -> Tuple[List[discord.Embed], int]:
+    all_warns = await get_all_warnings()
 
     rows: List[Tuple[str, int]] = []
     for uid, warns in all_warns.items():
@@ -228,50 +308,42 @@ def setup_warnings_commands(tree: app_commands.CommandTree):
     @tree.command(name="warningsmode", description="Set how warnings work on this server.")
     @app_commands.describe(mode="restricted = fun rules, free_for_all = anyone can warn anyone")
     async def warningsmode(interaction: discord.Interaction, mode: Literal["restricted", "free_for_all"]):
-        if not has_app_access(interaction.user, "warnings"):
+        if not await has_app_access(interaction.user, "warnings"):
             await reply(interaction, "❌ You do not have permission to change warning mode.", ephemeral=False)
             return
 
-        data, sha = load_data()
-
         if mode == "free_for_all":
-            data["ffa_enabled"] = True
-            save_data(data, sha)
+            await _journal.append("mode", ffa_enabled=True)
             await reply(interaction, "🔓 **Warnings free for all enabled** - Anyone can warn anyone.", ephemeral=False)
         else:
-            data["ffa_enabled"] = False
-            save_data(data, sha)
+            await _journal.append("mode", ffa_enabled=False)
             await reply(interaction, "🔒 **Warning restrictions enabled**", ephemeral=False)
 
     # ---------------- /block_warner ----------------
     @tree.command(name="block_warner", description="Stop a user from being allowed to warn.")
     async def block_warner(interaction: discord.Interaction, member: discord.Member):
-        if not has_app_access(interaction.user, "warnings"):
+        if not await has_app_access(interaction.user, "warnings"):
             await reply(interaction, "❌ You do not have permission to block warners.", ephemeral=False)
             return
 
-        data, sha = load_data()
-        data.setdefault("blocked_warners", [])
+        data = await _journal.projection()
 
         if member.id not in data["blocked_warners"]:
-            data["blocked_warners"].append(member.id)
-            save_data(data, sha)
+            await _journal.append("block", user=member.id)
 
         await reply(interaction, f"🚫 {member.mention} is no longer allowed to warn people.", ephemeral=False)
 
     # ---------------- /unblock_warner ----------------
     @tree.command(name="unblock_warner", description="Allow a user to warn again.")
     async def unblock_warner(interaction: discord.Interaction, member: discord.Member):
-        if not has_app_access(interaction.user, "warnings"):
+        if not await has_app_access(interaction.user, "warnings"):
             await reply(interaction, "❌ You do not have permission to unblock warners.", ephemeral=False)
             return
 
-        data, sha = load_data()
-        data.setdefault("blocked_warners", [])
+        data = await _journal.projection()
 
         if member.id in data["blocked_warners"]:
-            data["blocked_warners"].remove(member.id)
-            save_data(data, sha)
+            await _journal.append("unblock", user=member.id)
 
         await reply(interaction, f"✅ {member.mention} can warn again.", ephemeral=False)
 
@@ -284,7 +356,7 @@ def setup_warnings_commands(tree: app_commands.CommandTree):
         author_roles = {r.id for r in author.roles}
         target_roles = {r.id for r in member.roles}
 
-        data, _ = load_data()
+        data = await _journal.projection()
         ffa_enabled = bool(data.get("ffa_enabled", False))
 
         # 🚫 BLOCKED WARNER (applies in all modes)
@@ -308,7 +380,7 @@ def setup_warnings_commands(tree: app_commands.CommandTree):
             chosen = random.choice(candidates)
 
             reason_text = f"{author.mention} couldn’t warn themselves, so the pilot gave it to {chosen.mention}"
-            add_warning(chosen.id, reason_text)
+            await add_warning(chosen.id, reason_text)
 
             await reply(
                 interaction,
@@ -330,7 +402,7 @@ def setup_warnings_commands(tree: app_commands.CommandTree):
 
         # ---------------- FREE FOR ALL MODE ----------------
         if ffa_enabled:
-            count = add_warning(member.id, reason)
+            count = await add_warning(member.id, reason)
             msg = f"⚠️ {member.mention} was warned"
             if reason:
                 msg += f" for {reason}"
@@ -342,7 +414,7 @@ def setup_warnings_commands(tree: app_commands.CommandTree):
 
         # PASSENGER → WILLIAM allowed
         if PASSENGERS_ROLE_ID in author_roles and WILLIAM_ROLE_ID in target_roles:
-            count = add_warning(member.id, reason)
+            count = await add_warning(member.id, reason)
             msg = f"⚠️ {member.mention} was warned"
             if reason:
                 msg += f" for {reason}"
@@ -351,12 +423,12 @@ def setup_warnings_commands(tree: app_commands.CommandTree):
             return
 
         # Permission check for restricted mode
-        if not has_app_access(author, "warnings"):
+        if not await has_app_access(author, "warnings"):
 
             # Passenger punishment (NOT William)
             if PASSENGERS_ROLE_ID in author_roles:
                 reason_text = f"Trying to warn {member.mention}"
-                count = add_warning(author.id, reason_text)
+                count = await add_warning(author.id, reason_text)
 
                 await reply(
                     interaction,
@@ -371,7 +443,7 @@ def setup_warnings_commands(tree: app_commands.CommandTree):
             return
 
         # Normal restricted-mode warn (allowed roles)
-        count = add_warning(member.id, reason)
+        count = await add_warning(member.id, reason)
         msg = f"⚠️ {member.mention} was warned"
         if reason:
             msg += f" for {reason}"
@@ -383,7 +455,7 @@ def setup_warnings_commands(tree: app_commands.CommandTree):
     @app_commands.describe(member="Member to see warnings for (optional)")
     async def warnings_list(interaction: discord.Interaction, member: Optional[discord.Member] = None):
         target = member or interaction.user
-        warns = get_warnings(target.id)
+        warns = await get_warnings(target.id)
 
         embeds = build_warnings_list_embeds(target, warns, per_page=10)
         view = PagedEmbedView(embeds, per_page=10, total_items=len(warns))
@@ -392,7 +464,7 @@ def setup_warnings_commands(tree: app_commands.CommandTree):
     # ---------------- /server_warnings (embed + dropdown pages) ----------------
     @tree.command(name="server_warnings", description="Show all warnings on this server (counts only).")
     async def server_warnings(interaction: discord.Interaction):
-        embeds, total_items = build_server_warnings_embeds(interaction, per_page=10)
+        embeds, total_items = await build_server_warnings_embeds(interaction, per_page=10)
         view = PagedEmbedView(embeds, per_page=10, total_items=total_items)
         await reply(interaction, embed=embeds[0], view=view, ephemeral=False)
 
@@ -401,13 +473,13 @@ def setup_warnings_commands(tree: app_commands.CommandTree):
     @app_commands.describe(member="Member to clear warnings for")
     async def clear_warnings(interaction: discord.Interaction, member: discord.Member):
 
-        if not has_app_access(interaction.user, "warnings"):
+        if not await has_app_access(interaction.user, "warnings"):
             await reply(interaction, "❌ You do not have permission to clear warnings.", ephemeral=False)
             return
 
         if member.id == interaction.user.id:
             reason_text = "Trying to remove their warnings"
-            count = add_warning(interaction.user.id, reason_text)
+            count = await add_warning(interaction.user.id, reason_text)
 
             await reply(
                 interaction,
@@ -417,13 +489,11 @@ def setup_warnings_commands(tree: app_commands.CommandTree):
             )
             return
 
-        data, sha = load_data()
+        data = await _journal.projection()
         uid = str(member.id)
 
         if uid in data["warnings"]:
-            data["warnings"].pop(uid)
-            data["last_reset"] = datetime.utcnow().isoformat()
-            save_data(data, sha)
+            await _journal.append("clear_user", user=uid)
             await reply(interaction, f"✅ All warnings for {member.mention} have been cleared.", ephemeral=False)
         else:
             await reply(interaction, f"{member.mention} has no warnings to clear.", ephemeral=False)
@@ -432,20 +502,15 @@ def setup_warnings_commands(tree: app_commands.CommandTree):
     @tree.command(name="clear_server_warnings", description="Clear all warnings for the server.")
     async def clear_server_warnings(interaction: discord.Interaction):
 
-        if not has_app_access(interaction.user, "warnings"):
+        if not await has_app_access(interaction.user, "warnings"):
             await reply(interaction, "❌ You do not have permission to clear server warnings.", ephemeral=False)
             return
 
-        data, sha = load_data()
+        data = await _journal.projection()
         guild_member_ids = {str(m.id) for m in interaction.guild.members}
-        removed = 0
-
-        for uid in list(data["warnings"].keys()):
-            if uid in guild_member_ids:
-                data["warnings"].pop(uid)
-                removed += 1
+        cleared = [uid for uid in data["warnings"] if uid in guild_member_ids]
+        removed = len(cleared)
 
-        data["last_reset"] = datetime.utcnow().isoformat()
-        save_data(data, sha)
+        await _journal.append("clear_server", users=cleared)
 
         await reply(interaction, f"✅ Cleared {removed} warnings from the server.", ephemeral=False)
\ No newline at end of file
@@ -0,0 +1,153 @@
+# command_permissions.py
+# Mirrors the Pilot role scopes (SCOPES in adminsettings.py, stored in
+# pilot_settings.json) onto Discord's own application-command permissions,
+# so members without access never see or fire the gated commands.
+# The in-command has_app_access checks stay as the source of truth.
+#
+# Discord only accepts these edits with an OAuth2 *user* bearer token that
+# has the applications.commands.permissions.update scope (bot tokens are
+# refused), so the sync is skipped unless DISCORD_COMMAND_PERMISSIONS_TOKEN
+# is set.
+
+from __future__ import annotations
+
+import os
+import asyncio
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+import discord
+from discord import app_commands
+
+from permissions import OVERRIDE_ROLE_ID, load_settings
+
+DISCORD_API_BASE = "https://discord.com/api/v10"
+PERMISSIONS_TOKEN = os.getenv("DISCORD_COMMAND_PERMISSIONS_TOKEN")
+
+# Wait this long after a panel edit so a burst of edits is pushed once
+SYNC_DELAY_SECONDS = 3
+
+# top-level command name -> SCOPES key that gates it
+COMMAND_SCOPES: Dict[str, str] = {
+    "pilotsettings": "global",
+    "rolesettings": "global",
+    "rolepull": "global",
+    "emojipull": "global",
+    "timeout": "mute",
+    "untimeout": "mute",
+    "warningsmode": "warnings",
+    "block_warner": "warnings",
+    "unblock_warner": "warnings",
+    "clear_warnings": "warnings",
+    "clear_server_warnings": "warnings",
+    "clearpoo": "poo_goat",
+    "assignpoo": "poo_goat",
+    "removepoo": "poo_goat",
+    "testpoo": "poo_goat",
+    "cleargoat": "poo_goat",
+    "assigngoat": "poo_goat",
+    "removegoat": "poo_goat",
+    "testgoat": "poo_goat",
+}
+
+ROLE_PERMISSION = 1  # ApplicationCommandPermissionType.ROLE
+MAX_OVERWRITES = 100  # Discord's cap per command
+
+_command_ids: Dict[str, int] = {}
+_pushed: Dict[Tuple[int, int], List[dict]] = {}  # (guild id, command id) -> last overwrites sent
+_sync_task: Optional[asyncio.Task] = None
+_sync_requested = False  # set when an edit arrives while a push is running
+
+
+def remember_commands(commands: Iterable[app_commands.AppCommand]) -> None:
+    """Call with the result of tree.sync(); overwrites are set per command id."""
+    for cmd in commands:
+        _command_ids[cmd.name] = cmd.id
+
+
+def build_overwrites(settings: Dict, guild_id: int, scope: str) -> List[dict]:
+    roles = {OVERRIDE_ROLE_ID, *settings.get("global_allowed_roles", [])}
+    if scope != "global":
+        roles.update(settings.get("apps", {}).get(scope, {}).get("allowed_roles", []))
+
+    # the @everyone role shares the guild's id: deny it, then allow the scope
+    overwrites = [{"id": str(guild_id), "type": ROLE_PERMISSION, "permission": False}]
+    overwrites += [
+        {"id": str(rid), "type": ROLE_PERMISSION, "permission": True}
+        for rid in sorted({int(r) for r in roles})
+    ]
+    return overwrites[:MAX_OVERWRITES]
+
+
+async def sync_guild(client: discord.Client, guild: discord.Guild, session: aiohttp.ClientSession) -> int:
+    """Pushes the overwrites that changed since the last push. Returns how many were sent."""
+    settings = await load_settings()
+    sent = 0
+
+    for name, scope in COMMAND_SCOPES.items():
+        cid = _command_ids.get(name)
+        if not cid:
+            continue
+
+        overwrites = build_overwrites(settings, guild.id, scope)
+        if _pushed.get((guild.id, cid)) == overwrites:
+            continue
+
+        url = f"{DISCORD_API_BASE}/applications/{client.application_id}/guilds/{guild.id}/commands/{cid}/permissions"
+        for attempt in range(2):
+            async with session.put(url, json={"permissions": overwrites}) as r:
+                if r.status == 429:
+                    retry_after = (await r.json(content_type=None) or {}).get("retry_after", 1)
+                    if attempt == 1:
+                        print(f"⚠️ command permissions: /{name} in {guild.name} still rate limited (retry after {retry_after}s), giving up")
+                        break
+                    await asyncio.sleep(float(retry_after))
+                    continue
+                if r.status >= 400:
+                    print(f"⚠️ command permissions: /{name} in {guild.name} failed: {r.status} {await r.text()}")
+                else:
+                    _pushed[(guild.id, cid)] = overwrites
+                    sent += 1
+                break
+
+    return sent
+
+
+async def sync_all(client: discord.Client) -> None:
+    if not PERMISSIONS_TOKEN or not _command_ids:
+        return
+
+    headers = {"Authorization": f"Bearer {PERMISSIONS_TOKEN}"}
+    async with aiohttp.ClientSession(headers=headers, timeout=aiohttp.ClientTimeout(total=15)) as session:
+        for guild in client.guilds:
+            try:
+                sent = await sync_guild(client, guild, session)
+            except Exception as e:
+                print(f"⚠️ command permissions: syncing {guild.name} failed: {e}")
+                continue
+            if sent:
+                print(f"🛂 Pushed command permissions for {sent} commands in {guild.name}")
+
+
+def schedule_sync(client: discord.Client) -> None:
+    """Queues a sync (after the bot is ready, and after SYNC_DELAY_SECONDS)."""
+    global _sync_task, _sync_requested
+    if not PERMISSIONS_TOKEN:
+        return
+    _sync_requested = True
+    if _sync_task and not _sync_task.done():
+        return  # the running task makes another pass
+
+    async def _run():
+        global _sync_requested
+        await client.wait_until_ready()
+        while _sync_requested:
+            await asyncio.sleep(SYNC_DELAY_SECONDS)
+            # edits from here on need a fresh pass, since this one may have read settings already
+            _sync_requested = False
+            try:
+                await sync_all(client)
+            except Exception as e:
+                print(f"⚠️ command permissions: sync failed: {e}")
+
+    _sync_task = asyncio.get_running_loop().create_task(_run())
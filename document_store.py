@@ -0,0 +1,877 @@
+# document_store.py
+# One async, GitHub-backed home for every JSON document The Pilot keeps.
+# Each document has a single authoritative in-memory copy (plus its sha).
+# Reads are served from memory and revalidated with conditional GETs.
+# With PILOT_STORAGE=sqlite the same documents live in a local database
+# instead (see sqlite_store.py); module code doesn't change.
+# Saves that belong together can share one Git commit: see DocumentStore.batch().
+# Every GitHub copy is mirrored to DOCSTORE_CACHE_DIR so a restart can serve
+# reads straight away and reconcile with GitHub in the background.
+
+from __future__ import annotations
+
+import os
+import json
+import copy
+import time
+import base64
+import asyncio
+import gzip
+import hashlib
+import contextlib
+import contextvars
+from collections import Counter
+from urllib.parse import quote
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import aiohttp
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+# =========================================================
+# GitHub Config
+# =========================================================
+
+GITHUB_REPO = os.getenv("GITHUB_REPO", "saraargh/the-pilot")
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+# Point at github_standin.py (e.g. http://127.0.0.1:8765) to run offline
+GITHUB_API_BASE = os.getenv("GITHUB_API_BASE", "https://api.github.com")
+# Branch every read and write goes to; unset = the repo's default branch.
+GITHUB_BRANCH = os.getenv("GITHUB_BRANCH")
+
+HEADERS = {"Accept": "application/vnd.github+json"}
+if GITHUB_TOKEN:
+    HEADERS["Authorization"] = f"token {GITHUB_TOKEN}"
+
+# How long a copy is served before a background conditional GET re-checks it.
+# 304 responses are cheap and don't count against the GitHub rate limit.
+REVALIDATE_SECONDS = float(os.getenv("DOCSTORE_REVALIDATE_SECONDS", "30"))
+
+# Write-behind window: every save inside it is coalesced into a single PUT.
+# 0 turns write-behind off (each save is written through immediately).
+WRITE_BEHIND_SECONDS = float(os.getenv("DOCSTORE_WRITE_BEHIND_SECONDS", "10"))
+REQUEST_TIMEOUT_SECONDS = 15
+# Longest startup waits on documents that have no cached or bundled copy
+PREFETCH_TIMEOUT_SECONDS = float(os.getenv("DOCSTORE_PREFETCH_TIMEOUT_SECONDS", "5"))
+
+# Local mirror of the GitHub copies ("" turns it off). The JSON files bundled
+# next to this module are the seed when there is no mirror yet.
+CACHE_DIR = os.getenv("DOCSTORE_CACHE_DIR", ".docstore_cache")
+SEED_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Stored documents are compact JSON. Files whose JSON is bigger than this many
+# bytes are written as a gzip+base64 envelope instead (0 = never compress).
+GZIP_MIN_BYTES = int(os.getenv("DOCSTORE_GZIP_MIN_BYTES", "0"))
+
+# "github" (default) or "sqlite"
+STORAGE_BACKEND = os.getenv("PILOT_STORAGE", "github").lower()
+SQLITE_PATH = os.getenv("PILOT_SQLITE_PATH", "pilot.db")
+
+
+class DocumentStoreError(RuntimeError):
+    pass
+
+
+# documents saved inside the current `async with store.batch(...)` block
+_BATCH: contextvars.ContextVar[Optional[Set["Document"]]] = contextvars.ContextVar("docstore_batch", default=None)
+
+
+_MISSING = object()
+
+
+def _merge_key(item: Any) -> str:
+    return json.dumps(item, sort_keys=True, ensure_ascii=False)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def merge3(base: Any, ours: Any, theirs: Any) -> Any:
+    """
+    Structural three-way merge of JSON values. A side that didn't change
+    from base takes the other side; dicts merge per key, lists keep their
+    additions and removals from both sides, counters take the max, and any
+    other real conflict goes to ours (the newest write).
+    """
+    if ours == theirs:
+        return ours
+    if ours == base:
+        return theirs
+    if theirs == base:
+        return ours
+
+    if isinstance(ours, dict) and isinstance(theirs, dict):
+        b = base if isinstance(base, dict) else {}
+        out = {}
+        for key in list(ours) + [k for k in theirs if k not in ours]:
+            o = ours.get(key, _MISSING)
+            t = theirs.get(key, _MISSING)
+            bb = b.get(key, _MISSING)
+            if o is _MISSING or t is _MISSING:
+                # deleted on one side: stays deleted unless the other side edited it
+                kept = t if o is _MISSING else o
+                if kept != bb:
+                    out[key] = kept
+                continue
+            out[key] = merge3(bb, o, t)
+        return out
+
+    if isinstance(ours, list) and isinstance(theirs, list):
+        b = base if isinstance(base, list) else []
+        ours_counts = Counter(_merge_key(i) for i in ours)
+        base_counts = Counter(_merge_key(i) for i in b)
+        added = ours_counts - base_counts
+        removed = base_counts - ours_counts
+
+        out = []
+        for item in theirs:
+            k = _merge_key(item)
+            if removed[k] > 0:
+                removed[k] -= 1
+                continue
+            out.append(item)
+        for item in ours:
+            k = _merge_key(item)
+            if added[k] > 0:
+                added[k] -= 1
+                out.append(item)
+        return out
+
+    if _is_number(ours) and _is_number(theirs):
+        return max(ours, theirs)
+
+    return ours
+
+
+class JsonCodec:
+    """
+    Turns documents into file bytes and back. Writes compact JSON (through
+    orjson when it is installed); above `compress_over` bytes the JSON is
+    gzipped and wrapped as MAGIC + base64, which stays plain text so it can
+    go inline into a Git tree. Reads accept either form, and pretty-printed
+    files written by older versions too.
+    """
+
+    MAGIC = b"PILOTGZ1:"
+
+    def __init__(self, compress_over: int = 0):
+        self.compress_over = compress_over
+
+    def dumps(self, data: Any) -> bytes:
+        if orjson is not None:
+            raw = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        else:
+            raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        if self.compress_over and len(raw) > self.compress_over:
+            # mtime=0: the same data always gives the same bytes (and blob sha)
+            return self.MAGIC + base64.b64encode(gzip.compress(raw, mtime=0))
+        return raw
+
+    def loads(self, raw: bytes) -> Any:
+        raw = raw.strip()
+        if raw.startswith(self.MAGIC):
+            raw = gzip.decompress(base64.b64decode(raw[len(self.MAGIC):]))
+        if not raw:
+            return None
+        if orjson is not None:
+            return orjson.loads(raw)
+        return json.loads(raw.decode("utf-8"))
+
+
+CODEC = JsonCodec(GZIP_MIN_BYTES)
+
+
+def git_blob_sha(raw: bytes) -> str:
+    """The sha GitHub reports for a file with these exact bytes."""
+    return hashlib.sha1(b"blob %d\0" % len(raw) + raw).hexdigest()
+
+
+# =========================================================
+# Document
+# =========================================================
+
+class Document:
+    def __init__(
+        self,
+        store: "DocumentStore",
+        path: str,
+        *,
+        default: Callable[[], Dict[str, Any]],
+        normalize: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]],
+        message: str,
+        schema: Optional[str] = None,
+        codec: Optional[JsonCodec] = None,
+    ):
+        self.store = store
+        self.codec = codec or CODEC
+        self.path = path
+        self.default = default
+        self.normalize = normalize
+        self.message = message
+        self.schema = schema  # table layout used by the SQLite backend
+
+        self.data: Optional[Dict[str, Any]] = None  # None = never loaded
+        # last copy known to be on GitHub: the common ancestor for merges
+        self.base: Optional[Dict[str, Any]] = None
+        self.sha: Optional[str] = None
+        self.etag: Optional[str] = None
+        self.checked_at = 0.0
+
+        # save() bumps _version; a successful PUT records it as _flushed_version
+        self._version = 0
+        self._flushed_version = 0
+        self._pending_message: Optional[str] = None
+
+        self._lock = asyncio.Lock()
+        self._revalidating: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Task] = None
+
+    # ---------------- shape ----------------
+
+    def shape(self, data: Any) -> Dict[str, Any]:
+        if not isinstance(data, dict):
+            data = self.default()
+        return self.normalize(data) if self.normalize else data
+
+    # ---------------- reads ----------------
+
+    @property
+    def loaded(self) -> bool:
+        return self.data is not None
+
+    @property
+    def dirty(self) -> bool:
+        return self._version != self._flushed_version
+
+    async def load(self) -> Dict[str, Any]:
+        """Returns a private copy of the document (safe to mutate then save)."""
+        return copy.deepcopy(await self.read())
+
+    async def read(self) -> Dict[str, Any]:
+        """Like load(), but returns the live copy. Do not mutate it."""
+        if self.store.local is not None:
+            if self.data is None:
+                await self._load_local()
+            return self.data
+
+        if self.data is None and (self._load_cached() or self._load_seed()):
+            # serve the warm copy now, reconcile with GitHub behind it
+            self._revalidate_in_background()
+        elif self.data is None:
+            try:
+                await self.refresh()
+            except Exception:
+                pass
+        elif not self.dirty and time.monotonic() - self.checked_at > REVALIDATE_SECONDS:
+            self._revalidate_in_background()
+
+        if self.data is None:
+            return self.shape(self.default())
+        return self.data
+
+    def peek(self) -> Optional[Dict[str, Any]]:
+        """The live in-memory copy, or None if not loaded yet. Do not mutate."""
+        return self.data
+
+    async def refresh(self) -> None:
+        if self.store.local is not None:
+            self.data = None
+            await self._load_local()
+            return
+
+        async with self._lock:
+            # pending local edits are newer than anything on GitHub
+            if self.dirty:
+                return
+            await self._fetch()
+
+    def _revalidate_in_background(self) -> None:
+        if self._revalidating and not self._revalidating.done():
+            return
+
+        async def _run():
+            try:
+                await self.refresh()
+            except Exception:
+                pass
+
+        self._revalidating = asyncio.get_running_loop().create_task(_run())
+
+    # ---------------- warm cache ----------------
+
+    def _cache_file(self) -> Optional[str]:
+        if not self.store.cache_dir:
+            return None
+        return os.path.join(self.store.cache_dir, self.path.replace("/", "__"))
+
+    def _load_cached(self) -> bool:
+        cache_file = self._cache_file()
+        if not cache_file:
+            return False
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(cached, dict):
+            return False
+
+        self.data = self.base = self.shape(cached.get("data"))
+        self.sha = cached.get("sha")
+        self.etag = cached.get("etag")
+        return True
+
+    def _load_seed(self) -> bool:
+        try:
+            with open(os.path.join(SEED_DIR, self.path), "rb") as f:
+                seed = self.codec.loads(f.read())
+        except (OSError, ValueError):
+            return False
+
+        # no sha: the first save goes through the merge path against GitHub
+        self.data = self.base = self.shape(seed)
+        return True
+
+    def _write_cache(self) -> None:
+        cache_file = self._cache_file()
+        if not cache_file or self.base is None:
+            return
+        tmp = f"{cache_file}.tmp"
+        try:
+            os.makedirs(self.store.cache_dir, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"sha": self.sha, "etag": self.etag, "data": self.base}, f, ensure_ascii=False)
+            os.replace(tmp, cache_file)  # atomic: readers never see half a file
+        except OSError as e:
+            print(f"⚠️ document_store: caching {self.path} failed: {e}")
+
+    async def _load_local(self) -> None:
+        local = self.store.local
+        data = local.read(self.path, self.schema)
+
+        if data is None:
+            # first run against this database: import the GitHub copy once
+            try:
+                fetched = await self.fetch_remote(conditional=False)
+            except Exception as e:
+                print(f"⚠️ document_store: importing {self.path} from GitHub failed: {e}")
+                self.data = self.shape(self.default())
+                return
+            data = fetched[0] if fetched else self.default()
+            local.write(self.path, self.schema, None, data)
+
+        self.data = self.shape(data)
+
+    async def fetch_remote(self, *, conditional: bool = True) -> Optional[Tuple[Dict[str, Any], Optional[str], Optional[str]]]:
+        """GETs the file. Returns (data, sha, etag), or None when unchanged (304)."""
+        headers = {}
+        if conditional and self.etag and self.data is not None:
+            headers["If-None-Match"] = self.etag
+
+        status, payload, etag = await self.store.request("GET", self.path, headers=headers)
+
+        if status == 304:
+            return None
+
+        if status == 404:
+            return self.shape(self.default()), None, None
+
+        if status != 200 or not isinstance(payload, dict):
+            raise DocumentStoreError(f"GitHub GET {self.path} failed: {status}")
+
+        data = self.codec.loads(base64.b64decode(payload.get("content", "") or ""))
+        if data is None:
+            data = self.default()
+        return self.shape(data), payload.get("sha"), etag
+
+    async def _fetch(self) -> None:
+        fetched = await self.fetch_remote()
+        self.checked_at = time.monotonic()
+        # a save() landed during the GET: keep it, the flush merges against GitHub
+        if fetched is None or self.dirty:
+            return
+        self.data, self.sha, self.etag = fetched
+        self.base = self.data
+        self._write_cache()
+
+    # ---------------- writes ----------------
+
+    async def save(self, data: Dict[str, Any], *, message: Optional[str] = None) -> Optional[str]:
+        """
+        Updates the in-memory copy straight away and queues the GitHub write.
+        Saves inside the same WRITE_BEHIND_SECONDS window share one PUT.
+        Inside store.batch() the write waits for the batch's single commit.
+        On SQLite only the rows that changed are written, right away.
+        """
+        if self.store.local is not None:
+            new = self.shape(copy.deepcopy(data))
+            self.store.local.write(self.path, self.schema, self.data, new)
+            self.data = new
+            return None
+
+        self.data = self.shape(copy.deepcopy(data))
+        return await self._queue_write(message)
+
+    async def append(self, key: str, item: Any, *, message: Optional[str] = None) -> Optional[str]:
+        """
+        Appends `item` to the list under `key`, for append-only logs. Unlike
+        save() the rest of the document isn't copied, and on SQLite the
+        schema only sees the new item.
+        """
+        data = await self.read()
+        new = dict(data)
+        new[key] = list(data.get(key) or []) + [copy.deepcopy(item)]
+
+        if self.store.local is not None:
+            self.store.local.write(self.path, self.schema, self.data, new)
+            self.data = new
+            return None
+
+        self.data = new
+        return await self._queue_write(message)
+
+    async def _queue_write(self, message: Optional[str]) -> Optional[str]:
+        self._version += 1
+        if message:
+            self._pending_message = message
+
+        batch = _BATCH.get()
+        if batch is not None:
+            batch.add(self)
+            return self.sha
+
+        if WRITE_BEHIND_SECONDS <= 0:
+            return await self.flush()
+
+        self._schedule_flush()
+        return self.sha
+
+    def _schedule_flush(self) -> None:
+        if self._flushing and not self._flushing.done():
+            return
+
+        async def _run():
+            # keeps going while edits land mid-flush or a PUT fails
+            while self.dirty:
+                await asyncio.sleep(WRITE_BEHIND_SECONDS)
+                try:
+                    await self.flush()
+                except Exception as e:
+                    print(f"⚠️ document_store: flushing {self.path} failed: {e}")
+
+        self._flushing = asyncio.get_running_loop().create_task(_run())
+
+    async def flush(self) -> Optional[str]:
+        async with self._lock:
+            if not self.dirty or self.data is None:
+                return self.sha
+
+            version = self._version
+            data = self.data
+            message = self._pending_message or self.message
+
+            status, payload = await self._put(data, message)
+            written = data
+
+            # someone else wrote the file since we last saw it: merge, retry once
+            if status in (409, 422):
+                written = data = await self._rebase(data)
+                status, payload = await self._put(written, message)
+
+            if status not in (200, 201):
+                raise DocumentStoreError(f"GitHub PUT {self.path} failed: {status}")
+
+            sha = ((payload or {}).get("content") or {}).get("sha") or self.sha
+            self._mark_flushed(version, sha, written, data)
+            return self.sha
+
+    async def _rebase(self, ours: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fetches the current GitHub copy and merges `ours` onto it. The merge
+        also replaces the in-memory copy, because sha and base now describe
+        the new remote: if the write that follows fails, the retry must send
+        merged content, not `ours`, or it would undo the other writer.
+        """
+        fetched = await self.fetch_remote(conditional=False)
+        if fetched is None:
+            return ours
+        theirs, sha, _ = fetched
+        # no base means GitHub was unreachable when this was first read and
+        # `ours` grew from the defaults: merge against those, so the keys
+        # we never touched keep GitHub's values instead of being reset
+        base = self.base if self.base is not None else self.shape(self.default())
+        merged = self.shape(merge3(base, ours, theirs))
+
+        if self.data is ours:
+            self.data = merged
+        else:
+            # saved again while we fetched: keep that edit on top of the merge
+            self.data = self.shape(merge3(ours, self.data, merged))
+        self.sha, self.base = sha, theirs
+        return merged
+
+    def _mark_flushed(self, version: int, sha: Optional[str], written: Dict[str, Any], ours: Dict[str, Any]) -> None:
+        """`written` is now on GitHub; `ours` is the local copy it was built from."""
+        if written is not ours:
+            # the write carried a merge: fold the other side into memory too
+            if self._version == version:
+                self.data = written
+            else:
+                self.data = self.shape(merge3(ours, self.data, written))
+        self.base = written
+        self.sha = sha
+        self.etag = None  # our GET etag no longer describes the file
+        self.checked_at = time.monotonic()
+        self._flushed_version = version
+        if not self.dirty:
+            self._pending_message = None
+        self._write_cache()
+
+    def encode(self, data: Dict[str, Any]) -> bytes:
+        return self.codec.dumps(data)
+
+    async def _put(self, data: Dict[str, Any], message: str) -> Tuple[int, Any]:
+        body: Dict[str, Any] = {
+            "message": message,
+            "content": base64.b64encode(self.encode(data)).decode("utf-8"),
+        }
+        if self.sha:
+            body["sha"] = self.sha
+
+        status, payload, _ = await self.store.request("PUT", self.path, json_body=body)
+        return status, payload
+
+
+# =========================================================
+# Store
+# =========================================================
+
+class PrefetchReport:
+    """What DocumentStore.prefetch() did, in seconds per path."""
+
+    def __init__(self):
+        # served from the warm cache, the bundled seed or SQLite (a disk read)
+        self.cached: Dict[str, float] = {}
+        # no local copy: fetched from GitHub before startup went on
+        self.fetched: Dict[str, float] = {}
+        # fetches still running when PREFETCH_TIMEOUT_SECONDS hit
+        self.pending: List[str] = []
+        # background GitHub checks of the cached copies, filled in as they land
+        self.revalidated: Dict[str, float] = {}
+        self.revalidating: Optional[asyncio.Future] = None
+
+
+class DocumentStore:
+    def __init__(
+        self,
+        repo: str = GITHUB_REPO,
+        api_base: str = GITHUB_API_BASE,
+        *,
+        local: Any = ...,
+        cache_dir: Optional[str] = CACHE_DIR,
+    ):
+        self.repo = repo
+        self.cache_dir = cache_dir
+        self.api_base = api_base.rstrip("/")
+        self.documents: Dict[str, Document] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.trace_configs: List[aiohttp.TraceConfig] = []  # e.g. metrics.http_trace()
+        self.branch: Optional[str] = GITHUB_BRANCH  # None: GitHub's default branch
+        self._branch: Optional[str] = GITHUB_BRANCH  # resolved lazily for batch commits
+
+        # local: a SqliteBackend, or None for GitHub. Defaults to PILOT_STORAGE.
+        if local is ...:
+            local = None
+            if STORAGE_BACKEND == "sqlite":
+                from sqlite_store import SqliteBackend
+                local = SqliteBackend(SQLITE_PATH)
+        self.local = local
+
+    def document(
+        self,
+        path: str,
+        *,
+        default: Callable[[], Dict[str, Any]] = dict,
+        normalize: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+        message: Optional[str] = None,
+        schema: Optional[str] = None,
+        codec: Optional[JsonCodec] = None,
+    ) -> Document:
+        doc = self.documents.get(path)
+        if doc is None:
+            doc = Document(
+                self,
+                path,
+                default=default,
+                normalize=normalize,
+                message=message or f"Update {path}",
+                schema=schema,
+                codec=codec,
+            )
+            self.documents[path] = doc
+        return doc
+
+    def url(self, path: str) -> str:
+        return self.api_url(f"contents/{path}")
+
+    def api_url(self, endpoint: str) -> str:
+        return f"{self.api_base}/repos/{self.repo}/{endpoint}".rstrip("/")
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=HEADERS,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS),
+                trace_configs=self.trace_configs or None,
+            )
+        return self._session
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        json_body: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[int, Any, Optional[str]]:
+        """Contents API call for one file, on the configured branch."""
+        endpoint = f"contents/{path}"
+        if self.branch:
+            # contents calls default to the default branch: pin them to the one batch commits use
+            if method == "GET":
+                endpoint += f"?ref={quote(self.branch, safe='')}"
+            elif json_body is not None:
+                json_body = {**json_body, "branch": self.branch}
+        return await self.api(method, endpoint, headers=headers, json_body=json_body)
+
+    async def api(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        json_body: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[int, Any, Optional[str]]:
+        session = await self._get_session()
+        async with session.request(method, self.api_url(endpoint), headers=headers, json=json_body) as r:
+            payload = None
+            if r.status not in (204, 304):
+                try:
+                    payload = await r.json(content_type=None)
+                except Exception:
+                    payload = None
+            return r.status, payload, r.headers.get("ETag")
+
+    # ---------------- batch commits ----------------
+
+    @contextlib.asynccontextmanager
+    async def batch(self, message: str):
+        """
+        Every document saved inside the block is written in ONE Git commit
+        when the block exits (a tree + commit + ref update, whatever the
+        number of files), so related changes land together or not at all.
+        Nested blocks join the outer one. A no-op on SQLite.
+        """
+        if self.local is not None or _BATCH.get() is not None:
+            yield
+            return
+
+        docs: Set[Document] = set()
+        token = _BATCH.set(docs)
+        try:
+            yield
+        finally:
+            _BATCH.reset(token)
+            if docs:
+                try:
+                    await self.commit(docs, message)
+                except Exception as e:
+                    print(f"⚠️ document_store: batch commit failed, writing files one by one: {e}")
+                    for doc in docs:
+                        doc._schedule_flush()
+
+    async def commit(self, docs: Iterable[Document], message: str) -> None:
+        """Writes every dirty document in `docs` as a single commit."""
+        # fixed lock order so two overlapping commits can't deadlock
+        docs = sorted({doc for doc in docs if doc.dirty}, key=lambda d: d.path)
+        if not docs:
+            return
+        if len(docs) == 1:
+            docs[0]._pending_message = docs[0]._pending_message or message
+            await docs[0].flush()
+            return
+
+        async with contextlib.AsyncExitStack() as stack:
+            for doc in docs:
+                await stack.enter_async_context(doc._lock)
+
+            pending = [(doc, doc._version, doc.data) for doc in docs if doc.dirty and doc.data is not None]
+            if not pending:
+                return
+
+            for _ in range(2):
+                branch = await self._get_branch()
+                head, tree = await self._head(branch)
+
+                # a file that changed on GitHub since we read it (a contents
+                # API write, another process) is merged in first, or the tree
+                # below would silently drop that change
+                blobs = await self._blob_shas(tree)
+                rebased = []
+                for doc, version, ours in pending:
+                    if blobs.get(doc.path) != doc.sha:
+                        ours = await doc._rebase(ours)  # also moves doc.data onto the merge
+                    rebased.append((doc, version, ours))
+                pending = rebased
+
+                files = [(doc.path, doc.encode(written)) for doc, _, written in pending]
+                if await self._commit_files(branch, head, tree, files, message):
+                    break
+                # someone pushed in between: go again on the new head, once
+            else:
+                raise DocumentStoreError("GitHub ref update was rejected twice")
+
+            for (doc, version, written), (_, raw) in zip(pending, files):
+                doc._mark_flushed(version, git_blob_sha(raw), written, written)
+
+    async def _head(self, branch: str) -> Tuple[str, str]:
+        """(commit sha, tree sha) the branch points at."""
+        status, ref, _ = await self.api("GET", f"git/ref/heads/{branch}")
+        if status != 200:
+            raise DocumentStoreError(f"GitHub GET ref {branch} failed: {status}")
+        head = ref["object"]["sha"]
+
+        status, commit, _ = await self.api("GET", f"git/commits/{head}")
+        if status != 200:
+            raise DocumentStoreError(f"GitHub GET commit {head} failed: {status}")
+        return head, commit["tree"]["sha"]
+
+    async def _blob_shas(self, tree: str) -> Dict[str, str]:
+        """Blob sha per path in `tree`. Paths missing from a truncated listing read as changed."""
+        status, listing, _ = await self.api("GET", f"git/trees/{tree}?recursive=1")
+        if status != 200:
+            raise DocumentStoreError(f"GitHub GET tree {tree} failed: {status}")
+        return {entry["path"]: entry["sha"] for entry in listing.get("tree", []) if entry.get("type") == "blob"}
+
+    async def _commit_files(self, branch: str, head: str, tree: str, files: List[Tuple[str, bytes]], message: str) -> bool:
+        entries = [
+            {"path": path, "mode": "100644", "type": "blob", "content": raw.decode("utf-8")}
+            for path, raw in files
+        ]
+        status, new_tree, _ = await self.api("POST", "git/trees", json_body={"base_tree": tree, "tree": entries})
+        if status != 201:
+            raise DocumentStoreError(f"GitHub POST tree failed: {status}")
+
+        status, new_commit, _ = await self.api(
+            "POST", "git/commits", json_body={"message": message, "tree": new_tree["sha"], "parents": [head]}
+        )
+        if status != 201:
+            raise DocumentStoreError(f"GitHub POST commit failed: {status}")
+
+        status, _, _ = await self.api("PATCH", f"git/refs/heads/{branch}", json_body={"sha": new_commit["sha"]})
+        if status == 422:
+            return False
+        if status != 200:
+            raise DocumentStoreError(f"GitHub PATCH ref {branch} failed: {status}")
+        return True
+
+    async def _get_branch(self) -> str:
+        if self._branch is None:
+            status, repo, _ = await self.api("GET", "")
+            if status != 200 or not isinstance(repo, dict):
+                raise DocumentStoreError(f"GitHub GET repo failed: {status}")
+            self._branch = repo.get("default_branch") or "main"
+        return self._branch
+
+    # ---------------- startup ----------------
+
+    async def prefetch(self) -> "PrefetchReport":
+        """
+        Warms every registered document. A cached or bundled copy is served
+        straight away and revalidated in the background; only documents with
+        neither are fetched, concurrently and for at most
+        PREFETCH_TIMEOUT_SECONDS in total. Returns once those fetches have
+        landed or the timeout hit.
+        """
+        report = PrefetchReport()
+        cold: List[Document] = []
+        revalidating: Dict[str, asyncio.Task] = {}
+
+        for doc in list(self.documents.values()):
+            started = time.perf_counter()
+            if self.local is not None:
+                await doc.read()
+            elif doc.loaded or doc._load_cached() or doc._load_seed():
+                doc._revalidate_in_background()
+                if doc._revalidating is not None:
+                    revalidating[doc.path] = doc._revalidating
+            else:
+                cold.append(doc)
+                continue
+            report.cached[doc.path] = time.perf_counter() - started
+
+        if revalidating:
+            report.revalidating = asyncio.ensure_future(self._report_revalidations(revalidating, report))
+
+        async def _one(doc: Document) -> None:
+            started = time.perf_counter()
+            try:
+                await doc.refresh()
+            except Exception as e:
+                print(f"⚠️ document_store: prefetching {doc.path} failed: {e}")
+            report.fetched[doc.path] = time.perf_counter() - started
+
+        if cold:
+            tasks = [asyncio.ensure_future(_one(doc)) for doc in cold]
+            # still-running fetches carry on; read() serves those documents once they land
+            _, pending = await asyncio.wait(tasks, timeout=PREFETCH_TIMEOUT_SECONDS)
+            for task, doc in zip(tasks, cold):
+                if task in pending:
+                    report.pending.append(doc.path)
+                    print(f"⚠️ document_store: {doc.path} still loading after {PREFETCH_TIMEOUT_SECONDS:g}s, not waiting")
+        return report
+
+    @staticmethod
+    async def _report_revalidations(tasks: Dict[str, asyncio.Task], report: "PrefetchReport") -> None:
+        started = time.perf_counter()
+
+        async def _timed(path: str, task: asyncio.Task) -> None:
+            with contextlib.suppress(Exception, asyncio.CancelledError):
+                await asyncio.shield(task)
+            report.revalidated[path] = time.perf_counter() - started
+
+        await asyncio.gather(*(_timed(path, task) for path, task in tasks.items()))
+        total_ms = max(report.revalidated.values()) * 1000
+        print(f"🔄 Revalidated {len(report.revalidated)} cached documents against GitHub in {total_ms:.0f} ms")
+        for path, secs in sorted(report.revalidated.items(), key=lambda kv: kv[1], reverse=True):
+            print(f"   {path}: {secs * 1000:.0f} ms")
+
+    async def flush_all(self) -> None:
+        dirty = [doc for doc in self.documents.values() if doc.dirty]
+        if len(dirty) > 1:
+            try:
+                await self.commit(dirty, f"Update {len(dirty)} Pilot documents")
+                return
+            except Exception as e:
+                print(f"⚠️ document_store: combined flush failed, writing files one by one: {e}")
+
+        results = await asyncio.gather(*(doc.flush() for doc in dirty), return_exceptions=True)
+        for doc, res in zip(dirty, results):
+            if isinstance(res, Exception):
+                print(f"⚠️ document_store: final flush of {doc.path} failed: {res}")
+
+    async def close(self) -> None:
+        await self.flush_all()
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self.local is not None:
+            self.local.close()
+
+
+store = DocumentStore()
@@ -0,0 +1,136 @@
+# event_router.py
+# One place every feature hooks gateway events into, instead of assigning
+# bot.on_message / using @client.event (each of which replaces whatever
+# handler was there before).
+#
+#   client.router.add("message", handler, channels={...}, authors={...},
+#                     types={discord.MessageType.default}, bots=False)
+#
+# Filters are compiled into a dispatch table: message type -> channel id ->
+# the routes that can match, in registration order. For most messages that
+# is a couple of dict lookups and an empty tuple.
+# A handler that returns STOP ends dispatch of that event for later routes.
+
+from __future__ import annotations
+
+import asyncio
+import traceback
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import discord
+
+import metrics
+
+STOP = object()
+
+Handler = Callable[..., Awaitable[Any]]
+
+
+class Route:
+    __slots__ = ("order", "handler", "channels", "authors", "types", "bots", "guild_only")
+
+    def __init__(
+        self,
+        order: int,
+        handler: Handler,
+        *,
+        channels: Optional[Iterable[int]] = None,
+        authors: Optional[Iterable[int]] = None,
+        types: Optional[Iterable[discord.MessageType]] = None,
+        bots: Optional[bool] = None,
+        guild_only: bool = False,
+    ):
+        self.order = order
+        self.handler = handler
+        self.channels: Optional[FrozenSet[int]] = frozenset(channels) if channels is not None else None
+        self.authors: Optional[FrozenSet[int]] = frozenset(authors) if authors is not None else None
+        self.types: Optional[FrozenSet[discord.MessageType]] = frozenset(types) if types is not None else None
+        self.bots = bots  # None = both, True = bots only, False = humans only
+        self.guild_only = guild_only
+
+    def accepts(self, subject: Any) -> bool:
+        """The filters the table can't index on (channel and type are already done)."""
+        if self.authors is None and self.bots is None and not self.guild_only:
+            return True
+        author = getattr(subject, "author", None)
+        if self.authors is not None and getattr(author, "id", None) not in self.authors:
+            return False
+        if self.bots is not None and bool(getattr(author, "bot", False)) != self.bots:
+            return False
+        if self.guild_only and getattr(subject, "guild", None) is None:
+            return False
+        return True
+
+
+class _Table:
+    """Routes for one event: type -> (channel id -> routes, routes for any other channel)."""
+
+    def __init__(self, routes: List[Route]):
+        typed = {t for r in routes if r.types is not None for t in r.types}
+        self.by_type: Dict[Any, Tuple[Dict[int, Tuple[Route, ...]], Tuple[Route, ...]]] = {
+            t: self._bucket([r for r in routes if r.types is None or t in r.types]) for t in typed
+        }
+        self.untyped = self._bucket([r for r in routes if r.types is None])
+
+    @staticmethod
+    def _bucket(routes: List[Route]) -> Tuple[Dict[int, Tuple[Route, ...]], Tuple[Route, ...]]:
+        anywhere = [r for r in routes if r.channels is None]
+        channel_ids = {c for r in routes if r.channels is not None for c in r.channels}
+        by_channel = {
+            cid: tuple(sorted((r for r in routes if r.channels is None or cid in r.channels), key=lambda r: r.order))
+            for cid in channel_ids
+        }
+        return by_channel, tuple(anywhere)
+
+    def lookup(self, subject: Any) -> Tuple[Route, ...]:
+        by_channel, anywhere = self.by_type.get(getattr(subject, "type", None), self.untyped)
+        if not by_channel:
+            return anywhere
+        channel = getattr(subject, "channel", None)
+        return by_channel.get(getattr(channel, "id", None), anywhere)
+
+
+class EventRouter:
+    def __init__(self):
+        self._routes: Dict[str, List[Route]] = {}
+        self._tables: Dict[str, _Table] = {}
+        self._order = 0
+
+    def add(self, event: str, handler: Handler, **filters) -> Handler:
+        """Registers handler for an event name as discord.py dispatches it ("message", not "on_message")."""
+        self._order += 1
+        self._routes.setdefault(event, []).append(Route(self._order, handler, **filters))
+        self._tables.pop(event, None)  # recompiled on next dispatch
+        return handler
+
+    def on(self, event: str, **filters) -> Callable[[Handler], Handler]:
+        def decorator(handler: Handler) -> Handler:
+            return self.add(event, handler, **filters)
+        return decorator
+
+    def dispatch(self, event: str, *args: Any) -> None:
+        """Called from Client.dispatch for every gateway event."""
+        routes = self._routes.get(event)
+        if not routes:
+            return
+
+        table = self._tables.get(event)
+        if table is None:
+            table = self._tables[event] = _Table(routes)
+
+        subject = args[0] if args else None
+        matched = [r for r in table.lookup(subject) if r.accepts(subject)]
+        if matched:
+            asyncio.get_running_loop().create_task(self._run(event, matched, args), name=f"router: {event}")
+
+    async def _run(self, event: str, routes: List[Route], args: Tuple[Any, ...]) -> None:
+        for route in routes:
+            name = route.handler.__qualname__
+            try:
+                with metrics.track(metrics.HANDLER_SECONDS, metrics.HANDLER_ERRORS, metrics.HANDLER_IN_FLIGHT, [event, name], [event]):
+                    result = await route.handler(*args)
+                if result is STOP:
+                    return
+            except Exception:
+                print(f"⚠️ event_router: {name} failed on {event}")
+                traceback.print_exc()
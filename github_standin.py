@@ -0,0 +1,277 @@
+# github_standin.py
+# A small stand-in for the parts of the GitHub API the DocumentStore uses:
+# the contents API (GET/PUT with sha checks, ETags, 404/409/422) and the
+# Git Data calls behind DocumentStore.batch(). Everything lives in memory.
+# Latency, jitter and injected errors make it usable for benchmarks and for
+# exercising the retry/merge paths without a token or network access.
+#
+#   python github_standin.py --port 8765 --latency 0.08 --jitter 0.04 --error-rate 0.02
+#   GITHUB_API_BASE=http://127.0.0.1:8765 python bot_slash.py
+
+from __future__ import annotations
+
+import os
+import json
+import base64
+import random
+import asyncio
+import hashlib
+import argparse
+from collections import Counter
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+from document_store import git_blob_sha
+
+SEED_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _object_sha(kind: str, payload) -> str:
+    raw = json.dumps(payload, sort_keys=True).encode("utf-8")
+    return hashlib.sha1(kind.encode("utf-8") + b"\0" + raw).hexdigest()
+
+
+class StandinRepo:
+    """One branch of one repo: files at the head, plus the trees and commits behind it."""
+
+    def __init__(self, files: Optional[Dict[str, bytes]] = None, branch: str = "main"):
+        self.branch = branch
+        self.trees: Dict[str, Dict[str, bytes]] = {}
+        self.commits: Dict[str, dict] = {}
+        self.head = self._commit(dict(files or {}), [], "Initial commit")
+
+    @property
+    def files(self) -> Dict[str, bytes]:
+        return self.trees[self.commits[self.head]["tree"]]
+
+    def _tree(self, files: Dict[str, bytes]) -> str:
+        sha = _object_sha("tree", sorted((p, git_blob_sha(raw)) for p, raw in files.items()))
+        self.trees[sha] = files
+        return sha
+
+    def _commit(self, files: Dict[str, bytes], parents: List[str], message: str) -> str:
+        tree = self._tree(files)
+        sha = _object_sha("commit", {"tree": tree, "parents": parents, "message": message, "n": len(self.commits)})
+        self.commits[sha] = {"tree": tree, "parents": parents, "message": message}
+        return sha
+
+    def put(self, path: str, raw: bytes, message: str) -> str:
+        files = dict(self.files)
+        files[path] = raw
+        self.head = self._commit(files, [self.head], message)
+        return self.head
+
+
+def make_app(
+    repo: Optional[StandinRepo] = None,
+    *,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+) -> web.Application:
+    repo = repo or StandinRepo()
+    stats: Counter = Counter()
+
+    @web.middleware
+    async def chaos(request: web.Request, handler):
+        stats[f"{request.method} {request.match_info.route.name or 'other'}"] += 1
+        if request.path == "/_stats":
+            return await handler(request)
+
+        delay = latency + random.uniform(-jitter, jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if error_rate and random.random() < error_rate:
+            stats["injected_errors"] += 1
+            return web.json_response({"message": "Injected error"}, status=502)
+        return await handler(request)
+
+    def not_found() -> web.Response:
+        return web.json_response({"message": "Not Found"}, status=404)
+
+    # ---------------- repo ----------------
+
+    async def get_repo(request: web.Request) -> web.Response:
+        name = f"{request.match_info['owner']}/{request.match_info['repo']}"
+        return web.json_response({"full_name": name, "default_branch": repo.branch})
+
+    # ---------------- contents API ----------------
+
+    async def get_contents(request: web.Request) -> web.Response:
+        path = request.match_info["path"]
+        if request.query.get("ref", repo.branch) != repo.branch:
+            return not_found()
+        raw = repo.files.get(path)
+        if raw is None:
+            return not_found()
+
+        sha = git_blob_sha(raw)
+        etag = f'"{sha}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+
+        return web.json_response(
+            {
+                "type": "file",
+                "path": path,
+                "sha": sha,
+                "size": len(raw),
+                "encoding": "base64",
+                "content": base64.encodebytes(raw).decode("utf-8"),
+            },
+            headers={"ETag": etag},
+        )
+
+    async def put_contents(request: web.Request) -> web.Response:
+        path = request.match_info["path"]
+        body = await request.json()
+        try:
+            raw = base64.b64decode(body["content"])
+            message = body["message"]
+        except (KeyError, TypeError, ValueError):
+            return web.json_response({"message": "Invalid request."}, status=422)
+        if body.get("branch", repo.branch) != repo.branch:
+            return not_found()
+
+        current = repo.files.get(path)
+        sha = body.get("sha")
+        if current is not None and not sha:
+            return web.json_response({"message": '"sha" wasn\'t supplied.'}, status=422)
+        if sha and (current is None or sha != git_blob_sha(current)):
+            return web.json_response({"message": f"{path} does not match {sha}"}, status=409)
+
+        commit = repo.put(path, raw, message)
+        return web.json_response(
+            {"content": {"path": path, "sha": git_blob_sha(raw)}, "commit": {"sha": commit}},
+            status=201 if current is None else 200,
+        )
+
+    # ---------------- Git Data API ----------------
+
+    async def get_ref(request: web.Request) -> web.Response:
+        if request.match_info["branch"] != repo.branch:
+            return not_found()
+        return web.json_response(
+            {"ref": f"refs/heads/{repo.branch}", "object": {"type": "commit", "sha": repo.head}}
+        )
+
+    async def get_commit(request: web.Request) -> web.Response:
+        sha = request.match_info["sha"]
+        commit = repo.commits.get(sha)
+        if commit is None:
+            return not_found()
+        return web.json_response(
+            {
+                "sha": sha,
+                "message": commit["message"],
+                "tree": {"sha": commit["tree"]},
+                "parents": [{"sha": p} for p in commit["parents"]],
+            }
+        )
+
+    async def get_tree(request: web.Request) -> web.Response:
+        files = repo.trees.get(request.match_info["sha"])
+        if files is None:
+            return not_found()
+        tree = [{"path": p, "mode": "100644", "type": "blob", "sha": git_blob_sha(raw)} for p, raw in sorted(files.items())]
+        return web.json_response({"sha": request.match_info["sha"], "tree": tree, "truncated": False})
+
+    async def post_tree(request: web.Request) -> web.Response:
+        body = await request.json()
+        base = body.get("base_tree")
+        if base and base not in repo.trees:
+            return web.json_response({"message": "Invalid tree info"}, status=422)
+
+        files = dict(repo.trees[base]) if base else {}
+        for entry in body.get("tree") or []:
+            if entry.get("sha", ...) is None:
+                files.pop(entry["path"], None)
+            elif "content" in entry:
+                files[entry["path"]] = entry["content"].encode("utf-8")
+            else:
+                return web.json_response({"message": "Only inline content is supported"}, status=422)
+
+        sha = repo._tree(files)
+        tree = [{"path": p, "mode": "100644", "type": "blob", "sha": git_blob_sha(raw)} for p, raw in sorted(files.items())]
+        return web.json_response({"sha": sha, "tree": tree, "truncated": False}, status=201)
+
+    async def post_commit(request: web.Request) -> web.Response:
+        body = await request.json()
+        tree = body.get("tree")
+        parents = body.get("parents") or []
+        if tree not in repo.trees or any(p not in repo.commits for p in parents):
+            return web.json_response({"message": "Invalid tree or parents"}, status=422)
+
+        sha = _object_sha("commit", {"tree": tree, "parents": parents, "message": body.get("message"), "n": len(repo.commits)})
+        repo.commits[sha] = {"tree": tree, "parents": parents, "message": body.get("message", "")}
+        return web.json_response({"sha": sha, "tree": {"sha": tree}}, status=201)
+
+    async def patch_ref(request: web.Request) -> web.Response:
+        if request.match_info["branch"] != repo.branch:
+            return web.json_response({"message": "Reference does not exist"}, status=422)
+
+        body = await request.json()
+        commit = repo.commits.get(body.get("sha"))
+        if commit is None:
+            return web.json_response({"message": "Object does not exist"}, status=422)
+        if repo.head not in commit["parents"] and not body.get("force"):
+            return web.json_response({"message": "Update is not a fast forward"}, status=422)
+
+        repo.head = body["sha"]
+        return web.json_response(
+            {"ref": f"refs/heads/{repo.branch}", "object": {"type": "commit", "sha": repo.head}}
+        )
+
+    async def get_stats(request: web.Request) -> web.Response:
+        return web.json_response(dict(stats))
+
+    app = web.Application(middlewares=[chaos])
+    app["repo"] = repo
+    app["stats"] = stats
+
+    prefix = "/repos/{owner}/{repo}"
+    app.router.add_get(prefix, get_repo, name="repo")
+    app.router.add_get(prefix + "/contents/{path:.+}", get_contents, name="contents")
+    app.router.add_put(prefix + "/contents/{path:.+}", put_contents, name="contents_put")
+    app.router.add_get(prefix + "/git/ref/heads/{branch:.+}", get_ref, name="ref")
+    app.router.add_get(prefix + "/git/commits/{sha}", get_commit, name="commit")
+    app.router.add_get(prefix + "/git/trees/{sha}", get_tree, name="tree")
+    app.router.add_post(prefix + "/git/trees", post_tree, name="tree_post")
+    app.router.add_post(prefix + "/git/commits", post_commit, name="commit_post")
+    app.router.add_patch(prefix + "/git/refs/heads/{branch:.+}", patch_ref, name="ref_patch")
+    app.router.add_get("/_stats", get_stats, name="stats")
+    return app
+
+
+def seed_files(directory: str = SEED_DIR) -> Dict[str, bytes]:
+    """The JSON documents bundled with the bot, as the stand-in's starting state."""
+    files: Dict[str, bytes] = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".json"):
+            with open(os.path.join(directory, name), "rb") as f:
+                files[name] = f.read()
+    return files
+
+
+async def start(host: str = "127.0.0.1", port: int = 8765, **options) -> web.AppRunner:
+    """Runs the stand-in inside the current loop (benchmarks/tests). Call .cleanup() to stop."""
+    runner = web.AppRunner(make_app(**options))
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline stand-in for the GitHub contents API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of random latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 502")
+    parser.add_argument("--empty", action="store_true", help="start without the bundled JSON files")
+    args = parser.parse_args()
+
+    repo = StandinRepo({} if args.empty else seed_files())
+    app = make_app(repo, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    web.run_app(app, host=args.host, port=args.port)
@@ -81,7 +81,7 @@ def setup_goat_commands(tree: app_commands.CommandTree, client: discord.Client):
     # ===== Slash Commands =====
     @tree.command(name="cleargoat", description="Clear the goat role from everyone")
     async def cleargoat(interaction: discord.Interaction):
-        if not has_app_access(interaction.user, "poo_goat"):
+        if not await has_app_access(interaction.user, "poo_goat"):
             return await interaction.response.send_message("❌ No permission.", ephemeral=True)
 
         await interaction.response.defer()
@@ -90,7 +90,7 @@ def setup_goat_commands(tree: app_commands.CommandTree, client: discord.Client):
 
     @tree.command(name="assigngoat", description="Manually assign the goat role to a member")
     async def assigngoat(interaction: discord.Interaction, member: discord.Member):
-        if not has_app_access(interaction.user, "poo_goat"):
+        if not await has_app_access(interaction.user, "poo_goat"):
             return await interaction.response.send_message("❌ No permission.", ephemeral=True)
 
         await interaction.response.defer()
@@ -102,7 +102,7 @@ def setup_goat_commands(tree: app_commands.CommandTree, client: discord.Client):
 
     @tree.command(name="removegoat", description="Remove the goat role from a member")
     async def removegoat(interaction: discord.Interaction, member: discord.Member):
-        if not has_app_access(interaction.user, "poo_goat"):
+        if not await has_app_access(interaction.user, "poo_goat"):
             return await interaction.response.send_message("❌ No permission.", ephemeral=True)
 
         await interaction.response.defer()
@@ -114,7 +114,7 @@ def setup_goat_commands(tree: app_commands.CommandTree, client: discord.Client):
 
     @tree.command(name="testgoat", description="Test the goat automation")
     async def testgoat_command(interaction: discord.Interaction):
-        if not has_app_access(interaction.user, "poo_goat"):
+        if not await has_app_access(interaction.user, "poo_goat"):
             return await interaction.response.send_message("❌ No permission.", ephemeral=True)
 
         await interaction.response.defer()
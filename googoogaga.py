@@ -1,10 +1,7 @@
 from __future__ import annotations
 
-import json
 import os
 import random
-import base64
-import requests
 from dataclasses import dataclass, asdict
 from datetime import datetime, time, timedelta
 from zoneinfo import ZoneInfo
@@ -14,6 +11,8 @@ import discord
 from discord import app_commands
 from discord.ext import tasks
 
+from document_store import store
+
 # =========================================================
 # HARD-CODED CONFIG (YOUR IDS)
 # =========================================================
@@ -42,15 +41,6 @@ if not all([GITHUB_TOKEN, GITHUB_REPO, GOOGOO_GITHUB_PATH]):
         "GITHUB_TOKEN, GITHUB_REPO, GOOGOO_GITHUB_PATH"
     )
 
-GITHUB_API_URL = (
-    f"https://api.github.com/repos/"
-    f"{GITHUB_REPO}/contents/{GOOGOO_GITHUB_PATH}"
-)
-
-GITHUB_HEADERS = {
-    "Authorization": f"token {GITHUB_TOKEN}",
-    "Accept": "application/vnd.github+json"
-}
 
 
 # =========================================================
@@ -100,69 +90,28 @@ def _default_state() -> GooState:
     )
 
 
-def _gh_load_json(default_obj: Dict[str, Any]) -> Dict[str, Any]:
-    res = requests.get(GITHUB_API_URL, headers=GITHUB_HEADERS, timeout=20)
-
-    if res.status_code == 404:
-        _gh_save_json(default_obj, message="Create googoo.json")
-        return default_obj
-
-    res.raise_for_status()
-    payload = res.json()
-
-    content = base64.b64decode(payload["content"]).decode("utf-8")
-    data = json.loads(content or "{}")
-
-    data["_sha"] = payload["sha"]
-    return data
-
-
-def _gh_save_json(data: Dict[str, Any], message: str = "Update googoo state") -> None:
-    sha = data.pop("_sha", None)
-
-    encoded = base64.b64encode(
-        json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
-    ).decode("utf-8")
-
-    payload = {
-        "message": message,
-        "content": encoded
-    }
-
-    if sha:
-        payload["sha"] = sha
-
-    res = requests.put(GITHUB_API_URL, headers=GITHUB_HEADERS, json=payload, timeout=20)
-    res.raise_for_status()
-
+_DOC = store.document(
+    GOOGOO_GITHUB_PATH,
+    default=lambda: _default_state().to_json(),
+    message="Update googoo state",
+)
 
-def save_state(st: GooState) -> None:
-    # Load current doc to get latest sha (avoid sha mismatch)
-    current = _gh_load_json(_default_state().to_json())
-    sha = current.get("_sha")
 
+async def save_state(st: GooState) -> None:
     st.day = today_key()
     if st.tried_parent_ids is None:
         st.tried_parent_ids = set()
 
-    out = st.to_json()
-    out["_sha"] = sha
-    _gh_save_json(out, message="Update Goo Goo Ga Ga state")
+    await _DOC.save(st.to_json(), message="Update Goo Goo Ga Ga state")
 
 
-def load_state() -> GooState:
-    default = _default_state().to_json()
-    data = _gh_load_json(default)
+async def load_state() -> GooState:
+    data = await _DOC.load()
 
     # Force today's day (and auto-reset if stale)
     if data.get("day") != today_key():
         st = _default_state()
-        # Preserve sha so we overwrite same file cleanly
-        sha = data.get("_sha")
-        out = st.to_json()
-        if sha:
-            out["_sha"] = sha
-        _gh_save_json(out, message="Daily rollover googoo state")
+        await _DOC.save(st.to_json(), message="Daily rollover googoo state")
         return st
 
     st = GooState.from_json(data)
@@ -173,18 +122,12 @@ def load_state() -> GooState:
     return st
 
 
-def hard_reset_state_file() -> GooState:
+async def hard_reset_state_file() -> GooState:
     """
     Overwrites googoo.json with a fresh tiny state (so it never 'gets busy').
     """
-    data = _gh_load_json(_default_state().to_json())
-    sha = data.get("_sha")
-
     st = _default_state()
-    out = st.to_json()
-    if sha:
-        out["_sha"] = sha
-    _gh_save_json(out, message="Daily reset googoo state")
+    await _DOC.save(st.to_json(), message="Daily reset googoo state")
 
     return st
 
@@ -307,7 +250,7 @@ async def revoke_current_parent(guild: discord.Guild, st: GooState) -> str:
 
     st.current_parent_id = None
     st.window_end_iso = None
-    save_state(st)
+    await save_state(st)
 
     return old_member.mention if old_member else f"<@{old_id}>"
 
@@ -325,7 +268,7 @@ async def assign_new_parent(guild: discord.Guild, st: GooState, *, announce_stan
     st.current_parent_id = parent.id
     set_window_end(st, datetime.now(UK) + timedelta(hours=1))
     st.started = True
-    save_state(st)
+    await save_state(st)
 
     if announce_standard:
         await announce(
@@ -341,7 +284,7 @@ async def assign_new_parent(guild: discord.Guild, st: GooState, *, announce_stan
 # =========================================================
 @tasks.loop(seconds=30)
 async def goo_guard_loop(bot: discord.Client):
-    st = load_state()
+    st = await load_state()
     now = datetime.now(UK)
 
     # Hard stop after 11:30pm
@@ -396,7 +339,7 @@ async def goo_guard_loop(bot: discord.Client):
 async def goo_daily_reset(bot: discord.Client):
     for guild in bot.guilds:
         await clear_roles_in_guild(guild)
-    hard_reset_state_file()
+    await hard_reset_state_file()
 
 
 # =========================================================
@@ -413,7 +356,7 @@ def setup_googoogaga_commands(tree: app_commands.CommandTree, bot: discord.Clien
         if not interaction.guild:
             return await interaction.response.send_message("❌ Guild only.", ephemeral=True)
 
-        st = load_state()
+        st = await load_state()
 
         # Before 13:30, only allow if a parent is already set (e.g., testing/admin set state)
         if not start_time_passed() and not st.current_parent_id:
@@ -445,7 +388,7 @@ def setup_googoogaga_commands(tree: app_commands.CommandTree, bot: discord.Clien
         st.goo_id = member.id
         st.current_parent_id = None
         st.window_end_iso = None
-        save_state(st)
+        await save_state(st)
 
         await interaction.response.send_message(f"🍼 {member.mention} is today’s **Goo Goo Ga Ga**!")
 
@@ -460,9 +403,9 @@ def setup_googoogaga_commands(tree: app_commands.CommandTree, bot: discord.Clien
 
         await add_role(member, GOO_ROLE_ID)
 
-        st = load_state()
+        st = await load_state()
         st.goo_id = member.id
-        save_state(st)
+        await save_state(st)
 
         await announce(interaction.guild, f"🍼 {member.mention} has been **manually assigned** Goo Goo Ga Ga.")
         await interaction.response.send_message("✅ Assigned Goo Goo Ga Ga.", ephemeral=True)
@@ -478,10 +421,10 @@ def setup_googoogaga_commands(tree: app_commands.CommandTree, bot: discord.Clien
 
         await remove_role(member, GOO_ROLE_ID)
 
-        st = load_state()
+        st = await load_state()
         if st.goo_id == member.id:
             st.goo_id = None
-            save_state(st)
+            await save_state(st)
 
         await announce(interaction.guild, f"🫃 {member.mention} has been **manually unassigned** Goo Goo Ga Ga.")
         await interaction.response.send_message("✅ Removed Goo Goo Ga Ga.", ephemeral=True)
@@ -0,0 +1,65 @@
+# health.py
+# The Pilot's HTTP endpoints, served by aiohttp on the bot's own event loop
+# (PORT, default 8080):
+#   /         keep-alive text for uptime pingers
+#   /healthz  200 while the gateway connection is up (with heartbeat latency)
+#   /readyz   200 once documents are warmed and the command tree is synced
+#   /metrics  Prometheus text (metrics.py)
+
+from __future__ import annotations
+
+import os
+import math
+
+import discord
+from aiohttp import web
+
+import metrics
+
+PORT = int(os.environ.get("PORT", 8080))
+
+
+def _gateway_status(client: discord.Client) -> dict:
+    latency = client.latency
+    connected = client.is_ready() and not client.is_closed() and math.isfinite(latency)
+    return {
+        "connected": connected,
+        "latency_ms": round(latency * 1000, 1) if math.isfinite(latency) else None,
+        "guilds": len(client.guilds),
+    }
+
+
+def make_app(client: discord.Client) -> web.Application:
+    async def home(request: web.Request) -> web.Response:
+        return web.Response(text="✈️ The Pilot Bot is alive!")
+
+    async def healthz(request: web.Request) -> web.Response:
+        status = _gateway_status(client)
+        return web.json_response(status, status=200 if status["connected"] else 503)
+
+    async def readyz(request: web.Request) -> web.Response:
+        status = {
+            "documents_warmed": bool(getattr(client, "documents_warmed", False)),
+            "tree_synced": bool(getattr(client, "tree_synced", False)),
+            "gateway": _gateway_status(client)["connected"],
+        }
+        ready = all(status.values())
+        return web.json_response(status, status=200 if ready else 503)
+
+    async def prometheus_metrics(request: web.Request) -> web.Response:
+        return web.Response(body=metrics.render().encode("utf-8"), headers={"Content-Type": metrics.CONTENT_TYPE})
+
+    app = web.Application()
+    app.router.add_get("/", home)
+    app.router.add_get("/healthz", healthz)
+    app.router.add_get("/readyz", readyz)
+    app.router.add_get("/metrics", prometheus_metrics)
+    return app
+
+
+async def start(client: discord.Client, host: str = "0.0.0.0", port: int = PORT) -> web.AppRunner:
+    """Starts serving inside the running loop. Call .cleanup() on the runner to stop."""
+    runner = web.AppRunner(make_app(client), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
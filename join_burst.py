@@ -0,0 +1,60 @@
+# join_burst.py
+# Join velocity per guild, shared by the welcome messages (joinleave.py) and
+# auto roles (selfroles.py).
+#
+# When BURST_JOINS members join within BURST_WINDOW_SECONDS (a raid or a big
+# invite wave) the guild is in burst mode. It stays there until
+# BURST_COOLDOWN_SECONDS after the last join that was still over the
+# threshold. While it lasts, welcomes go out as periodic digests and auto
+# roles are granted through a paced queue instead of per member at once.
+
+from __future__ import annotations
+
+import os
+import time
+from collections import deque
+from typing import Deque, Dict
+
+import discord
+
+BURST_JOINS = int(os.getenv("PILOT_BURST_JOINS", "8"))
+BURST_WINDOW_SECONDS = float(os.getenv("PILOT_BURST_WINDOW_SECONDS", "30"))
+BURST_COOLDOWN_SECONDS = 60
+
+
+class JoinVelocity:
+    def __init__(self, joins: int = BURST_JOINS, window: float = BURST_WINDOW_SECONDS, cooldown: float = BURST_COOLDOWN_SECONDS):
+        self.joins = joins
+        self.window = window
+        self.cooldown = cooldown
+        # only the last `joins` timestamps matter: the oldest of them says if they fit in the window
+        self._recent: Dict[int, Deque[float]] = {}
+        self._burst_until: Dict[int, float] = {}
+
+    def record(self, guild_id: int) -> bool:
+        now = time.monotonic()
+        recent = self._recent.get(guild_id)
+        if recent is None:
+            recent = self._recent[guild_id] = deque(maxlen=self.joins)
+        recent.append(now)
+
+        if len(recent) == self.joins and now - recent[0] <= self.window:
+            if not self.active(guild_id):
+                print(f"🌊 Join burst in guild {guild_id}: {self.joins} joins in {now - recent[0]:.0f}s")
+            self._burst_until[guild_id] = now + self.cooldown
+        return self.active(guild_id)
+
+    def active(self, guild_id: int) -> bool:
+        return time.monotonic() < self._burst_until.get(guild_id, 0.0)
+
+
+JOINS = JoinVelocity()
+
+
+async def record_join(member: discord.Member) -> None:
+    """member_join route; register it before the welcome and auto-role routes."""
+    JOINS.record(member.guild.id)
+
+
+def in_burst(guild: discord.Guild) -> bool:
+    return JOINS.active(guild.id)
@@ -2,17 +2,23 @@
 import discord
 import asyncio
 import random
-import os
-import json
-import base64
-import requests
-from typing import Dict, Any
+import copy
+import time
+import heapq
+import traceback
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Tuple
+
+from document_store import store
+from audit_correlator import AuditLogCorrelator, actor_mention
+from join_burst import in_burst
+from message_templates import compile_template
 
 # ------------------- GitHub Config -------------------
-GITHUB_REPO = os.getenv("GITHUB_REPO", "saraargh/the-pilot")
 GITHUB_FILE_PATH = "welcome_config.json"
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-HEADERS = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
+BOOST_WINDOWS_FILE_PATH = "boost_windows.json"
+
+# A second boost within this long of the first is announced as a double boost
+BOOST_WINDOW_SECONDS = 30
 
 # ------------------- Default Config -------------------
 DEFAULT_CONFIG: Dict[str, Any] = {
@@ -51,9 +57,6 @@ DEFAULT_CONFIG: Dict[str, Any] = {
 # CONFIG IO
 # ======================================================
 
-def _gh_url() -> str:
-    return f"https://api.github.com/repos/{GITHUB_REPO}/contents/{GITHUB_FILE_PATH}"
-
 def ensure_config(cfg: Dict[str, Any]) -> Dict[str, Any]:
     cfg.setdefault("welcome", DEFAULT_CONFIG["welcome"])
     cfg.setdefault("member_logs", DEFAULT_CONFIG["member_logs"])
@@ -71,72 +74,220 @@ def ensure_config(cfg: Dict[str, Any]) -> Dict[str, Any]:
 
     return cfg
 
-def load_config() -> Dict[str, Any]:
-    try:
-        r = requests.get(_gh_url(), headers=HEADERS, timeout=10)
-        if r.status_code == 200:
-            raw = base64.b64decode(r.json()["content"]).decode()
-            cfg = json.loads(raw) if raw.strip() else DEFAULT_CONFIG.copy()
-            return ensure_config(cfg)
-        save_config(DEFAULT_CONFIG.copy())
-        return ensure_config(DEFAULT_CONFIG.copy())
-    except Exception:
-        return ensure_config(DEFAULT_CONFIG.copy())
+_DOC = store.document(
+    GITHUB_FILE_PATH,
+    default=lambda: copy.deepcopy(DEFAULT_CONFIG),
+    normalize=ensure_config,
+    message="Update welcome configuration",
+)
 
-def save_config(cfg: Dict[str, Any]) -> None:
-    cfg = ensure_config(cfg)
-    try:
-        sha = None
-        r = requests.get(_gh_url(), headers=HEADERS, timeout=10)
-        if r.status_code == 200:
-            sha = r.json().get("sha")
-
-        payload = {
-            "message": "Update welcome configuration",
-            "content": base64.b64encode(json.dumps(cfg, indent=2).encode()).decode()
-        }
-        if sha:
-            payload["sha"] = sha
+async def load_config() -> Dict[str, Any]:
+    return await _DOC.load()
 
-        requests.put(_gh_url(), headers=HEADERS, json=payload, timeout=10)
+async def save_config(cfg: Dict[str, Any]) -> None:
+    try:
+        await _DOC.save(cfg)
     except Exception:
         pass
 
+def _ensure_windows_shape(data: Dict[str, Any]) -> Dict[str, Any]:
+    if not isinstance(data.get("windows"), dict):
+        data["windows"] = {}
+    return data
+
+_WINDOWS_DOC = store.document(
+    BOOST_WINDOWS_FILE_PATH,
+    default=lambda: {"windows": {}},
+    normalize=_ensure_windows_shape,
+    message="Update pending boost windows",
+)
+
 # ======================================================
 # HELPERS
 # ======================================================
 
+class HumanMemberCounter:
+    """
+    Human members per guild, O(1) to read. Seeded from the member cache,
+    kept current by join/remove/ban, and recounted every RECONCILE_SECONDS
+    in case an event was missed.
+    """
+
+    RECONCILE_SECONDS = 30 * 60
+    LEAVE_DEDUPE_SECONDS = 60
+
+    def __init__(self):
+        self._counts: Dict[int, int] = {}
+        self._counted_at: Dict[int, float] = {}
+        self._recent_leaves: Dict[Tuple[int, int], float] = {}
+
+    def count(self, guild: discord.Guild) -> int:
+        counted_at = self._counted_at.get(guild.id)
+        if counted_at is None or time.monotonic() - counted_at > self.RECONCILE_SECONDS:
+            self.reconcile(guild)
+        return self._counts[guild.id]
+
+    def reconcile(self, guild: discord.Guild) -> None:
+        self._counts[guild.id] = sum(1 for m in guild.members if not m.bot)
+        # until the member list is fully chunked the cache undercounts: recount next read
+        self._counted_at[guild.id] = time.monotonic() if guild.chunked else -self.RECONCILE_SECONDS
+
+    def joined(self, member: discord.Member) -> None:
+        guild_id = member.guild.id
+        if member.bot or guild_id not in self._counts:
+            return
+        self._recent_leaves.pop((guild_id, member.id), None)
+        self._counts[guild_id] += 1
+
+    def left(self, guild: discord.Guild, user) -> None:
+        if getattr(user, "bot", False) or guild.id not in self._counts:
+            return
+
+        # a ban fires member_remove as well: only count the pair once
+        now = time.monotonic()
+        key = (guild.id, user.id)
+        if now - self._recent_leaves.get(key, -self.LEAVE_DEDUPE_SECONDS) < self.LEAVE_DEDUPE_SECONDS:
+            return
+        self._recent_leaves[key] = now
+        if len(self._recent_leaves) > 1000:
+            self._recent_leaves = {
+                k: t for k, t in self._recent_leaves.items() if now - t < self.LEAVE_DEDUPE_SECONDS
+            }
+
+        self._counts[guild.id] = max(0, self._counts[guild.id] - 1)
+
+HUMAN_MEMBERS = HumanMemberCounter()
+
 def human_member_number(guild: discord.Guild) -> int:
-    return len([m for m in guild.members if not m.bot])
+    return HUMAN_MEMBERS.count(guild)
+
+# Placeholders welcome templates may use ("channel:" takes a slot name)
+WELCOME_PLACEHOLDERS = ("user", "mention", "server", "member_count", "channel:")
+# Boost messages render without channel slots ({member_count} is the boost total)
+BOOST_PLACEHOLDERS = ("user", "mention", "server", "member_count")
 
 def render(text: str, *, user, guild, member_count: int, channels: Dict[str, int]) -> str:
     if not text:
         return ""
-    out = (
-        text.replace("{user}", getattr(user, "mention", ""))
-            .replace("{mention}", getattr(user, "mention", ""))
-            .replace("{server}", guild.name)
-            .replace("{member_count}", str(member_count))
-    )
-    for name, cid in (channels or {}).items():
-        out = out.replace(f"{{channel:{name}}}", f"<#{cid}>")
-    return out
+    tpl = compile_template(text)
+    mention = getattr(user, "mention", "")
+    values = {
+        "user": mention,
+        "mention": mention,
+        "server": guild.name,
+        "member_count": str(member_count),
+    }
+    for name in tpl.placeholders:
+        if name.startswith("channel:") and name[8:] in (channels or {}):
+            values[name] = f"<#{channels[name[8:]]}>"
+    return tpl.render(values)
 
 # ======================================================
 # RUNTIME SYSTEM
 # ======================================================
 
+BOOST_MESSAGE_TYPES = frozenset({
+    discord.MessageType.premium_guild_subscription,
+    discord.MessageType.premium_guild_tier_1,
+    discord.MessageType.premium_guild_tier_2,
+    discord.MessageType.premium_guild_tier_3,
+})
+
+class BoostWindows:
+    """
+    Double-boost detection windows for every member, run by a single task.
+    A member's first boost opens a window of BOOST_WINDOW_SECONDS; more boosts
+    inside it only bump its count. Windows sit in a min-heap by due time and
+    are persisted, so after a restart they still fire (late) instead of being
+    lost.
+    """
+
+    def __init__(self, client: discord.Client, fire: Callable[[int, int, int], Awaitable[None]]):
+        self.client = client
+        self._fire = fire
+        self._windows: Dict[str, Dict[str, Any]] = {}  # "guild:user" -> {"due": epoch, "count": n}
+        self._heap: List[Tuple[float, str]] = []
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task and not self._task.done():
+            return
+        data = await _WINDOWS_DOC.load()
+        for key, window in data["windows"].items():
+            self._windows[key] = window
+            heapq.heappush(self._heap, (window["due"], key))
+        if self._windows:
+            print(f"💎 Resuming {len(self._windows)} pending boost windows")
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def add(self, guild_id: int, user_id: int) -> None:
+        key = f"{guild_id}:{user_id}"
+        window = self._windows.get(key)
+        if window:
+            window["count"] += 1
+        else:
+            window = self._windows[key] = {"due": time.time() + BOOST_WINDOW_SECONDS, "count": 1}
+            heapq.heappush(self._heap, (window["due"], key))
+            if self._heap[0][1] == key:
+                self._wake.set()  # new earliest deadline
+        await self._persist()
+
+    async def _persist(self) -> None:
+        try:
+            await _WINDOWS_DOC.save({"windows": copy.deepcopy(self._windows)})
+        except Exception:
+            pass
+
+    async def _run(self) -> None:
+        await self.client.wait_until_ready()
+        while True:
+            self._wake.clear()
+            if not self._heap:
+                await self._wake.wait()
+                continue
+
+            due, key = self._heap[0]
+            delay = due - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            window = self._windows.pop(key, None)
+            if window is None:
+                continue
+            await self._persist()
+
+            guild_id, user_id = (int(x) for x in key.split(":"))
+            try:
+                await self._fire(guild_id, user_id, window["count"])
+            except Exception:
+                print(f"⚠️ boost window {key} failed")
+                traceback.print_exc()
+
+# During a join burst, welcomes are collected and posted as one digest per DIGEST_SECONDS
+DIGEST_SECONDS = 15
+DIGEST_MAX_MENTIONS = 40
+
 class WelcomeSystem:
-    def __init__(self, client: discord.Client):
+    def __init__(self, client: discord.Client, audit_log: AuditLogCorrelator):
         self.client = client
+        self.audit_log = audit_log
         self._recent_boosts: Dict[int, float] = {}
         self._last_tier: Dict[int, int] = {}
-        self._pending_boost_counts: Dict[tuple, int] = {} # Helper for double boost detection
+        self.boost_windows = BoostWindows(client, self._fire_boost_window)
+        self._digests: Dict[int, list] = {} # guild id -> members waiting for the next digest
+        self._digest_tasks: Dict[int, asyncio.Task] = {}
 
     # ---------------- MEMBER JOIN ----------------
 
     async def on_member_join(self, member: discord.Member):
-        cfg = load_config()
+        HUMAN_MEMBERS.joined(member)
+        cfg = await load_config()
 
         # ---- BOT ADD ----
         if member.bot:
@@ -148,16 +299,13 @@ class WelcomeSystem:
             if not channel:
                 return
 
-            await asyncio.sleep(1.5)
-
-            async for entry in member.guild.audit_logs(
-                limit=5, action=discord.AuditLogAction.bot_add
-            ):
-                if entry.target and entry.target.id == member.id:
-                    await channel.send(
-                        f"🤖 {entry.user.mention} added a bot (**{member.name}**)"
-                    )
-                    return
+            entry = await self.audit_log.wait_for(
+                member.guild.id, member.id, discord.AuditLogAction.bot_add
+            )
+            if entry:
+                await channel.send(
+                    f"🤖 {actor_mention(entry)} added a bot (**{member.name}**)"
+                )
             return
 
         # ---- WELCOME ----
@@ -169,6 +317,10 @@ class WelcomeSystem:
         if not channel:
             return
 
+        if in_burst(member.guild):
+            self._queue_digest(member, channel)
+            return
+
         count = human_member_number(member.guild)
         now = discord.utils.utcnow().strftime("%H:%M")
 
@@ -200,10 +352,57 @@ class WelcomeSystem:
 
         await channel.send(content=member.mention, embed=embed)
 
+    def _queue_digest(self, member: discord.Member, channel):
+        pending = self._digests.get(member.guild.id)
+        if pending is not None:
+            pending.append(member)
+            return
+        self._digests[member.guild.id] = [member]
+        self._digest_tasks[member.guild.id] = asyncio.get_running_loop().create_task(
+            self._post_digest(member.guild, channel)
+        )
+
+    async def _post_digest(self, guild: discord.Guild, channel):
+        try:
+            await asyncio.sleep(DIGEST_SECONDS)
+            members = [m for m in self._digests.pop(guild.id, []) if guild.get_member(m.id)]
+            if not members:
+                return
+
+            w = (await load_config()).get("welcome", {}) or {}
+            count = human_member_number(guild)
+            now = discord.utils.utcnow().strftime("%H:%M")
+
+            shown = " ".join(m.mention for m in members[:DIGEST_MAX_MENTIONS])
+            if len(members) > DIGEST_MAX_MENTIONS:
+                shown += f" and {len(members) - DIGEST_MAX_MENTIONS} more"
+
+            embed = discord.Embed(
+                title=f"🛬 {len(members)} new passengers just landed",
+                description=f"Welcome aboard {shown}!",
+                color=discord.Color.blurple(),
+            )
+            embed.set_footer(text=f"Now carrying {count} passengers ✈️ | Today at {now}")
+
+            imgs = w.get("arrival_images") or []
+            if imgs:
+                embed.set_image(url=random.choice(imgs))
+
+            # mentions stay in the embed: a digest shouldn't ping a whole raid
+            await channel.send(embed=embed)
+        except Exception:
+            print(f"⚠️ welcome digest for {guild.name} failed")
+            traceback.print_exc()
+        finally:
+            # a later burst may already have started the next digest: leave that one alone
+            if self._digest_tasks.get(guild.id) is asyncio.current_task():
+                del self._digest_tasks[guild.id]
+
     # ---------------- MEMBER REMOVE ----------------
 
     async def on_member_remove(self, member: discord.Member):
-        cfg = load_config()
+        HUMAN_MEMBERS.left(member.guild, member)
+        cfg = await load_config()
         m = cfg.get("member_logs", {}) or {}
 
         if not m.get("enabled") or not m.get("channel_id"):
@@ -213,17 +412,21 @@ class WelcomeSystem:
         if not channel:
             return
 
-        await asyncio.sleep(1.5)
-
-        async for entry in member.guild.audit_logs(
-            limit=5, action=discord.AuditLogAction.kick
-        ):
-            if entry.target and entry.target.id == member.id:
-                if m.get("log_kick", True):
-                    await channel.send(
-                        f"🥾 **{member.name}** was kicked by {entry.user.mention}"
-                    )
+        entry = await self.audit_log.wait_for(
+            member.guild.id, member.id,
+            discord.AuditLogAction.kick, discord.AuditLogAction.ban,
+        )
+        # a ban also removes the member: on_member_ban logs that one
+        if entry and entry.action == discord.AuditLogAction.ban:
+            if m.get("log_ban"):
                 return
+            entry = None
+        if entry:
+            if m.get("log_kick", True):
+                await channel.send(
+                    f"🥾 **{member.name}** was kicked by {actor_mention(entry)}"
+                )
+            return
 
         if m.get("log_leave", True):
             await channel.send(f"👋 **{member.name}** left the server")
@@ -231,7 +434,10 @@ class WelcomeSystem:
     # ---------------- MEMBER BAN ----------------
 
     async def on_member_ban(self, guild: discord.Guild, user: discord.User):
-        cfg = load_config()
+        # only a Member was actually in the guild (banning by id sends a User)
+        if isinstance(user, discord.Member):
+            HUMAN_MEMBERS.left(guild, user)
+        cfg = await load_config()
         m = cfg.get("member_logs", {}) or {}
 
         if not m.get("enabled") or not m.get("log_ban") or not m.get("channel_id"):
@@ -241,66 +447,54 @@ class WelcomeSystem:
         if not channel:
             return
 
-        await asyncio.sleep(1.5)
-
-        async for entry in guild.audit_logs(
-            limit=5, action=discord.AuditLogAction.ban
-        ):
-            if entry.target and entry.target.id == user.id:
-                await channel.send(
-                    f"⛔ **{user.name}** was banned by {entry.user.mention}"
-                )
-                return
+        entry = await self.audit_log.wait_for(
+            guild.id, user.id, discord.AuditLogAction.ban
+        )
+        if entry:
+            await channel.send(
+                f"⛔ **{user.name}** was banned by {actor_mention(entry)}"
+            )
 
     # ---------------- BOOST EVENT (LISTENER) ----------------
 
     async def on_message(self, message: discord.Message):
-        boost_types = [
-            discord.MessageType.premium_guild_subscription,
-            discord.MessageType.premium_guild_tier_1,
-            discord.MessageType.premium_guild_tier_2,
-            discord.MessageType.premium_guild_tier_3,
-        ]
-
-        if message.type not in boost_types:
+        if message.type not in BOOST_MESSAGE_TYPES:
             return
 
         # Config Check
-        cfg = load_config()
+        cfg = await load_config()
         b = cfg.get("boost", {}) or {}
         if not b.get("enabled") or not b.get("channel_id"):
             return
 
-        guild = message.guild
-        user = message.author
-        key = (guild.id, user.id)
-
         # Immediate Action for Tiers
         if message.type != discord.MessageType.premium_guild_subscription:
-            await self._execute_boost_embed(message, b["messages"]["tier"])
+            await self._execute_boost_embed(message.guild, message.author, b["messages"]["tier"])
             return
 
-        # Logic for Single vs Double
-        if key in self._pending_boost_counts:
-            self._pending_boost_counts[key] += 1
+        # Single vs Double: announced when the member's window closes
+        await self.boost_windows.add(message.guild.id, message.author.id)
+
+    async def _fire_boost_window(self, guild_id: int, user_id: int, count: int):
+        cfg = await load_config()
+        b = cfg.get("boost", {}) or {}
+        if not b.get("enabled") or not b.get("channel_id"):
+            return
+
+        guild = self.client.get_guild(guild_id)
+        if not guild:
             return
-        
-        self._pending_boost_counts[key] = 1
-        await asyncio.sleep(30) # Your requested wait time
-        
-        final_count = self._pending_boost_counts.pop(key, 1)
-        msg_template = b["messages"]["double"] if final_count > 1 else b["messages"]["single"]
-        
-        await self._execute_boost_embed(message, msg_template)
-
-    async def _execute_boost_embed(self, message, text_template):
-        cfg = load_config()
+        user = guild.get_member(user_id) or await self.client.fetch_user(user_id)
+
+        msg_template = b["messages"]["double"] if count > 1 else b["messages"]["single"]
+        await self._execute_boost_embed(guild, user, msg_template)
+
+    async def _execute_boost_embed(self, guild: discord.Guild, user, text_template):
+        cfg = await load_config()
         b = cfg.get("boost", {}) or {}
         channel = self.client.get_channel(int(b["channel_id"]))
         if not channel: return
 
-        guild = message.guild
-        user = message.author
         total_boosts = guild.premium_subscription_count or 0
         now = discord.utils.utcnow().strftime("%H:%M")
 
@@ -0,0 +1,108 @@
+# loop_watchdog.py
+# Measures event-loop lag and catches callbacks that block the loop.
+#
+# A heartbeat task on the loop ticks every TICK_SECONDS and records how late
+# each tick was (pilot_event_loop_lag_seconds). A plain thread watches that
+# heartbeat: if the loop hasn't ticked for STALL_SECONDS, something is
+# holding it (blocking I/O, heavy CPU), so the thread grabs the loop
+# thread's current stack - the offending code - while it is still running.
+# Once the loop is free again the stall is printed, counted in metrics and
+# posted to the runtime log channel.
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+import asyncio
+import threading
+import traceback
+from typing import Optional
+
+import discord
+
+import metrics
+
+TICK_SECONDS = 0.25
+STALL_SECONDS = float(os.getenv("PILOT_LOOP_STALL_SECONDS", "0.5"))
+
+LOOP_LAG = metrics.Histogram(
+    "pilot_event_loop_lag_seconds",
+    "How late the loop heartbeat ran",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOOP_STALLS = metrics.Counter("pilot_event_loop_stalls_total", "Times a callback held the loop past the stall threshold")
+LOOP_LAG_MAX = metrics.Gauge("pilot_event_loop_lag_max_seconds", "Longest loop stall since startup")
+
+
+class LoopWatchdog:
+    def __init__(self, client: discord.Client, *, stall_seconds: float = STALL_SECONDS):
+        self.client = client
+        self.stall_seconds = stall_seconds
+        self.max_lag = 0.0
+
+        self._beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._stack: Optional[str] = None  # captured by the watcher thread mid-stall
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self._task and not self._task.done():
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+
+    # ---------------- on the loop ----------------
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + TICK_SECONDS
+            await asyncio.sleep(TICK_SECONDS)
+            now = time.monotonic()
+            self._beat = now
+
+            lag = max(0.0, now - expected)
+            LOOP_LAG.labels().observe(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+                LOOP_LAG_MAX.labels().set(lag)
+
+            # always take the stack, so one captured for this beat can't be reported for a later stall
+            stack, self._stack = self._stack, None
+            if lag >= self.stall_seconds:
+                await self._report(lag, stack)
+
+    async def _report(self, lag: float, stack: Optional[str]) -> None:
+        LOOP_STALLS.labels().inc()
+        where = stack or "(stack not captured)\n"
+        print(f"🐌 Event loop blocked for {lag * 1000:.0f} ms. Offending stack:\n{where}", end="")
+
+        try:
+            from pilot_runtime_logger import log_stall
+            await log_stall(self.client, lag, where)
+        except Exception:
+            pass
+
+    # ---------------- watcher thread ----------------
+
+    def _watch(self) -> None:
+        captured_for = None
+        # the beat is a tick old before it is late: this much silence means lag >= stall_seconds
+        threshold = self.stall_seconds + TICK_SECONDS
+        while not self._stop.wait(self.stall_seconds / 2):
+            beat = self._beat
+            if time.monotonic() - beat < threshold or captured_for == beat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                # the deepest frames are the ones doing the blocking
+                self._stack = "".join(traceback.format_stack(frame)[-12:])
+            captured_for = beat
@@ -0,0 +1,66 @@
+# message_templates.py
+# The {placeholder} templates admins write for welcome, boost and birthday
+# messages.
+#
+# A template is tokenized once into literal and placeholder segments and
+# the result cached by its text, so every config version compiles once and
+# each send is a single join. Placeholders with no value are rendered back
+# verbatim; admin panels call unknown_placeholders() on save so that
+# typos are refused there instead of showing up in the channel.
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Iterable, List, Mapping, Tuple
+
+# {name} or {name:argument}, e.g. {user}, {channel:self_roles}
+_PLACEHOLDER = re.compile(r"\{(\w+(?::[^{}\n]+)?)\}")
+
+
+class Template:
+    __slots__ = ("source", "segments", "placeholders")
+
+    def __init__(self, source: str):
+        self.source = source
+        # re.split with one group alternates literal, placeholder, literal, ...
+        parts = _PLACEHOLDER.split(source)
+        self.segments: Tuple[Tuple[bool, str], ...] = tuple(
+            (i % 2 == 1, part) for i, part in enumerate(parts) if part
+        )
+        self.placeholders: Tuple[str, ...] = tuple(dict.fromkeys(parts[1::2]))
+
+    def render(self, values: Mapping[str, str]) -> str:
+        return "".join([
+            values.get(text, "{" + text + "}") if is_placeholder else text
+            for is_placeholder, text in self.segments
+        ])
+
+
+@lru_cache(maxsize=512)
+def compile_template(source: str) -> Template:
+    return Template(source or "")
+
+
+def unknown_placeholders(sources: Iterable[str], allowed: Iterable[str]) -> List[str]:
+    """
+    Placeholders used in `sources` that aren't in `allowed`. An allowed entry
+    ending in ":" (like "channel:") accepts any argument after it.
+    """
+    allowed = tuple(allowed)
+    exact = {a for a in allowed if not a.endswith(":")}
+    prefixes = tuple(a for a in allowed if a.endswith(":"))
+
+    unknown: List[str] = []
+    for source in sources:
+        for name in compile_template(source or "").placeholders:
+            if name in exact or (prefixes and name.startswith(prefixes)):
+                continue
+            if name not in unknown:
+                unknown.append(name)
+    return unknown
+
+
+def describe(allowed: Iterable[str]) -> str:
+    """Placeholder list for error messages: {user}, {channel:<slot>}, ..."""
+    return ", ".join("{" + (a + "<slot>" if a.endswith(":") else a) + "}" for a in allowed)
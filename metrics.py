@@ -0,0 +1,274 @@
+# metrics.py
+# In-process metrics in the Prometheus text format, no client library needed.
+# Histograms also keep a window of recent samples, so /metrics can show
+# p50/p95/p99 directly (as a summary) next to the cumulative buckets.
+#
+# What gets measured:
+#   pilot_slash_command_*   every app command (InstrumentedCommandTree)
+#   pilot_event_handler_*   every handler run by the EventRouter
+#   pilot_http_request_*    every outbound GitHub / Discord REST call (http_trace)
+
+from __future__ import annotations
+
+import re
+import time
+import bisect
+import threading
+from collections import deque
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import aiohttp
+import discord
+from discord import app_commands
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 3.0, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+RECENT_SAMPLES = 1024
+
+_lock = threading.Lock()  # observations may come from executor threads
+REGISTRY: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        REGISTRY.append(self)
+
+    def labels(self, *values) -> object:
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with _lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self) -> object:
+        raise NotImplementedError
+
+    def _items(self):
+        with _lock:
+            return list(self._children.items())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in self._items():
+            lines.append(f"{self.name}{_fmt_labels(self.label_names, key)} {child.value}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help_text, labels)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        items = self._items()
+        for key, child in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, child.counts):
+                cumulative += count
+                le = _fmt_labels(self.label_names, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _fmt_labels(self.label_names, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {child.count}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.label_names, key)} {child.sum}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.label_names, key)} {child.count}")
+
+        # p50/p95/p99 over the most recent samples, as a separate summary
+        recent = f"{self.name}_recent"
+        lines += [f"# HELP {recent} {self.help} (last {RECENT_SAMPLES} samples)", f"# TYPE {recent} summary"]
+        for key, child in items:
+            samples = sorted(child.recent)
+            for q in QUANTILES:
+                ql = _fmt_labels(self.label_names, key, 'quantile="%s"' % q)
+                lines.append(f"{recent}{ql} {_quantile(samples, q)}")
+            lines.append(f"{recent}_sum{_fmt_labels(self.label_names, key)} {sum(samples)}")
+            lines.append(f"{recent}_count{_fmt_labels(self.label_names, key)} {len(samples)}")
+        return lines
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count", "recent")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self.recent: deque = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        if i < len(self.counts):
+            self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+
+def _quantile(samples: List[float], q: float) -> float:
+    if not samples:
+        return float("nan")
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in list(REGISTRY):
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# =========================================================
+# Pilot metrics
+# =========================================================
+
+SLASH_SECONDS = Histogram("pilot_slash_command_seconds", "Time spent handling an app command", ["command"])
+SLASH_ERRORS = Counter("pilot_slash_command_errors_total", "App commands that raised", ["command"])
+SLASH_IN_FLIGHT = Gauge("pilot_slash_commands_in_flight", "App commands currently running", ["command"])
+
+HANDLER_SECONDS = Histogram("pilot_event_handler_seconds", "Time spent in a gateway event handler", ["event", "handler"])
+HANDLER_ERRORS = Counter("pilot_event_handler_errors_total", "Gateway event handlers that raised", ["event", "handler"])
+HANDLER_IN_FLIGHT = Gauge("pilot_event_handlers_in_flight", "Gateway event handlers currently running", ["event"])
+
+HTTP_SECONDS = Histogram("pilot_http_request_seconds", "Outbound REST call latency", ["service", "method", "route"])
+HTTP_ERRORS = Counter("pilot_http_request_errors_total", "Outbound REST calls that failed (4xx/5xx or no response)", ["service", "method", "route", "status"])
+HTTP_IN_FLIGHT = Gauge("pilot_http_requests_in_flight", "Outbound REST calls currently waiting", ["service"])
+
+
+@contextmanager
+def track(seconds: Histogram, errors: Counter, in_flight: Gauge, labels: Sequence[str], flight_labels: Optional[Sequence[str]] = None):
+    """Times the block into `seconds`, counting it in flight and counting exceptions."""
+    gauge = in_flight.labels(*(flight_labels if flight_labels is not None else labels))
+    gauge.inc()
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        errors.labels(*labels).inc()
+        raise
+    finally:
+        seconds.labels(*labels).observe(time.perf_counter() - started)
+        gauge.dec()
+
+
+# ---------------- app commands ----------------
+
+class InstrumentedCommandTree(app_commands.CommandTree):
+    """A CommandTree that times every app command it runs."""
+
+    async def _call(self, interaction: discord.Interaction) -> None:
+        name = (interaction.data or {}).get("name", "unknown")
+        with track(SLASH_SECONDS, SLASH_ERRORS, SLASH_IN_FLIGHT, [name]):
+            await super()._call(interaction)
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError) -> None:
+        # command exceptions are swallowed inside _call and reported here
+        SLASH_ERRORS.labels((interaction.data or {}).get("name", "unknown")).inc()
+        await super().on_error(interaction, error)
+
+
+# ---------------- outbound HTTP ----------------
+
+_ID_SEGMENT = re.compile(r"/\d{5,}|/[0-9a-f]{40}")
+# interaction and webhook tokens follow the id: /interactions/{id}/<token>, /webhooks/{id}/<token>
+_TOKEN_SEGMENT = re.compile(r"(/(?:interactions|webhooks)/\{id\})/[^/]+")
+
+
+def _route(url: "aiohttp.typedefs.StrOrURL") -> Tuple[str, str]:
+    host = getattr(url, "host", "") or ""
+    path = getattr(url, "path", str(url))
+    # snowflakes, shas and tokens become placeholders so label sets stay small
+    path = _ID_SEGMENT.sub("/{id}", path)
+    path = _TOKEN_SEGMENT.sub(r"\1/{token}", path)
+    service = "github" if "github" in host else "discord" if "discord" in host else host or "other"
+    return service, path
+
+
+def http_trace() -> aiohttp.TraceConfig:
+    """TraceConfig that times every request made through a session it is attached to."""
+    trace = aiohttp.TraceConfig()
+
+    async def on_start(session, ctx: SimpleNamespace, params) -> None:
+        ctx.service, ctx.route = _route(params.url)
+        ctx.method = params.method
+        ctx.started = time.perf_counter()
+        HTTP_IN_FLIGHT.labels(ctx.service).inc()
+
+    def finish(ctx: SimpleNamespace, status: str) -> None:
+        HTTP_IN_FLIGHT.labels(ctx.service).dec()
+        HTTP_SECONDS.labels(ctx.service, ctx.method, ctx.route).observe(time.perf_counter() - ctx.started)
+        # a 404 is how a document that doesn't exist yet looks: not a failure
+        if status == "error" or (status != "404" and int(status) >= 400):
+            HTTP_ERRORS.labels(ctx.service, ctx.method, ctx.route, status).inc()
+
+    async def on_end(session, ctx: SimpleNamespace, params) -> None:
+        finish(ctx, str(params.response.status))
+
+    async def on_exception(session, ctx: SimpleNamespace, params) -> None:
+        finish(ctx, "error")
+
+    trace.on_request_start.append(on_start)
+    trace.on_request_end.append(on_end)
+    trace.on_request_exception.append(on_exception)
+    return trace
@@ -22,7 +22,7 @@ def setup_mute_commands(tree: app_commands.CommandTree):
     @tree.command(name="timeout", description="Timeout a member using Discord's native system")
     @app_commands.describe(member="Member to timeout", minutes="Duration in minutes")
     async def mute(interaction: discord.Interaction, member: discord.Member, minutes: int):
-        if not has_app_access(interaction.user, "mute"):
+        if not await has_app_access(interaction.user, "mute"):
             return await interaction.response.send_message("❌ No permission.", ephemeral=True)
 
         if minutes <= 0:
@@ -45,7 +45,7 @@ def setup_mute_commands(tree: app_commands.CommandTree):
 
     @tree.command(name="untimeout", description="Remove timeout from a member")
     async def unmute(interaction: discord.Interaction, member: discord.Member):
-        if not has_app_access(interaction.user, "mute"):
+        if not await has_app_access(interaction.user, "mute"):
             return await interaction.response.send_message("❌ No permission.", ephemeral=True)
 
         try:
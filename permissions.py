@@ -1,14 +1,10 @@
-import os
-import json
-import base64
-import requests
-from typing import Any, Dict, Tuple
+import copy
+from typing import Any, Dict, FrozenSet, Optional, Set, Tuple
+
+from document_store import store
 
 # ------------------- GitHub Config -------------------
-GITHUB_REPO = os.getenv("GITHUB_REPO", "saraargh/the-pilot")
 GITHUB_FILE_PATH = "pilot_settings.json"
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-HEADERS = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
 
 # Always-allowed override role (you asked for this)
 OVERRIDE_ROLE_ID = 1404104881098195015  # sazzles
@@ -80,9 +76,6 @@ DEFAULT_SETTINGS: Dict[str, Any] = {
     }
 }
 
-def _gh_url() -> str:
-    return f"https://api.github.com/repos/{GITHUB_REPO}/contents/{GITHUB_FILE_PATH}"
-
 def _ensure_shape(settings: Dict[str, Any]) -> Dict[str, Any]:
     settings.setdefault("global_allowed_roles", [])
     settings.setdefault("apps", {})
@@ -91,63 +84,92 @@ def _ensure_shape(settings: Dict[str, Any]) -> Dict[str, Any]:
         settings["apps"][k].setdefault("allowed_roles", v["allowed_roles"][:])
     return settings
 
-def load_settings() -> Dict[str, Any]:
-    try:
-        r = requests.get(_gh_url(), headers=HEADERS, timeout=10)
-        if r.status_code == 200:
-            content = r.json()
-            raw = base64.b64decode(content["content"]).decode()
-            data = json.loads(raw) if raw.strip() else DEFAULT_SETTINGS.copy()
-            return _ensure_shape(data)
-        # 404 or other → create default
-        save_settings(DEFAULT_SETTINGS.copy())
-        return _ensure_shape(DEFAULT_SETTINGS.copy())
-    except Exception:
-        # fallback
-        return _ensure_shape(DEFAULT_SETTINGS.copy())
+_DOC = store.document(
+    GITHUB_FILE_PATH,
+    default=lambda: copy.deepcopy(DEFAULT_SETTINGS),
+    normalize=_ensure_shape,
+    message="Update pilot settings",
+    schema="permissions",
+)
+
+async def load_settings() -> Dict[str, Any]:
+    # served from the shared in-memory copy; falls back to defaults if GitHub is down
+    return await _DOC.load()
 
-def save_settings(settings: Dict[str, Any]) -> None:
-    settings = _ensure_shape(settings)
+async def save_settings(settings: Dict[str, Any]) -> None:
+    global _INDEX
     try:
-        # get sha if exists
-        sha = None
-        r = requests.get(_gh_url(), headers=HEADERS, timeout=10)
-        if r.status_code == 200:
-            sha = r.json().get("sha")
-
-        payload = {
-            "message": "Update pilot settings",
-            "content": base64.b64encode(json.dumps(settings, indent=2).encode()).decode()
-        }
-        if sha:
-            payload["sha"] = sha
-
-        requests.put(_gh_url(), headers=HEADERS, json=payload, timeout=10)
+        await _DOC.save(settings)
     except Exception:
         pass
+    _INDEX = None
 
-def has_global_access(member) -> bool:
-    # server owner always allowed
+# ------------------- Compiled permission index -------------------
+GLOBAL = "*"  # marks a role that may use every app
+MAX_MEMO = 4096
+
+def _role_id(value: Any):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+class PermissionIndex:
+    """pilot_settings.json compiled into role id -> app keys, with memoized decisions."""
+
+    def __init__(self, settings: Dict[str, Any]):
+        self.source = settings
+        self.apps_by_role: Dict[int, Set[str]] = {OVERRIDE_ROLE_ID: {GLOBAL}}
+        for rid in settings.get("global_allowed_roles", []):
+            self.apps_by_role.setdefault(_role_id(rid), set()).add(GLOBAL)
+        for app_key, app in (settings.get("apps") or {}).items():
+            for rid in (app or {}).get("allowed_roles", []):
+                self.apps_by_role.setdefault(_role_id(rid), set()).add(app_key)
+        self.decisions: Dict[Tuple[FrozenSet[int], str], bool] = {}
+
+    def allows(self, role_ids: FrozenSet[int], app_key: str) -> bool:
+        key = (role_ids, app_key)
+        decision = self.decisions.get(key)
+        if decision is None:
+            decision = False
+            for rid in role_ids:
+                apps = self.apps_by_role.get(rid)
+                if apps and (GLOBAL in apps or app_key in apps):
+                    decision = True
+                    break
+            if len(self.decisions) >= MAX_MEMO:
+                self.decisions.clear()
+            self.decisions[key] = decision
+        return decision
+
+_INDEX: Optional[PermissionIndex] = None
+
+async def _get_index() -> PermissionIndex:
+    global _INDEX
+    settings = await _DOC.read()
+    # a save or a background refresh swaps the live copy, which recompiles
+    if _INDEX is None or _INDEX.source is not settings:
+        _INDEX = PermissionIndex(settings)
+    return _INDEX
+
+def _is_owner(member) -> bool:
     try:
-        if member.guild and member.guild.owner_id == member.id:
-            return True
+        return bool(member.guild and member.guild.owner_id == member.id)
     except Exception:
-        pass
+        return False
 
-    # override role always allowed
-    if any(getattr(r, "id", None) == OVERRIDE_ROLE_ID for r in getattr(member, "roles", [])):
-        return True
+def _member_roles(member) -> FrozenSet[int]:
+    return frozenset(r.id for r in getattr(member, "roles", []))
 
-    settings = load_settings()
-    allowed = set(settings.get("global_allowed_roles", []))
-    member_roles = {r.id for r in getattr(member, "roles", [])}
-    return bool(member_roles & allowed)
+async def has_global_access(member) -> bool:
+    # server owner always allowed
+    if _is_owner(member):
+        return True
+    index = await _get_index()
+    return index.allows(_member_roles(member), GLOBAL)
 
-def has_app_access(member, app_key: str) -> bool:
-    if has_global_access(member):
+async def has_app_access(member, app_key: str) -> bool:
+    if _is_owner(member):
         return True
-    settings = load_settings()
-    app = settings.get("apps", {}).get(app_key, {})
-    allowed = set(app.get("allowed_roles", []))
-    member_roles = {r.id for r in getattr(member, "roles", [])}
-    return bool(member_roles & allowed)
\ No newline at end of file
+    index = await _get_index()
+    return index.allows(_member_roles(member), app_key)
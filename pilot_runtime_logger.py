@@ -1,7 +1,4 @@
 import os
-import json
-import base64
-import requests
 import discord
 from discord import app_commands
 from datetime import datetime, timedelta
@@ -9,29 +6,23 @@ import pytz
 
 # ✅ GLOBAL PERMISSIONS
 from permissions import has_global_access
+from document_store import store
 
 # ======================
 # CONFIG
 # ======================
 UK_TZ = pytz.timezone("Europe/London")
 
-GITHUB_REPO = os.getenv("GITHUB_REPO")
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-HEADERS = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
-
 GITHUB_FILE_PATH = "pilot_runtime_logs.json"
 
 ERROR_COOLDOWN = timedelta(minutes=5)
 _last_error_time: datetime | None = None
+_last_stall_time: datetime | None = None
 
 
 # ======================
 # GITHUB HELPERS
 # ======================
-def _github_url():
-    return f"https://api.github.com/repos/{GITHUB_REPO}/contents/{GITHUB_FILE_PATH}"
-
-
 def _default_settings():
     return {
         "enabled": False,
@@ -39,37 +30,19 @@ def _default_settings():
     }
 
 
-def load_settings():
-    try:
-        res = requests.get(_github_url(), headers=HEADERS)
-
-        if res.status_code == 404:
-            return _default_settings(), None
-
-        res.raise_for_status()
-        data = res.json()
-        content = base64.b64decode(data["content"]).decode("utf-8")
-        return json.loads(content), data["sha"]
-
-    except Exception:
-        return _default_settings(), None
-
+_DOC = store.document(
+    GITHUB_FILE_PATH,
+    default=_default_settings,
+    message="Update Pilot runtime log settings",
+)
 
-def save_settings(settings: dict, sha: str | None):
-    encoded = base64.b64encode(
-        json.dumps(settings, indent=2).encode("utf-8")
-    ).decode("utf-8")
 
-    payload = {
-        "message": "Update Pilot runtime log settings",
-        "content": encoded,
-    }
+async def load_settings():
+    return await _DOC.load()
 
-    if sha:
-        payload["sha"] = sha
 
-    res = requests.put(_github_url(), headers=HEADERS, json=payload)
-    res.raise_for_status()
+async def save_settings(settings: dict):
+    await _DOC.save(settings)
 
 
 # ======================
@@ -104,7 +77,7 @@ async def _get_channel(client: discord.Client, channel_id: int | None):
 # RUNTIME LOGGING
 # ======================
 async def log_startup(client: discord.Client):
-    settings, _ = load_settings()
+    settings = await load_settings()
     if not settings.get("enabled"):
         return
 
@@ -127,7 +100,7 @@ async def log_startup(client: discord.Client):
 async def log_error(client: discord.Client, event_method: str):
     global _last_error_time
 
-    settings, _ = load_settings()
+    settings = await load_settings()
     if not settings.get("enabled"):
         return
 
@@ -150,6 +123,34 @@ async def log_error(client: discord.Client, event_method: str):
     )
 
 
+async def log_stall(client: discord.Client, seconds: float, stack: str):
+    global _last_stall_time
+
+    settings = await load_settings()
+    if not settings.get("enabled"):
+        return
+
+    channel = await _get_channel(client, settings.get("channel_id"))
+    if not channel:
+        return
+
+    now = datetime.now(UK_TZ)
+
+    if _last_stall_time and now - _last_stall_time < ERROR_COOLDOWN:
+        return
+
+    _last_stall_time = now
+
+    # keep the tail of the stack: that's where the blocking call is
+    stack = stack[-1500:]
+    await channel.send(
+        "🐌 **The Pilot's event loop was blocked**\n"
+        f"⏱️ {seconds * 1000:.0f} ms\n"
+        f"🕒 {now.strftime('%d %b %Y · %H:%M:%S')} (UK time)\n"
+        f"```\n{stack}```"
+    )
+
+
 # ======================
 # SLASH COMMANDS
 # ======================
@@ -162,7 +163,7 @@ class PilotLogs(app_commands.Group):
 
     @app_commands.command(name="enable", description="Enable Pilot runtime logs")
     async def enable(self, interaction: discord.Interaction):
-        if not has_global_access(interaction):
+        if not await has_global_access(interaction):
             await interaction.response.send_message(
                 "❌ You don’t have permission to use this command.",
                 ephemeral=True
@@ -171,9 +172,9 @@ class PilotLogs(app_commands.Group):
 
         await interaction.response.defer(ephemeral=True)
 
-        settings, sha = load_settings()
+        settings = await load_settings()
         settings["enabled"] = True
-        save_settings(settings, sha)
+        await save_settings(settings)
 
         await interaction.followup.send(
             "✅ Pilot runtime logging **enabled**.",
@@ -182,7 +183,7 @@ class PilotLogs(app_commands.Group):
 
     @app_commands.command(name="disable", description="Disable Pilot runtime logs")
     async def disable(self, interaction: discord.Interaction):
-        if not has_global_access(interaction):
+        if not await has_global_access(interaction):
             await interaction.response.send_message(
                 "❌ You don’t have permission to use this command.",
                 ephemeral=True
@@ -191,9 +192,9 @@ class PilotLogs(app_commands.Group):
 
         await interaction.response.defer(ephemeral=True)
 
-        settings, sha = load_settings()
+        settings = await load_settings()
         settings["enabled"] = False
-        save_settings(settings, sha)
+        await save_settings(settings)
 
         await interaction.followup.send(
             "🛑 Pilot runtime logging **disabled**.",
@@ -207,7 +208,7 @@ class PilotLogs(app_commands.Group):
         interaction: discord.Interaction,
         channel: discord.TextChannel
     ):
-        if not has_global_access(interaction):
+        if not await has_global_access(interaction):
             await interaction.response.send_message(
                 "❌ You don’t have permission to use this command.",
                 ephemeral=True
@@ -216,9 +217,9 @@ class PilotLogs(app_commands.Group):
 
         await interaction.response.defer(ephemeral=True)
 
-        settings, sha = load_settings()
+        settings = await load_settings()
         settings["channel_id"] = channel.id
-        save_settings(settings, sha)
+        await save_settings(settings)
 
         await interaction.followup.send(
             f"📡 Pilot runtime log channel set to {channel.mention}",
@@ -4,7 +4,7 @@ from discord import app_commands
 from PIL import Image, ImageDraw
 import io
 import random
-import requests
+import aiohttp
 from datetime import datetime
 
 def setup_plane_commands(tree: app_commands.CommandTree):
@@ -218,9 +218,10 @@ def setup_plane_commands(tree: app_commands.CommandTree):
         ]
         URL = "https://raw.githubusercontent.com/JamesFT/Database-Quotes-JSON/master/quotes.json"
         try:
-            response = requests.get(URL, timeout=5)
-            response.raise_for_status()
-            data = response.json()
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
+                async with session.get(URL) as response:
+                    response.raise_for_status()
+                    data = await response.json(content_type=None)
             valid_quotes = [q for q in data if q.get("quoteText") and q.get("quoteText").strip() != ""]
             if valid_quotes and random.random() < 0.7:
                 quote = random.choice(valid_quotes)
@@ -101,7 +101,7 @@ def setup_poo_commands(tree: app_commands.CommandTree, client: discord.Client):
     # ===== Slash Commands =====
     @tree.command(name="clearpoo", description="Clear the poo role from everyone")
     async def clearpoo(interaction: discord.Interaction):
-        if not has_app_access(interaction.user, "poo_goat"):
+        if not await has_app_access(interaction.user, "poo_goat"):
             return await interaction.response.send_message("❌ You do not have permission.", ephemeral=True)
 
         await interaction.response.defer()
@@ -111,7 +111,7 @@ def setup_poo_commands(tree: app_commands.CommandTree, client: discord.Client):
     @tree.command(name="assignpoo", description="Manually assign the poo role to a member")
     @app_commands.describe(member="The member to assign the poo role")
     async def assignpoo(interaction: discord.Interaction, member: discord.Member):
-        if not has_app_access(interaction.user, "poo_goat"):
+        if not await has_app_access(interaction.user, "poo_goat"):
             return await interaction.response.send_message("❌ You do not have permission.", ephemeral=True)
 
         await interaction.response.defer()
@@ -127,7 +127,7 @@ def setup_poo_commands(tree: app_commands.CommandTree, client: discord.Client):
     @tree.command(name="removepoo", description="Remove the poo role from a member")
     @app_commands.describe(member="The member to remove the poo role from")
     async def removepoo(interaction: discord.Interaction, member: discord.Member):
-        if not has_app_access(interaction.user, "poo_goat"):
+        if not await has_app_access(interaction.user, "poo_goat"):
             return await interaction.response.send_message("❌ You do not have permission.", ephemeral=True)
 
         await interaction.response.defer()
@@ -142,7 +142,7 @@ def setup_poo_commands(tree: app_commands.CommandTree, client: discord.Client):
 
     @tree.command(name="testpoo", description="Test the poo automation")
     async def testpoo_command(interaction: discord.Interaction):
-        if not has_app_access(interaction.user, "poo_goat"):
+        if not await has_app_access(interaction.user, "poo_goat"):
             return await interaction.response.send_message("❌ You do not have permission.", ephemeral=True)
 
         await interaction.response.defer()
@@ -4,11 +4,8 @@
 
 from __future__ import annotations
 
-import json
 import os
 import asyncio
-import base64
-import requests
 from datetime import datetime, timedelta
 from typing import Dict
 
@@ -17,6 +14,8 @@ from discord import app_commands
 from discord.ext import tasks
 from zoneinfo import ZoneInfo
 
+from document_store import store
+
 
 # ==============================
 # CONFIG
@@ -51,15 +50,6 @@ if not all([GITHUB_TOKEN, GITHUB_REPO, POO_GOAT_GITHUB_PATH]):
         "GITHUB_TOKEN, GITHUB_REPO, POO_GOAT_GITHUB_PATH"
     )
 
-GITHUB_API_URL = (
-    f"https://api.github.com/repos/"
-    f"{GITHUB_REPO}/contents/{POO_GOAT_GITHUB_PATH}"
-)
-
-GITHUB_HEADERS = {
-    "Authorization": f"token {GITHUB_TOKEN}",
-    "Accept": "application/vnd.github+json"
-}
 
 
 # ==============================
@@ -75,49 +65,31 @@ def _default_data() -> Dict:
     }
 
 
-def load_data() -> Dict:
-    base = _default_data()
-
-    res = requests.get(GITHUB_API_URL, headers=GITHUB_HEADERS)
-
-    if res.status_code == 404:
-        save_data(base)
-        return base
-
-    res.raise_for_status()
-    payload = res.json()
-
-    content = base64.b64decode(payload["content"]).decode("utf-8")
-    data = json.loads(content)
-
+def _ensure_shape(data: Dict) -> Dict:
     data.setdefault("scores", {})
     data["scores"].setdefault("goat", {})
     data["scores"].setdefault("poo", {})
     data.setdefault("dates", {})
     data.setdefault("poo_milestones", {})
     data.setdefault("poo_role_until", {})
-
-    data["_sha"] = payload["sha"]
     return data
 
 
-def save_data(data: Dict):
-    sha = data.pop("_sha", None)
+_DOC = store.document(
+    POO_GOAT_GITHUB_PATH,
+    default=_default_data,
+    normalize=_ensure_shape,
+    message="Update poo/goat data",
+    schema="poo_goat",
+)
 
-    encoded = base64.b64encode(
-        json.dumps(data, indent=2).encode("utf-8")
-    ).decode("utf-8")
 
-    payload = {
-        "message": "Update poo/goat data",
-        "content": encoded
-    }
+async def load_data() -> Dict:
+    return await _DOC.load()
 
-    if sha:
-        payload["sha"] = sha
 
-    res = requests.put(GITHUB_API_URL, headers=GITHUB_HEADERS, json=payload)
-    res.raise_for_status()
+async def save_data(data: Dict):
+    await _DOC.save(data)
 
 
 def date_str(dt: datetime) -> str:
@@ -210,17 +182,11 @@ class LeaderboardView(discord.ui.View):
 def setup(bot: discord.Client):
 
     async def on_message(message: discord.Message):
-        if not message.author.bot:
-            return
-        if message.author.id != PILOT_BOT_ID:
-            return
-        if message.channel.id != ANNOUNCEMENT_CHANNEL_ID:
-            return
         if not message.mentions:
             return
 
         content = message.content.lower()
-        data = load_data()
+        data = await load_data()
         date = date_str(message.created_at)
         data["dates"].setdefault(date, {"goat": False, "poo": False})
 
@@ -260,20 +226,26 @@ def setup(bot: discord.Client):
                     )
 
             await message.add_reaction(POO_EMOJI)
-            save_data(data)
+            await save_data(data)
 
         # 🐐 GOAT
         if "is today’s goat" in content and not data["dates"][date]["goat"]:
             data["scores"]["goat"][uid] = data["scores"]["goat"].get(uid, 0) + 1
             data["dates"][date]["goat"] = True
             await message.add_reaction(GOAT_EMOJI)
-            save_data(data)
-
-    bot.on_message = on_message
+            await save_data(data)
+
+    bot.router.add(
+        "message",
+        on_message,
+        channels={ANNOUNCEMENT_CHANNEL_ID},
+        authors={PILOT_BOT_ID},
+        bots=True,
+    )
 
     @tasks.loop(hours=1)
     async def poo_cleanup():
-        data = load_data()
+        data = await load_data()
         now = datetime.now(UK_TZ)
         changed = False
 
@@ -288,13 +260,13 @@ def setup(bot: discord.Client):
                 changed = True
 
         if changed:
-            save_data(data)
+            await save_data(data)
 
     poo_cleanup.start()
 
     @app_commands.command(name="pooboard", description="View the POO leaderboard")
     async def pooboard(interaction: discord.Interaction):
-        data = load_data()
+        data = await load_data()
         embed = await build_leaderboard_embed(interaction.guild, "poo", 0, data)
         await interaction.response.send_message(
             embed=embed,
@@ -303,7 +275,7 @@ def setup(bot: discord.Client):
 
     @app_commands.command(name="goatboard", description="View the GOAT leaderboard")
     async def goatboard(interaction: discord.Interaction):
-        data = load_data()
+        data = await load_data()
         embed = await build_leaderboard_embed(interaction.guild, "goat", 0, data)
         await interaction.response.send_message(
             embed=embed,
@@ -323,7 +295,7 @@ def setup(bot: discord.Client):
             await interaction.followup.send("❌ Announcement channel not found.")
             return
 
-        data = load_data()
+        data = await load_data()
 
         async for message in channel.history(limit=None, oldest_first=True):
             if message.author.id != PILOT_BOT_ID or not message.mentions:
@@ -350,7 +322,7 @@ def setup(bot: discord.Client):
 
             await asyncio.sleep(0.25)
 
-        save_data(data)
+        await save_data(data)
         await interaction.followup.send("✅ POO / GOAT history rebuilt.")
 
     bot.tree.add_command(pooboard)
@@ -15,7 +15,7 @@ def setup(tree: app_commands.CommandTree):
         description="List all server roles with their IDs"
     )
     async def rolepull(interaction: discord.Interaction):
-        if not isinstance(interaction.user, discord.Member) or not has_global_access(interaction.user):
+        if not isinstance(interaction.user, discord.Member) or not await has_global_access(interaction.user):
             return await interaction.response.send_message(
                 "❌ You do not have permission to use this.",
                 ephemeral=True
@@ -70,7 +70,7 @@ def setup(tree: app_commands.CommandTree):
         description="List all custom server emojis with their IDs"
     )
     async def emojipull(interaction: discord.Interaction):
-        if not isinstance(interaction.user, discord.Member) or not has_global_access(interaction.user):
+        if not isinstance(interaction.user, discord.Member) or not await has_global_access(interaction.user):
             return await interaction.response.send_message(
                 "❌ You do not have permission to use this.",
                 ephemeral=True
@@ -1,33 +1,21 @@
 from __future__ import annotations
 
 import os
-import json
-import base64
 import asyncio
 from typing import Dict, Any, List, Optional, Tuple
 
-import requests
 import discord
 from discord import app_commands
 
 from permissions import has_global_access
+from document_store import store
+from join_burst import in_burst
 
 # =========================================================
 # GITHUB CONFIG (selfroles.json lives in same repo)
 # =========================================================
 
-GITHUB_REPO = os.getenv("GITHUB_REPO", "saraargh/the-pilot")
 GITHUB_FILE_PATH = os.getenv("SELFROLES_FILE_PATH", "selfroles.json")
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-
-HEADERS = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
-
-def _gh_url() -> str:
-    return f"https://api.github.com/repos/{GITHUB_REPO}/contents/{GITHUB_FILE_PATH}"
-
-# Small cache so we don't spam GitHub for every UI redraw.
-_CONFIG_CACHE: Dict[str, Any] = {"data": None, "sha": None, "ts": 0.0}
-_CACHE_TTL_SECONDS = 2.0
 
 # =========================================================
 # CONFIG SHAPE
@@ -99,70 +87,24 @@ def ensure_shape(cfg: Dict[str, Any]) -> Dict[str, Any]:
     return cfg
 
 # =========================================================
-# GITHUB IO (async-safe)
+# GITHUB IO (shared document store)
 # =========================================================
 
-def _gh_get_file_sync() -> Tuple[Dict[str, Any], Optional[str]]:
-    r = requests.get(_gh_url(), headers=HEADERS, timeout=15)
-    if r.status_code == 404:
-        return ensure_shape({}), None
-    if r.status_code != 200:
-        raise RuntimeError(f"GitHub GET failed: {r.status_code} {r.text}")
-
-    payload = r.json()
-    sha = payload.get("sha")
-    content_b64 = payload.get("content", "")
-    raw = base64.b64decode(content_b64).decode("utf-8") if content_b64 else ""
-    data = json.loads(raw) if raw.strip() else {}
-    return ensure_shape(data), sha
-
-def _gh_put_file_sync(cfg: Dict[str, Any], sha: Optional[str]) -> str:
-    cfg = ensure_shape(cfg)
-    body = json.dumps(cfg, indent=2, ensure_ascii=False)
-
-    payload: Dict[str, Any] = {
-        "message": "Update selfroles.json",
-        "content": base64.b64encode(body.encode("utf-8")).decode("utf-8"),
-    }
-    if sha:
-        payload["sha"] = sha
-
-    r = requests.put(_gh_url(), headers=HEADERS, json=payload, timeout=15)
-    if r.status_code not in (200, 201):
-        raise RuntimeError(f"GitHub PUT failed: {r.status_code} {r.text}")
-
-    return r.json().get("content", {}).get("sha") or r.json().get("sha") or sha or ""
+_DOC = store.document(
+    GITHUB_FILE_PATH,
+    default=dict,
+    normalize=ensure_shape,
+    message="Update selfroles.json",
+    schema="selfroles",
+)
 
 async def load_config(force: bool = False) -> Dict[str, Any]:
-    now = asyncio.get_running_loop().time()
-    if not force:
-        if _CONFIG_CACHE["data"] is not None and (now - float(_CONFIG_CACHE["ts"])) <= _CACHE_TTL_SECONDS:
-            return ensure_shape(dict(_CONFIG_CACHE["data"]))
-
-    data, sha = await asyncio.to_thread(_gh_get_file_sync)
-    _CONFIG_CACHE["data"] = dict(data)
-    _CONFIG_CACHE["sha"] = sha
-    _CONFIG_CACHE["ts"] = now
-    return ensure_shape(dict(data))
+    if force:
+        await _DOC.refresh()
+    return await _DOC.load()
 
 async def save_config(cfg: Dict[str, Any]) -> None:
-    sha = _CONFIG_CACHE.get("sha")
-    try:
-        new_sha = await asyncio.to_thread(_gh_put_file_sync, cfg, sha)
-    except RuntimeError as e:
-        msg = str(e)
-        if "409" in msg or "422" in msg:
-            fresh_cfg, fresh_sha = await asyncio.to_thread(_gh_get_file_sync)
-            _CONFIG_CACHE["data"] = dict(fresh_cfg)
-            _CONFIG_CACHE["sha"] = fresh_sha
-            _CONFIG_CACHE["ts"] = asyncio.get_running_loop().time()
-            new_sha = await asyncio.to_thread(_gh_put_file_sync, cfg, fresh_sha)
-        else:
-            raise
-
-    _CONFIG_CACHE["data"] = ensure_shape(dict(cfg))
-    _CONFIG_CACHE["sha"] = new_sha or sha
-    _CONFIG_CACHE["ts"] = asyncio.get_running_loop().time()
+    await _DOC.save(cfg)
 
 def guild_me(guild: discord.Guild) -> Optional[discord.Member]:
     try:
@@ -255,6 +197,49 @@ def _fmt_chan(cid: Optional[int]) -> str:
 # AUTO ROLES
 # =========================================================
 
+class AutoRoleQueue:
+    """
+    Auto-role grants during a join burst: one worker, one roles edit per
+    member (instead of one call per role), spaced GRANT_SPACING_SECONDS
+    apart. Any 429 that still happens is waited out by discord.py's HTTP
+    client inside add_roles, which holds the worker back with it.
+    """
+
+    GRANT_SPACING_SECONDS = 0.5
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def put(self, member: discord.Member, roles: List[discord.Role]) -> None:
+        self._queue.put_nowait((member.guild, member.id, roles))
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while not self._queue.empty():
+            guild, member_id, roles = self._queue.get_nowait()
+            try:
+                await self._grant(guild, member_id, roles)
+            except Exception as e:
+                print(f"⚠️ auto roles: granting {member_id} failed: {e}")
+            await asyncio.sleep(self.GRANT_SPACING_SECONDS)
+
+    async def _grant(self, guild: discord.Guild, member_id: int, roles: List[discord.Role]):
+        # re-read the member when its turn comes: the edit replaces the whole role list
+        member = guild.get_member(member_id)
+        if member is None:
+            return  # already left
+        missing = [r for r in roles if r not in member.roles]
+        if not missing:
+            return
+        try:
+            await member.add_roles(*missing, reason="Auto role", atomic=False)
+        except discord.NotFound:
+            pass
+
+AUTO_ROLE_QUEUE = AutoRoleQueue()
+
 async def apply_auto_roles(member: discord.Member):
     cfg = await load_config()
     auto = cfg.get("auto_roles", {})
@@ -264,6 +249,7 @@ async def apply_auto_roles(member: discord.Member):
     if not me:
         return
 
+    roles: List[discord.Role] = []
     for rid in role_ids:
         role = member.guild.get_role(int(rid))
         if not role:
@@ -272,6 +258,16 @@ async def apply_auto_roles(member: discord.Member):
             continue
         if not role_manageable(role, me):
             continue
+        roles.append(role)
+
+    if not roles:
+        return
+
+    if in_burst(member.guild):
+        AUTO_ROLE_QUEUE.put(member, roles)
+        return
+
+    for role in roles:
         try:
             await member.add_roles(role, reason="Auto role")
         except Exception:
@@ -1355,7 +1351,7 @@ class RequestCompleteView(discord.ui.View):
             return
 
         # Optional: gate to admins only (same as completion)
-        if not isinstance(interaction.user, discord.Member) or not has_global_access(interaction.user):
+        if not isinstance(interaction.user, discord.Member) or not await has_global_access(interaction.user):
             return await interaction.response.send_message("❌ No permission.", ephemeral=True)
 
         cfg = await load_config()
@@ -1377,7 +1373,7 @@ class RequestCompleteView(discord.ui.View):
             return
 
         # gate completion to admins (same permission style as rolesettings)
-        if not isinstance(interaction.user, discord.Member) or not has_global_access(interaction.user):
+        if not isinstance(interaction.user, discord.Member) or not await has_global_access(interaction.user):
             return await interaction.response.send_message("❌ No permission.", ephemeral=True)
 
         await interaction.response.defer(ephemeral=True)
@@ -1485,7 +1481,7 @@ class RoleSettingsDashboard(discord.ui.View):
 
 @app_commands.command(name="rolesettings", description="Admin panel for self-roles + role tools")
 async def rolesettings(interaction: discord.Interaction):
-    if not isinstance(interaction.user, discord.Member) or not has_global_access(interaction.user):
+    if not isinstance(interaction.user, discord.Member) or not await has_global_access(interaction.user):
         return await interaction.response.send_message("❌ You do not have permission.", ephemeral=True)
 
     cfg = await load_config()
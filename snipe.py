@@ -88,11 +88,8 @@ class ISnipeView(discord.ui.View):
 def setup(client: discord.Client, tree: app_commands.CommandTree):
 
     # ---------- DELETE ----------
-    @client.event
+    @client.router.on("message_delete", bots=False, guild_only=True)
     async def on_message_delete(message: discord.Message):
-        if not message.guild or message.author.bot:
-            return
-
         DELETED[message.channel.id].append({
             "author": message.author,
             "content": message.content,
@@ -101,10 +98,8 @@ def setup(client: discord.Client, tree: app_commands.CommandTree):
         })
 
     # ---------- EDIT ----------
-    @client.event
+    @client.router.on("message_edit", bots=False, guild_only=True)
     async def on_message_edit(before: discord.Message, after: discord.Message):
-        if not before.guild or before.author.bot:
-            return
         if before.content == after.content:
             return
 
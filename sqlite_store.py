@@ -0,0 +1,598 @@
+# sqlite_store.py
+# Local SQLite backend for the DocumentStore (PILOT_STORAGE=sqlite).
+# The documents that grow or change often (warnings and their journal,
+# birthdays, poo/goat scores, permissions, self roles) are mapped onto real
+# tables; the small config and state documents keep one row per top-level
+# key. Saving diffs the old and new copies and only touches the rows that
+# changed (one warn = one INSERT).
+#
+# One-shot import of the existing GitHub files:
+#   python sqlite_store.py            # imports anything not imported yet
+#   python sqlite_store.py --force    # re-imports everything
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import sqlite3
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def _dump(v: Any) -> str:
+    return json.dumps(v, ensure_ascii=False, sort_keys=True)
+
+
+# =========================================================
+# Schemas (one per document kind)
+# =========================================================
+
+class KeyValueSchema:
+    """Fallback: one row per top-level key. Used for the small config docs."""
+
+    # top-level keys owned by dedicated tables (skipped by the key/value rows)
+    owned: Tuple[str, ...] = ()
+
+    def create(self, conn: sqlite3.Connection) -> None:
+        pass
+
+    def read(self, conn: sqlite3.Connection, path: str) -> Dict[str, Any]:
+        rows = conn.execute(
+            "SELECT key, value FROM doc_fields WHERE path = ? ORDER BY rowid", (path,)
+        ).fetchall()
+        return {k: json.loads(v) for k, v in rows}
+
+    def adopt_rows(self, conn: sqlite3.Connection, path: str, data: Dict[str, Any]) -> None:
+        """
+        Owned keys found in `data` were saved as key/value rows before their
+        table existed: moves them into the table, once. Call from read().
+        """
+        legacy = {k: data.pop(k) for k in self.owned if k in data}
+        if not legacy:
+            return
+        with conn:
+            conn.execute("BEGIN")
+            self.write(conn, path, {}, legacy)
+            conn.executemany("DELETE FROM doc_fields WHERE path = ? AND key = ?", [(path, k) for k in legacy])
+
+    def write(self, conn: sqlite3.Connection, path: str, old: Dict[str, Any], new: Dict[str, Any]) -> None:
+        old_keys = {k for k in old if k not in self.owned}
+        new_keys = {k for k in new if k not in self.owned}
+
+        for k in old_keys - new_keys:
+            conn.execute("DELETE FROM doc_fields WHERE path = ? AND key = ?", (path, k))
+
+        for k in new_keys:
+            if k in old and _dump(old[k]) == _dump(new[k]):
+                continue
+            conn.execute(
+                "INSERT INTO doc_fields (path, key, value) VALUES (?, ?, ?) "
+                "ON CONFLICT(path, key) DO UPDATE SET value = excluded.value",
+                (path, k, _dump(new[k])),
+            )
+
+
+class WarningsSchema(KeyValueSchema):
+    owned = ("warnings", "blocked_warners")
+
+    def create(self, conn):
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS warnings (
+                id      INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                reason  TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_warnings_user ON warnings (user_id);
+            CREATE TABLE IF NOT EXISTS blocked_warners (
+                user_id INTEGER PRIMARY KEY
+            );
+        """)
+
+    def read(self, conn, path):
+        data = super().read(conn, path)
+        warns: Dict[str, List[str]] = {}
+        for uid, reason in conn.execute("SELECT user_id, reason FROM warnings ORDER BY id"):
+            warns.setdefault(uid, []).append(reason)
+        data["warnings"] = warns
+        data["blocked_warners"] = [r[0] for r in conn.execute("SELECT user_id FROM blocked_warners ORDER BY rowid")]
+        return data
+
+    def write(self, conn, path, old, new):
+        super().write(conn, path, old, new)
+
+        old_w = old.get("warnings") or {}
+        new_w = new.get("warnings") or {}
+
+        for uid in old_w.keys() - new_w.keys():
+            conn.execute("DELETE FROM warnings WHERE user_id = ?", (uid,))
+
+        for uid, reasons in new_w.items():
+            prev = old_w.get(uid)
+            if prev == reasons:
+                continue
+            if prev is None:
+                tail = reasons
+            elif reasons[:len(prev)] == prev:
+                tail = reasons[len(prev):]  # plain append: insert only the new rows
+            else:
+                conn.execute("DELETE FROM warnings WHERE user_id = ?", (uid,))
+                tail = reasons
+            conn.executemany(
+                "INSERT INTO warnings (user_id, reason) VALUES (?, ?)",
+                [(uid, str(r)) for r in tail],
+            )
+
+        old_b = set(old.get("blocked_warners") or [])
+        new_b = set(new.get("blocked_warners") or [])
+        conn.executemany("DELETE FROM blocked_warners WHERE user_id = ?", [(u,) for u in old_b - new_b])
+        conn.executemany(
+            "INSERT OR IGNORE INTO blocked_warners (user_id) VALUES (?)",
+            [(u,) for u in new.get("blocked_warners") or [] if u not in old_b],
+        )
+
+
+class WarningsJournalSchema(KeyValueSchema):
+    """Append-only: one row per event, so a warn is one INSERT and a compaction one DELETE."""
+
+    owned = ("events",)
+
+    def create(self, conn):
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS warning_events (
+                seq   INTEGER PRIMARY KEY,
+                event TEXT NOT NULL
+            );
+        """)
+
+    def read(self, conn, path):
+        data = super().read(conn, path)
+        self.adopt_rows(conn, path, data)
+        data["events"] = [json.loads(ev) for (ev,) in conn.execute("SELECT event FROM warning_events ORDER BY seq")]
+        return data
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, events: Iterable[Dict[str, Any]]) -> None:
+        conn.executemany(
+            "INSERT OR REPLACE INTO warning_events (seq, event) VALUES (?, ?)",
+            [(int(ev.get("seq", 0)), _dump(ev)) for ev in events],
+        )
+
+    def write(self, conn, path, old, new):
+        super().write(conn, path, old, new)
+
+        old_seqs = {ev.get("seq", 0) for ev in old.get("events") or []}
+        new_events = new.get("events") or []
+        new_seqs = {ev.get("seq", 0) for ev in new_events}
+        conn.executemany("DELETE FROM warning_events WHERE seq = ?", [(s,) for s in old_seqs - new_seqs])
+        self._insert(conn, [ev for ev in new_events if ev.get("seq", 0) not in old_seqs])
+
+
+class PooGoatSchema(KeyValueSchema):
+    owned = ("scores", "dates", "poo_milestones", "poo_role_until")
+
+    def create(self, conn):
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS scores (
+                board   TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                score   INTEGER NOT NULL,
+                PRIMARY KEY (board, user_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_scores_board ON scores (board, score DESC);
+            CREATE TABLE IF NOT EXISTS poo_goat_dates (
+                date TEXT PRIMARY KEY,
+                goat INTEGER NOT NULL DEFAULT 0,
+                poo  INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS poo_milestones (
+                user_id   TEXT NOT NULL,
+                milestone INTEGER NOT NULL,
+                PRIMARY KEY (user_id, milestone)
+            );
+            CREATE TABLE IF NOT EXISTS poo_role_until (
+                user_id TEXT PRIMARY KEY,
+                until   TEXT NOT NULL
+            );
+        """)
+
+    def read(self, conn, path):
+        data = super().read(conn, path)
+
+        scores: Dict[str, Dict[str, int]] = {"goat": {}, "poo": {}}
+        for board, uid, score in conn.execute("SELECT board, user_id, score FROM scores ORDER BY rowid"):
+            scores.setdefault(board, {})[uid] = score
+        data["scores"] = scores
+
+        data["dates"] = {
+            d: {"goat": bool(g), "poo": bool(p)}
+            for d, g, p in conn.execute("SELECT date, goat, poo FROM poo_goat_dates ORDER BY date")
+        }
+
+        milestones: Dict[str, List[int]] = {}
+        for uid, m in conn.execute("SELECT user_id, milestone FROM poo_milestones ORDER BY milestone"):
+            milestones.setdefault(uid, []).append(m)
+        data["poo_milestones"] = milestones
+
+        data["poo_role_until"] = dict(conn.execute("SELECT user_id, until FROM poo_role_until"))
+        return data
+
+    def write(self, conn, path, old, new):
+        super().write(conn, path, old, new)
+
+        old_s = old.get("scores") or {}
+        new_s = new.get("scores") or {}
+        for board in set(old_s) | set(new_s):
+            o = old_s.get(board) or {}
+            n = new_s.get(board) or {}
+            conn.executemany(
+                "DELETE FROM scores WHERE board = ? AND user_id = ?",
+                [(board, uid) for uid in o.keys() - n.keys()],
+            )
+            conn.executemany(
+                "INSERT INTO scores (board, user_id, score) VALUES (?, ?, ?) "
+                "ON CONFLICT(board, user_id) DO UPDATE SET score = excluded.score",
+                [(board, uid, int(v)) for uid, v in n.items() if o.get(uid) != v],
+            )
+
+        old_d = old.get("dates") or {}
+        new_d = new.get("dates") or {}
+        conn.executemany("DELETE FROM poo_goat_dates WHERE date = ?", [(d,) for d in old_d.keys() - new_d.keys()])
+        conn.executemany(
+            "INSERT INTO poo_goat_dates (date, goat, poo) VALUES (?, ?, ?) "
+            "ON CONFLICT(date) DO UPDATE SET goat = excluded.goat, poo = excluded.poo",
+            [
+                (d, int(bool(v.get("goat"))), int(bool(v.get("poo"))))
+                for d, v in new_d.items() if old_d.get(d) != v
+            ],
+        )
+
+        old_m = old.get("poo_milestones") or {}
+        new_m = new.get("poo_milestones") or {}
+        for uid in set(old_m) | set(new_m):
+            o = set(old_m.get(uid) or [])
+            n = set(new_m.get(uid) or [])
+            conn.executemany("DELETE FROM poo_milestones WHERE user_id = ? AND milestone = ?", [(uid, m) for m in o - n])
+            conn.executemany("INSERT OR IGNORE INTO poo_milestones (user_id, milestone) VALUES (?, ?)", [(uid, m) for m in n - o])
+
+        old_r = old.get("poo_role_until") or {}
+        new_r = new.get("poo_role_until") or {}
+        conn.executemany("DELETE FROM poo_role_until WHERE user_id = ?", [(u,) for u in old_r.keys() - new_r.keys()])
+        conn.executemany(
+            "INSERT INTO poo_role_until (user_id, until) VALUES (?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET until = excluded.until",
+            [(u, v) for u, v in new_r.items() if old_r.get(u) != v],
+        )
+
+
+class BirthdaysSchema(KeyValueSchema):
+    owned = ("birthdays",)
+
+    def create(self, conn):
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS birthdays (
+                user_id  TEXT PRIMARY KEY,
+                day      INTEGER NOT NULL,
+                month    INTEGER NOT NULL,
+                timezone TEXT NOT NULL DEFAULT 'Europe/London'
+            );
+            CREATE INDEX IF NOT EXISTS idx_birthdays_month_day ON birthdays (month, day);
+        """)
+
+    def read(self, conn, path):
+        data = super().read(conn, path)
+        data["birthdays"] = {
+            uid: {"day": d, "month": m, "timezone": tz}
+            for uid, d, m, tz in conn.execute("SELECT user_id, day, month, timezone FROM birthdays ORDER BY rowid")
+        }
+        return data
+
+    def write(self, conn, path, old, new):
+        super().write(conn, path, old, new)
+
+        old_b = old.get("birthdays") or {}
+        new_b = new.get("birthdays") or {}
+        conn.executemany("DELETE FROM birthdays WHERE user_id = ?", [(u,) for u in old_b.keys() - new_b.keys()])
+        conn.executemany(
+            "INSERT INTO birthdays (user_id, day, month, timezone) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET day = excluded.day, month = excluded.month, timezone = excluded.timezone",
+            [
+                (uid, int(r["day"]), int(r["month"]), r.get("timezone") or "Europe/London")
+                for uid, r in new_b.items() if old_b.get(uid) != r
+            ],
+        )
+
+
+class PermissionsSchema(KeyValueSchema):
+    owned = ("global_allowed_roles", "apps")
+
+    def create(self, conn):
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS permission_scopes (
+                scope TEXT PRIMARY KEY
+            );
+            CREATE TABLE IF NOT EXISTS permission_roles (
+                scope   TEXT NOT NULL,
+                role_id INTEGER NOT NULL,
+                PRIMARY KEY (scope, role_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_permission_roles_role ON permission_roles (role_id);
+        """)
+
+    @staticmethod
+    def _scopes(data: Dict[str, Any]) -> Dict[str, List[int]]:
+        out = {"global": list(data.get("global_allowed_roles") or [])}
+        for k, app in (data.get("apps") or {}).items():
+            out[k] = list((app or {}).get("allowed_roles") or [])
+        return out
+
+    def read(self, conn, path):
+        data = super().read(conn, path)
+        scopes = {s: [] for (s,) in conn.execute("SELECT scope FROM permission_scopes ORDER BY rowid")}
+        for scope, rid in conn.execute("SELECT scope, role_id FROM permission_roles ORDER BY rowid"):
+            scopes.setdefault(scope, []).append(rid)
+
+        data["global_allowed_roles"] = scopes.pop("global", [])
+        data["apps"] = {k: {"allowed_roles": v} for k, v in scopes.items()}
+        return data
+
+    def write(self, conn, path, old, new):
+        super().write(conn, path, old, new)
+
+        o_scopes = self._scopes(old)
+        n_scopes = self._scopes(new)
+
+        for scope in o_scopes.keys() - n_scopes.keys():
+            conn.execute("DELETE FROM permission_scopes WHERE scope = ?", (scope,))
+            conn.execute("DELETE FROM permission_roles WHERE scope = ?", (scope,))
+
+        for scope, roles in n_scopes.items():
+            conn.execute("INSERT OR IGNORE INTO permission_scopes (scope) VALUES (?)", (scope,))
+            o = set(o_scopes.get(scope) or [])
+            n = set(roles)
+            conn.executemany("DELETE FROM permission_roles WHERE scope = ? AND role_id = ?", [(scope, r) for r in o - n])
+            # keep the configured order (rowid) for the panel overview
+            conn.executemany("INSERT OR IGNORE INTO permission_roles (scope, role_id) VALUES (?, ?)", [(scope, r) for r in roles if r not in o])
+
+
+class SelfRolesSchema(KeyValueSchema):
+    owned = ("auto_roles", "categories", "role_requests")
+
+    def create(self, conn):
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS auto_roles (
+                kind    TEXT NOT NULL,
+                role_id TEXT NOT NULL,
+                PRIMARY KEY (kind, role_id)
+            );
+            CREATE TABLE IF NOT EXISTS selfrole_categories (
+                key          TEXT PRIMARY KEY,
+                title        TEXT NOT NULL,
+                description  TEXT NOT NULL DEFAULT '',
+                emoji        TEXT,
+                multi_select INTEGER NOT NULL DEFAULT 1
+            );
+            CREATE TABLE IF NOT EXISTS selfrole_options (
+                category TEXT NOT NULL,
+                role_id  TEXT NOT NULL,
+                label    TEXT NOT NULL,
+                emoji    TEXT,
+                PRIMARY KEY (category, role_id)
+            );
+            CREATE TABLE IF NOT EXISTS role_requests (
+                message_id TEXT PRIMARY KEY,
+                user_id    INTEGER NOT NULL,
+                role_type  TEXT,
+                role_name  TEXT,
+                colour     TEXT,
+                icon       TEXT
+            );
+        """)
+
+    def read(self, conn, path):
+        data = super().read(conn, path)
+        self.adopt_rows(conn, path, data)
+
+        auto: Dict[str, List[str]] = {"humans": [], "bots": []}
+        for kind, rid in conn.execute("SELECT kind, role_id FROM auto_roles ORDER BY rowid"):
+            auto.setdefault(kind, []).append(rid)
+        data["auto_roles"] = auto
+
+        categories: Dict[str, Dict[str, Any]] = {}
+        for key, title, description, emoji, multi in conn.execute(
+            "SELECT key, title, description, emoji, multi_select FROM selfrole_categories ORDER BY rowid"
+        ):
+            categories[key] = {"title": title, "description": description, "emoji": emoji, "multi_select": bool(multi), "roles": {}}
+        for cat, rid, label, emoji in conn.execute("SELECT category, role_id, label, emoji FROM selfrole_options ORDER BY rowid"):
+            if cat in categories:
+                categories[cat]["roles"][rid] = {"label": label, "emoji": emoji}
+        data["categories"] = categories
+
+        data["role_requests"] = {
+            mid: {"user_id": uid, "role_type": rt, "role_name": rn, "colour": colour, "icon": icon}
+            for mid, uid, rt, rn, colour, icon in conn.execute(
+                "SELECT message_id, user_id, role_type, role_name, colour, icon FROM role_requests ORDER BY rowid"
+            )
+        }
+        return data
+
+    def write(self, conn, path, old, new):
+        super().write(conn, path, old, new)
+
+        old_a = old.get("auto_roles") or {}
+        new_a = new.get("auto_roles") or {}
+        for kind in set(old_a) | set(new_a):
+            o = [str(r) for r in old_a.get(kind) or []]
+            n = [str(r) for r in new_a.get(kind) or []]
+            conn.executemany("DELETE FROM auto_roles WHERE kind = ? AND role_id = ?", [(kind, r) for r in set(o) - set(n)])
+            conn.executemany("INSERT OR IGNORE INTO auto_roles (kind, role_id) VALUES (?, ?)", [(kind, r) for r in n if r not in o])
+
+        old_c = old.get("categories") or {}
+        new_c = new.get("categories") or {}
+        for key in old_c.keys() - new_c.keys():
+            conn.execute("DELETE FROM selfrole_categories WHERE key = ?", (key,))
+            conn.execute("DELETE FROM selfrole_options WHERE category = ?", (key,))
+        for key, cat in new_c.items():
+            prev = old_c.get(key)
+            if prev == cat:
+                continue
+            # upsert keeps the category's rowid, so the panel order stays put
+            conn.execute(
+                "INSERT INTO selfrole_categories (key, title, description, emoji, multi_select) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET title = excluded.title, description = excluded.description, "
+                "emoji = excluded.emoji, multi_select = excluded.multi_select",
+                (key, str(cat.get("title") or key), cat.get("description") or "", cat.get("emoji"), int(bool(cat.get("multi_select", True)))),
+            )
+            roles = cat.get("roles") or {}
+            if prev is not None and (prev.get("roles") or {}) == roles:
+                continue
+            # a handful of roles per category: rewrite them to keep their order
+            conn.execute("DELETE FROM selfrole_options WHERE category = ?", (key,))
+            conn.executemany(
+                "INSERT INTO selfrole_options (category, role_id, label, emoji) VALUES (?, ?, ?, ?)",
+                [(key, str(rid), str(meta.get("label") or rid), meta.get("emoji")) for rid, meta in roles.items()],
+            )
+
+        old_r = old.get("role_requests") or {}
+        new_r = new.get("role_requests") or {}
+        conn.executemany("DELETE FROM role_requests WHERE message_id = ?", [(m,) for m in old_r.keys() - new_r.keys()])
+        conn.executemany(
+            "INSERT OR REPLACE INTO role_requests (message_id, user_id, role_type, role_name, colour, icon) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (mid, int(r["user_id"]), r.get("role_type"), r.get("role_name"), r.get("colour"), r.get("icon"))
+                for mid, r in new_r.items() if old_r.get(mid) != r
+            ],
+        )
+
+
+SCHEMAS: Dict[str, KeyValueSchema] = {
+    "warnings": WarningsSchema(),
+    "warnings_journal": WarningsJournalSchema(),
+    "poo_goat": PooGoatSchema(),
+    "birthdays": BirthdaysSchema(),
+    "permissions": PermissionsSchema(),
+    "selfroles": SelfRolesSchema(),
+}
+DEFAULT_SCHEMA = KeyValueSchema()
+
+
+# =========================================================
+# Backend
+# =========================================================
+
+class SqliteBackend:
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                path        TEXT PRIMARY KEY,
+                imported_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS doc_fields (
+                path  TEXT NOT NULL,
+                key   TEXT NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (path, key)
+            );
+        """)
+        for schema in SCHEMAS.values():
+            schema.create(self.conn)
+
+    @staticmethod
+    def schema_for(name: Optional[str]) -> KeyValueSchema:
+        return SCHEMAS.get(name or "", DEFAULT_SCHEMA)
+
+    def has(self, path: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM documents WHERE path = ?", (path,)).fetchone() is not None
+
+    def read(self, path: str, schema: Optional[str]) -> Optional[Dict[str, Any]]:
+        """None means the document was never imported."""
+        if not self.has(path):
+            return None
+        return self.schema_for(schema).read(self.conn, path)
+
+    def write(self, path: str, schema: Optional[str], old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> None:
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.schema_for(schema).write(self.conn, path, old or {}, new)
+            self.conn.execute(
+                "INSERT OR IGNORE INTO documents (path, imported_at) VALUES (?, ?)",
+                (path, datetime.now(timezone.utc).isoformat()),
+            )
+
+    def drop(self, path: str, schema: Optional[str]) -> None:
+        """Clears a document (used by --force re-imports)."""
+        old = self.read(path, schema)
+        if old is None:
+            return
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.schema_for(schema).write(self.conn, path, old, {})
+            self.conn.execute("DELETE FROM documents WHERE path = ?", (path,))
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+# =========================================================
+# One-shot GitHub import
+# =========================================================
+
+# (path, schema) for every document the bot keeps. None is the key/value
+# fallback: welcome_config, boost_windows, googoo and the runtime log are
+# small documents edited a key at a time, where one row per key already
+# keeps a save to the rows that changed.
+KNOWN_DOCUMENTS: List[Tuple[str, Optional[str]]] = [
+    ("warnings.json", "warnings"),
+    ("warnings_journal.json", "warnings_journal"),
+    ("birthdays.json", "birthdays"),
+    (os.getenv("POO_GOAT_GITHUB_PATH", "poo_goat_data.json"), "poo_goat"),
+    (os.getenv("SELFROLES_FILE_PATH", "selfroles.json"), "selfroles"),
+    ("welcome_config.json", None),
+    ("boost_windows.json", None),
+    ("pilot_settings.json", "permissions"),
+    (os.getenv("GOOGOO_GITHUB_PATH", "googoo.json"), None),
+    ("pilot_runtime_logs.json", None),
+]
+
+
+async def import_from_github(
+    backend: SqliteBackend,
+    documents: Iterable[Tuple[str, Optional[str]]] = KNOWN_DOCUMENTS,
+    *,
+    force: bool = False,
+) -> Dict[str, str]:
+    from document_store import DocumentStore
+
+    github = DocumentStore(local=None, cache_dir=None)
+    results: Dict[str, str] = {}
+    try:
+        for path, schema in documents:
+            if backend.has(path) and not force:
+                results[path] = "skipped (already imported)"
+                continue
+            try:
+                fetched = await github.document(path).fetch_remote(conditional=False)
+            except Exception as e:
+                results[path] = f"failed: {e}"
+                continue
+            if force:
+                backend.drop(path, schema)
+            backend.write(path, schema, None, fetched[0] if fetched else {})
+            results[path] = "imported"
+    finally:
+        await github.close()
+    return results
+
+
+if __name__ == "__main__":
+    from document_store import SQLITE_PATH
+
+    db = SqliteBackend(SQLITE_PATH)
+    for p, status in asyncio.run(import_from_github(db, force="--force" in sys.argv)).items():
+        print(f"{p}: {status}")
+    db.close()
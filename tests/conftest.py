@@ -0,0 +1,5 @@
+# The bot's modules live at the repo root, not in a package.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
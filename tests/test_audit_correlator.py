@@ -0,0 +1,77 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+discord = pytest.importorskip("discord")
+
+import audit_correlator
+from audit_correlator import AuditLogCorrelator, actor_mention
+
+KICK = discord.AuditLogAction.kick
+BAN = discord.AuditLogAction.ban
+
+
+def entry(action, target_id=7, guild_id=1, user=None, user_id=99):
+    return SimpleNamespace(
+        action=action,
+        target=SimpleNamespace(id=target_id),
+        guild=SimpleNamespace(id=guild_id),
+        user=user,
+        user_id=user_id,
+    )
+
+
+def test_lookup_finds_an_entry_that_arrived_first():
+    async def scenario():
+        audit = AuditLogCorrelator()
+        kick = entry(KICK)
+        await audit.on_entry(kick)
+        assert await audit.wait_for(1, 7, KICK, BAN, timeout=0.01) is kick
+        assert audit.lookup(1, 8, (KICK,)) is None
+        assert audit.lookup(2, 7, (KICK,)) is None
+
+    asyncio.run(scenario())
+
+
+def test_wait_for_an_entry_that_arrives_after_the_member_event():
+    async def scenario():
+        audit = AuditLogCorrelator()
+        waiter = asyncio.ensure_future(audit.wait_for(1, 7, BAN, timeout=1))
+        await asyncio.sleep(0)
+        await audit.on_entry(entry(KICK))  # wrong action: keeps waiting
+        ban = entry(BAN)
+        await audit.on_entry(ban)
+        assert await waiter is ban
+        assert audit._waiters == {}
+
+    asyncio.run(scenario())
+
+
+def test_plain_leave_times_out():
+    async def scenario():
+        audit = AuditLogCorrelator()
+        assert await audit.wait_for(1, 7, KICK, timeout=0.01) is None
+        assert audit._waiters == {}
+
+    asyncio.run(scenario())
+
+
+def test_entries_expire(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(audit_correlator.time, "monotonic", lambda: now[0])
+
+    async def scenario():
+        audit = AuditLogCorrelator(ttl=60)
+        await audit.on_entry(entry(KICK))
+        now[0] = 61
+        assert audit.lookup(1, 7, (KICK,)) is None
+        await audit.on_entry(entry(BAN, target_id=8))
+        assert list(audit._entries) == [(1, 8, BAN)]
+
+    asyncio.run(scenario())
+
+
+def test_actor_mention_without_a_cached_user():
+    assert actor_mention(entry(KICK, user=None, user_id=42)) == "<@42>"
+    assert actor_mention(entry(KICK, user=SimpleNamespace(mention="<@5>"))) == "<@5>"
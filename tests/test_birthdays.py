@@ -0,0 +1,86 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("discord")
+
+from birthdays import BDAY_END, BDAY_POST, BDAY_START, BirthdayIndex, TimezoneIndex, _next_birthday
+
+
+def data(**birthdays):
+    return {
+        "settings": {"post_hour": 15, "post_minute": 30},
+        "birthdays": birthdays,
+        "state": {"announced": {"2026-03-14": [1]}},
+    }
+
+
+def test_next_birthday_skips_to_a_leap_year_for_29_february():
+    assert _next_birthday({"month": 3, "day": 14}, date(2026, 3, 14)) == date(2026, 3, 14)
+    assert _next_birthday({"month": 3, "day": 14}, date(2026, 3, 15)) == date(2027, 3, 14)
+    assert _next_birthday({"month": 2, "day": 29}, date(2026, 3, 1)) == date(2028, 2, 29)
+    assert _next_birthday({"month": "x"}, date(2026, 1, 1)) is None
+
+
+def test_index_pushes_start_post_and_end_in_the_members_zone():
+    now = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    index = BirthdayIndex(data(**{"1": {"day": 14, "month": 3, "timezone": "Asia/Tokyo"}}), now)
+
+    events = sorted(index.heap)
+    assert [(kind, uid, day) for _, kind, uid, day in events] == [
+        (BDAY_START, "1", date(2026, 3, 14)),
+        (BDAY_POST, "1", date(2026, 3, 14)),
+        (BDAY_END, "1", date(2026, 3, 14)),
+    ]
+    # midnight, 15:30 and the next midnight in Tokyo (UTC+9)
+    assert events[0][0] == datetime(2026, 3, 13, 15, 0, tzinfo=timezone.utc)
+    assert events[1][0] == datetime(2026, 3, 14, 6, 30, tzinfo=timezone.utc)
+    assert events[2][0] == datetime(2026, 3, 14, 15, 0, tzinfo=timezone.utc)
+    assert index.announced == {"2026-03-14": {1}}
+
+
+def test_celebrating_uses_each_members_local_date():
+    birthdays = {
+        "1": {"day": 14, "month": 3, "timezone": "Asia/Tokyo"},
+        "2": {"day": 14, "month": 3, "timezone": "America/Los_Angeles"},
+        "3": {"day": 14, "month": 3},  # defaults to Europe/London
+        "4": {"month": 3},  # broken record: skipped
+    }
+    index = BirthdayIndex(data(**birthdays), datetime(2026, 3, 1, tzinfo=timezone.utc))
+
+    assert index.celebrating(datetime(2026, 3, 13, 16, 0, tzinfo=timezone.utc)) == {"1"}
+    assert index.celebrating(datetime(2026, 3, 14, 6, 0, tzinfo=timezone.utc)) == {"1", "3"}
+    assert index.celebrating(datetime(2026, 3, 15, 2, 0, tzinfo=timezone.utc)) == {"2"}
+
+
+ZONES = {"Europe/London", "Europe/Paris", "America/New_York", "America/Argentina/Buenos_Aires", "Asia/Tokyo", "UTC"}
+
+
+@pytest.fixture
+def zones():
+    return TimezoneIndex(ZONES, common=("Europe/London", "UTC"), aliases={"UK": "Europe/London", "JST": "Asia/Tokyo", "XX": "Nowhere/Else"})
+
+
+def test_empty_query_lists_the_common_zones(zones):
+    assert zones.search("") == (("Europe/London", "Europe/London"), ("UTC", "UTC"))
+
+
+def test_alias_then_name_prefix_then_part_prefix_then_substring(zones):
+    assert zones.search("jst") == (("JST (Asia/Tokyo)", "Asia/Tokyo"),)
+    assert [z for _, z in zones.search("europe")] == ["Europe/London", "Europe/Paris"]
+    assert [z for _, z in zones.search("buenos aires")] == ["America/Argentina/Buenos_Aires"]
+    assert [z for _, z in zones.search("york")] == ["America/New_York"]
+    assert [z for _, z in zones.search("ond")] == ["Europe/London"]
+    assert [z for _, z in zones.search("os_air")] == ["America/Argentina/Buenos_Aires"]
+    assert zones.search("zzz") == ()
+
+
+def test_common_zones_rank_first(zones):
+    assert [z for _, z in zones.search("e")][:1] == ["Europe/London"]
+
+
+def test_resolve_turns_an_alias_into_its_zone(zones):
+    assert zones.resolve(" uk ") == "Europe/London"
+    assert zones.resolve("Asia/Tokyo") == "Asia/Tokyo"
+    assert zones.resolve("XX") == "XX"  # alias to a zone that doesn't exist is dropped
@@ -0,0 +1,246 @@
+# DocumentStore against the offline GitHub stand-in (github_standin.py).
+
+import json
+import asyncio
+import contextlib
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+import document_store
+import github_standin
+from document_store import DocumentStore, DocumentStoreError, JsonCodec, git_blob_sha, merge3
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def raw(data) -> bytes:
+    return json.dumps(data).encode("utf-8")
+
+
+def remote(repo, path):
+    return json.loads(repo.files[path])
+
+
+@contextlib.asynccontextmanager
+async def github(files, **options):
+    """A stand-in repo holding `files` (path -> data) and a store pointed at it."""
+    repo = github_standin.StandinRepo({path: raw(data) for path, data in files.items()})
+    runner = await github_standin.start(port=0, repo=repo, **options)
+    host, port = runner.addresses[0][:2]
+    store = DocumentStore(api_base=f"http://{host}:{port}", local=None, cache_dir=None)
+    store.branch = store._branch = None
+    try:
+        yield repo, store, runner.app["stats"]
+    finally:
+        await store.close()
+        await runner.cleanup()
+
+
+@pytest.fixture(autouse=True)
+def write_through(monkeypatch):
+    # every save() flushes right away unless a test turns write-behind back on
+    monkeypatch.setattr(document_store, "WRITE_BEHIND_SECONDS", 0)
+
+
+# ---------------- merge3 ----------------
+
+def test_merge3_takes_the_side_that_changed():
+    assert merge3({"a": 1}, {"a": 1}, {"a": 2}) == {"a": 2}
+    assert merge3({"a": 1}, {"a": 3}, {"a": 1}) == {"a": 3}
+
+
+def test_merge3_merges_dicts_per_key():
+    base = {"a": 1, "b": 1, "c": 1}
+    ours = {"a": 2, "b": 1}
+    theirs = {"a": 1, "b": 5, "c": 1, "d": 7}
+    assert merge3(base, ours, theirs) == {"a": 2, "b": 5, "d": 7}
+
+
+def test_merge3_keeps_list_additions_and_removals_from_both_sides():
+    assert merge3([1, 2, 3], [1, 2, 3, 4], [2, 3, 5]) == [2, 3, 5, 4]
+
+
+def test_merge3_counters_take_the_max_and_conflicts_go_to_ours():
+    assert merge3({"n": 1}, {"n": 3}, {"n": 2}) == {"n": 3}
+    assert merge3({"n": 1}, {"n": 2}, {"n": 3}) == {"n": 3}
+    assert merge3({"s": "a"}, {"s": "ours"}, {"s": "theirs"}) == {"s": "ours"}
+
+
+# ---------------- JsonCodec ----------------
+
+def test_codec_round_trips_plain_and_gzipped():
+    data = {"warnings": {"1": ["spam"] * 50}, "ffa_enabled": False}
+    plain = JsonCodec()
+    packed = JsonCodec(compress_over=64)
+
+    assert plain.loads(plain.dumps(data)) == data
+    assert packed.dumps(data).startswith(JsonCodec.MAGIC)
+    assert packed.loads(packed.dumps(data)) == data
+    # either codec reads either form, and the old pretty-printed files
+    assert plain.loads(packed.dumps(data)) == data
+    assert packed.loads(json.dumps(data, indent=2).encode()) == data
+
+
+def test_codec_gzip_is_deterministic():
+    codec = JsonCodec(compress_over=1)
+    assert git_blob_sha(codec.dumps({"a": 1})) == git_blob_sha(codec.dumps({"a": 1}))
+
+
+# ---------------- contents API writes ----------------
+
+def test_conflict_on_put_merges_the_other_write():
+    async def scenario():
+        async with github({"a.json": {"x": 1, "y": 1}}) as (repo, store, _):
+            doc = store.document("a.json")
+            data = await doc.load()
+            repo.put("a.json", raw({"x": 1, "y": 2}), "other writer")
+
+            data["x"] = 5
+            await doc.save(data)  # 409 on the stale sha: merge and retry
+
+            assert remote(repo, "a.json") == {"x": 5, "y": 2}
+            assert doc.data == {"x": 5, "y": 2}
+            assert not doc.dirty
+
+    run(scenario())
+
+
+def test_failed_retry_keeps_the_merge_for_the_next_flush():
+    async def scenario():
+        async with github({"a.json": {"x": 1, "y": 1}}) as (repo, store, _):
+            doc = store.document("a.json")
+            data = await doc.load()
+            repo.put("a.json", raw({"x": 1, "y": 2}), "other writer")
+
+            real_put, calls = doc._put, []
+
+            async def flaky_put(data, message):
+                calls.append(data)
+                if len(calls) == 2:
+                    return 502, None  # the retry after the rebase fails
+                return await real_put(data, message)
+
+            doc._put = flaky_put
+            data["x"] = 5
+            with pytest.raises(DocumentStoreError):
+                await doc.save(data)
+            assert doc.dirty
+
+            # the next flush is on the rebased sha and must not undo y=2
+            await doc.flush()
+            assert remote(repo, "a.json") == {"x": 5, "y": 2}
+
+    run(scenario())
+
+
+def test_save_after_an_unreachable_first_read_keeps_remote_keys():
+    async def scenario():
+        async with github({"a.json": {"x": 1, "y": 7}}) as (repo, store, _):
+            doc = store.document("a.json", default=lambda: {"x": 0, "y": 0})
+            api_base, store.api_base = store.api_base, "http://127.0.0.1:9"
+            data = await doc.load()
+            assert data == {"x": 0, "y": 0}
+
+            store.api_base = api_base
+            data["x"] = 3
+            await doc.save(data)  # merged against the defaults, not written over GitHub
+            assert remote(repo, "a.json") == {"x": 3, "y": 7}
+
+    run(scenario())
+
+
+def test_write_behind_coalesces_saves(monkeypatch):
+    monkeypatch.setattr(document_store, "WRITE_BEHIND_SECONDS", 0.05)
+
+    async def scenario():
+        async with github({"a.json": {"n": 0}}) as (repo, store, stats):
+            doc = store.document("a.json")
+            for n in range(1, 6):
+                data = await doc.load()
+                data["n"] = n
+                await doc.save(data)
+            assert stats["PUT contents_put"] == 0
+
+            await asyncio.sleep(0.3)
+            assert stats["PUT contents_put"] == 1
+            assert remote(repo, "a.json") == {"n": 5}
+
+    run(scenario())
+
+
+# ---------------- batch commits ----------------
+
+def test_batch_writes_one_commit():
+    async def scenario():
+        async with github({"a.json": {"x": 1}, "b.json": {"z": 1}}) as (repo, store, stats):
+            a, b = store.document("a.json"), store.document("b.json")
+            da, db = await a.load(), await b.load()
+            head = repo.head
+
+            async with store.batch("Both at once"):
+                da["x"] = 2
+                db["z"] = 2
+                await a.save(da)
+                await b.save(db)
+
+            assert stats["PUT contents_put"] == 0
+            assert repo.commits[repo.head]["parents"] == [head]
+            assert repo.commits[repo.head]["message"] == "Both at once"
+            assert remote(repo, "a.json") == {"x": 2}
+            assert remote(repo, "b.json") == {"z": 2}
+            assert not a.dirty and not b.dirty
+            assert a.sha == git_blob_sha(repo.files["a.json"])
+
+    run(scenario())
+
+
+def test_batch_merges_a_file_changed_since_it_was_read():
+    async def scenario():
+        async with github({"a.json": {"x": 1, "y": 1}, "b.json": {"z": 1}}) as (repo, store, _):
+            a, b = store.document("a.json"), store.document("b.json")
+            da, db = await a.load(), await b.load()
+            repo.put("a.json", raw({"x": 1, "y": 2}), "contents API writer")
+
+            da["x"] = 5
+            db["z"] = 2
+            async with store.batch("Both"):
+                await a.save(da)
+                await b.save(db)
+
+            # the tree is built on head, so a stale blob would have reverted y
+            assert remote(repo, "a.json") == {"x": 5, "y": 2}
+            assert remote(repo, "b.json") == {"z": 2}
+
+    run(scenario())
+
+
+def test_batch_rebuilds_when_the_ref_moves_during_the_commit():
+    async def scenario():
+        async with github({"a.json": {"x": 1, "y": 1}, "b.json": {"z": 1}}) as (repo, store, stats):
+            a, b = store.document("a.json"), store.document("b.json")
+            da, db = await a.load(), await b.load()
+
+            real_commit_files = store._commit_files
+
+            async def racing(branch, head, tree, files, message):
+                if stats["PATCH ref_patch"] == 0:
+                    # someone pushes after we read head: our ref update is not a fast-forward
+                    repo.put("a.json", raw({"x": 1, "y": 3}), "racing writer")
+                return await real_commit_files(branch, head, tree, files, message)
+
+            store._commit_files = racing
+            da["x"] = 5
+            db["z"] = 2
+            async with store.batch("Both"):
+                await a.save(da)
+                await b.save(db)
+
+            assert stats["PATCH ref_patch"] == 2
+            assert remote(repo, "a.json") == {"x": 5, "y": 3}
+            assert remote(repo, "b.json") == {"z": 2}
+
+    run(scenario())
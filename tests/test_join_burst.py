@@ -0,0 +1,42 @@
+import pytest
+
+pytest.importorskip("discord")
+
+import join_burst
+from join_burst import JoinVelocity
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(join_burst.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_burst_starts_when_enough_joins_fit_in_the_window(clock):
+    velocity = JoinVelocity(joins=3, window=10, cooldown=60)
+    assert not velocity.record(1)
+    clock[0] += 4
+    assert not velocity.record(1)
+    clock[0] += 4
+    assert velocity.record(1)
+    assert not velocity.active(2)  # per guild
+
+
+def test_spread_out_joins_never_burst(clock):
+    velocity = JoinVelocity(joins=3, window=10, cooldown=60)
+    for _ in range(10):
+        assert not velocity.record(1)
+        clock[0] += 6
+
+
+def test_burst_lasts_the_cooldown_after_the_last_fast_join(clock):
+    velocity = JoinVelocity(joins=2, window=5, cooldown=60)
+    velocity.record(1)
+    velocity.record(1)
+    clock[0] += 30
+    velocity.record(1)  # 30s after the previous one: doesn't extend the burst
+    clock[0] += 29
+    assert velocity.active(1)
+    clock[0] += 2
+    assert not velocity.active(1)
@@ -0,0 +1,28 @@
+from message_templates import compile_template, describe, unknown_placeholders
+
+
+def test_render_fills_known_placeholders_and_keeps_unknown_ones():
+    tpl = compile_template("Welcome {user} to {server}! See {channel:rules} {nope}")
+    out = tpl.render({"user": "@ann", "server": "Pilots", "channel:rules": "#rules"})
+    assert out == "Welcome @ann to Pilots! See #rules {nope}"
+
+
+def test_segments_and_placeholders():
+    tpl = compile_template("{a}-{b}-{a}")
+    assert tpl.placeholders == ("a", "b")
+    assert tpl.segments == ((True, "a"), (False, "-"), (True, "b"), (False, "-"), (True, "a"))
+
+
+def test_compiled_once_per_source():
+    assert compile_template("Hi {user}") is compile_template("Hi {user}")
+    assert compile_template(None).render({}) == ""
+
+
+def test_unknown_placeholders_accepts_prefixed_arguments():
+    sources = ["Hi {user}, read {channel:rules}", "{usr} {count}", "{usr}"]
+    assert unknown_placeholders(sources, ["user", "count", "channel:"]) == ["usr"]
+    assert unknown_placeholders(sources, ["user", "count"]) == ["channel:rules", "usr"]
+
+
+def test_describe():
+    assert describe(["user", "channel:"]) == "{user}, {channel:<slot>}"
@@ -0,0 +1,55 @@
+import json
+import os
+
+import pytest
+
+from sqlite_store import SqliteBackend
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def db(tmp_path):
+    backend = SqliteBackend(str(tmp_path / "pilot.db"))
+    yield backend
+    backend.close()
+
+
+def test_a_warn_is_one_new_row(db):
+    old = {"warnings": {"1": ["a"]}, "blocked_warners": [], "ffa_enabled": False}
+    db.write("warnings.json", "warnings", None, old)
+    new = {**old, "warnings": {"1": ["a", "b"]}}
+    db.write("warnings.json", "warnings", old, new)
+
+    assert db.read("warnings.json", "warnings") == new
+    assert db.conn.execute("SELECT id, reason FROM warnings ORDER BY id").fetchall() == [(1, "a"), (2, "b")]
+
+
+def test_journal_events_are_rows_and_trims_delete_by_seq(db):
+    events = [{"seq": 1, "op": "warn"}, {"seq": 2, "op": "mode"}]
+    db.write("warnings_journal.json", "warnings_journal", None, {"events": events})
+    db.write("warnings_journal.json", "warnings_journal", {"events": events}, {"events": events[1:]})
+
+    assert db.read("warnings_journal.json", "warnings_journal") == {"events": events[1:]}
+    assert db.conn.execute("SELECT seq FROM warning_events").fetchall() == [(2,)]
+
+
+def test_selfroles_round_trip_and_request_rows(db):
+    with open(os.path.join(ROOT, "selfroles.json"), encoding="utf-8") as f:
+        cfg = json.load(f)
+    cfg["role_requests"] = {"55": {"user_id": 7, "role_type": "colour", "role_name": "Teal", "colour": "#0ff", "icon": None}}
+    db.write("selfroles.json", "selfroles", None, cfg)
+    assert db.read("selfroles.json", "selfroles") == cfg
+
+    done = {**cfg, "role_requests": {}}
+    db.write("selfroles.json", "selfroles", cfg, done)
+    assert db.read("selfroles.json", "selfroles") == done
+    assert db.conn.execute("SELECT COUNT(*) FROM role_requests").fetchone() == (0,)
+
+
+def test_owned_keys_saved_as_key_value_rows_move_into_their_table(db):
+    # written by the key/value fallback, before warnings_journal had a table
+    db.write("warnings_journal.json", None, None, {"events": [{"seq": 4, "op": "warn"}]})
+
+    assert db.read("warnings_journal.json", "warnings_journal") == {"events": [{"seq": 4, "op": "warn"}]}
+    assert db.conn.execute("SELECT key FROM doc_fields").fetchall() == []